@@ -0,0 +1,47 @@
+"""vector index jobs outbox
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vector_index_jobs",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("prof_id", sa.String(length=36), nullable=False),
+        sa.Column("user_id", sa.String(length=36), nullable=True),
+        sa.Column("operation", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default=sa.text("5")),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("file_id", sa.String(length=128), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_vector_index_jobs_prof_id", "vector_index_jobs", ["prof_id"], unique=False)
+    op.create_index(
+        "ix_vector_index_jobs_status_next",
+        "vector_index_jobs",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vector_index_jobs_status_next", table_name="vector_index_jobs")
+    op.drop_index("ix_vector_index_jobs_prof_id", table_name="vector_index_jobs")
+    op.drop_table("vector_index_jobs")
@@ -0,0 +1,44 @@
+"""vector store file mapping
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vector_store_files",
+        sa.Column("prof_id", sa.String(length=36), primary_key=True),
+        sa.Column("file_id", sa.String(length=128), nullable=False),
+        sa.Column("vector_store_id", sa.String(length=128), nullable=True),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_vector_store_files_file_id", "vector_store_files", ["file_id"], unique=False)
+
+    # Backfill desde la columna existente del perfil
+    op.execute(
+        """
+        INSERT INTO vector_store_files (prof_id, file_id, filename)
+        SELECT id, vector_store_file_id, 'prof_' || id || '.json'
+        FROM professional_profiles
+        WHERE vector_store_file_id IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vector_store_files_file_id", table_name="vector_store_files")
+    op.drop_table("vector_store_files")
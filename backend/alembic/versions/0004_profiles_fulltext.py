@@ -0,0 +1,26 @@
+"""full-text index over professional_profiles
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:00:00.000000
+"""
+
+from alembic import op
+
+from backend.app.db.fulltext import ensure_fulltext_index, drop_fulltext_index
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # PostgreSQL: GIN sobre to_tsvector('spanish', ...); SQLite: tabla FTS5 + triggers
+    ensure_fulltext_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_fulltext_index(op.get_bind())
@@ -0,0 +1,41 @@
+"""vector store shard manifest
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vector_shards",
+        sa.Column("shard_key", sa.String(length=160), primary_key=True),
+        sa.Column("file_id", sa.String(length=128), nullable=True),
+        sa.Column("vector_store_id", sa.String(length=128), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("record_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_vector_shards_file_id", "vector_shards", ["file_id"], unique=False)
+
+    op.add_column("vector_store_files", sa.Column("shard_key", sa.String(length=160), nullable=True))
+    op.create_index("ix_vector_store_files_shard_key", "vector_store_files", ["shard_key"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vector_store_files_shard_key", table_name="vector_store_files")
+    op.drop_column("vector_store_files", "shard_key")
+    op.drop_index("ix_vector_shards_file_id", table_name="vector_shards")
+    op.drop_table("vector_shards")
@@ -0,0 +1,43 @@
+"""reconciliation watermarks and indexed content hash
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("position_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("position_key", sa.String(length=128), nullable=True),
+        sa.Column("cursor", sa.String(length=255), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+    op.add_column("vector_store_files", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+    # Recorrido incremental por (updated_at, id)
+    op.create_index(
+        "ix_professional_profiles_updated_at_id",
+        "professional_profiles",
+        ["updated_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_professional_profiles_updated_at_id", table_name="professional_profiles")
+    op.drop_column("vector_store_files", "content_hash")
+    op.drop_table("sync_watermarks")
@@ -0,0 +1,24 @@
+"""users (updated_at, id) index for incremental exports
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 16:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Recorrido incremental de la exportación por (updated_at, id)
+    op.create_index("ix_users_updated_at_id", "users", ["updated_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_updated_at_id", table_name="users")
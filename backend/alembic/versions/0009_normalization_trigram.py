@@ -0,0 +1,80 @@
+"""accent/synonym-aware normalization backfill and trigram indexes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 17:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.core.normalization import normalize_city, normalize_profession
+from backend.app.db.trigram import drop_trigram_index, ensure_trigram_index
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+profiles = sa.table(
+    "professional_profiles",
+    sa.column("id", sa.String),
+    sa.column("profesion_principal", sa.String),
+    sa.column("ciudad", sa.String),
+    sa.column("profesion_normalizada", sa.String),
+    sa.column("ciudad_normalizada", sa.String),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # PostgreSQL: pg_trgm + GIN (gin_trgm_ops); en SQLite la búsqueda difusa es en memoria
+    ensure_trigram_index(bind)
+
+    # Re-normaliza por lotes (keyset por id). Solo se tocan las filas cuyo valor
+    # cambia; su updated_at avanza para que la reconciliación reindexe el documento
+    # y la exportación incremental las recoja.
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(
+                profiles.c.id,
+                profiles.c.profesion_principal,
+                profiles.c.ciudad,
+                profiles.c.profesion_normalizada,
+                profiles.c.ciudad_normalizada,
+            )
+            .where(profiles.c.id > last_id)
+            .order_by(profiles.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        changes = []
+        for row in rows:
+            prof_norm = normalize_profession(row.profesion_principal)
+            city_norm = normalize_city(row.ciudad)
+            if (prof_norm, city_norm) != (row.profesion_normalizada, row.ciudad_normalizada):
+                changes.append({"b_id": row.id, "b_prof": prof_norm, "b_city": city_norm})
+        if changes:
+            bind.execute(
+                profiles.update()
+                .where(profiles.c.id == sa.bindparam("b_id"))
+                .values(
+                    profesion_normalizada=sa.bindparam("b_prof"),
+                    ciudad_normalizada=sa.bindparam("b_city"),
+                    updated_at=sa.func.now(),
+                ),
+                changes,
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # Los valores re-normalizados se conservan (la forma anterior era strip().lower())
+    drop_trigram_index(op.get_bind())
@@ -0,0 +1,88 @@
+"""professional_profiles lat/lon/geohash for proximity search (+ gazetteer backfill)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 18:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.core.geo import geo_fields
+from backend.app.db.spatial import drop_geo_index, ensure_geo_index
+
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+profiles = sa.table(
+    "professional_profiles",
+    sa.column("id", sa.String),
+    sa.column("ciudad", sa.String),
+    sa.column("barrio", sa.String),
+    sa.column("lat", sa.Float),
+    sa.column("lon", sa.Float),
+    sa.column("geohash", sa.String),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    op.add_column("professional_profiles", sa.Column("lat", sa.Float(), nullable=True))
+    op.add_column("professional_profiles", sa.Column("lon", sa.Float(), nullable=True))
+    op.add_column("professional_profiles", sa.Column("geohash", sa.String(length=12), nullable=True))
+    op.create_index("ix_professional_profiles_geo", "professional_profiles", ["geohash", "lat", "lon", "id"])
+    op.create_index(
+        "ix_professional_profiles_profesion_geo",
+        "professional_profiles",
+        ["profesion_normalizada", "geohash", "lat", "lon", "id"],
+    )
+
+    # Geocodifica por lotes (keyset por id) los perfiles existentes con el gazetteer;
+    # updated_at avanza para que la exportación incremental recoja las coordenadas.
+    bind = op.get_bind()
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(profiles.c.id, profiles.c.ciudad, profiles.c.barrio)
+            .where(profiles.c.id > last_id)
+            .order_by(profiles.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        changes = []
+        for row in rows:
+            geo = geo_fields(row.ciudad, row.barrio)
+            if geo["geohash"] is not None:
+                changes.append({"b_id": row.id, "b_lat": geo["lat"], "b_lon": geo["lon"], "b_geohash": geo["geohash"]})
+        if changes:
+            bind.execute(
+                profiles.update()
+                .where(profiles.c.id == sa.bindparam("b_id"))
+                .values(
+                    lat=sa.bindparam("b_lat"),
+                    lon=sa.bindparam("b_lon"),
+                    geohash=sa.bindparam("b_geohash"),
+                    updated_at=sa.func.now(),
+                ),
+                changes,
+            )
+        last_id = rows[-1].id
+
+    # PostgreSQL: cube + earthdistance e índice GiST (si hay permisos)
+    ensure_geo_index(bind)
+
+
+def downgrade() -> None:
+    drop_geo_index(op.get_bind())
+    op.drop_index("ix_professional_profiles_profesion_geo", table_name="professional_profiles")
+    op.drop_index("ix_professional_profiles_geo", table_name="professional_profiles")
+    op.drop_column("professional_profiles", "geohash")
+    op.drop_column("professional_profiles", "lon")
+    op.drop_column("professional_profiles", "lat")
@@ -0,0 +1,73 @@
+"""register shared bulk-import JSONL files as vector shards
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# Mismo prefijo que ShardingService (IMPORT_SHARD_PREFIX)
+IMPORT_SHARD_PREFIX = "import:"
+
+files = sa.table(
+    "vector_store_files",
+    sa.column("prof_id", sa.String),
+    sa.column("file_id", sa.String),
+    sa.column("vector_store_id", sa.String),
+    sa.column("shard_key", sa.String),
+)
+
+shards = sa.table(
+    "vector_shards",
+    sa.column("shard_key", sa.String),
+    sa.column("file_id", sa.String),
+    sa.column("vector_store_id", sa.String),
+    sa.column("version", sa.Integer),
+    sa.column("record_count", sa.Integer),
+    sa.column("content_hash", sa.String),
+)
+
+
+def upgrade() -> None:
+    # Archivos JSONL de importaciones previas compartidos por varios perfiles y
+    # fuera del manifiesto: pasan a ser shards "import:<file_id>", así el worker
+    # los reescribe sin el perfil que se reindexa o se borra. content_hash NULL
+    # fuerza la reescritura completa en el primer cambio.
+    bind = op.get_bind()
+    shared = bind.execute(
+        sa.select(files.c.file_id, sa.func.max(files.c.vector_store_id), sa.func.count())
+        .where(files.c.shard_key.is_(None), files.c.file_id.isnot(None))
+        .group_by(files.c.file_id)
+        .having(sa.func.count() > 1)
+    ).all()
+    for file_id, vector_store_id, count in shared:
+        key = IMPORT_SHARD_PREFIX + file_id
+        bind.execute(
+            shards.insert().values(
+                shard_key=key,
+                file_id=file_id,
+                vector_store_id=vector_store_id,
+                version=1,
+                record_count=count,
+                content_hash=None,
+            )
+        )
+        bind.execute(
+            files.update().where(files.c.file_id == file_id, files.c.shard_key.is_(None)).values(shard_key=key)
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    pattern = IMPORT_SHARD_PREFIX + "%"
+    bind.execute(files.update().where(files.c.shard_key.like(pattern)).values(shard_key=None))
+    bind.execute(shards.delete().where(shards.c.shard_key.like(pattern)))
@@ -0,0 +1,28 @@
+"""key the SQLite full-text index on professional_profiles.id
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+
+from backend.app.db.fulltext import ensure_fulltext_index
+
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite: la tabla FTS5 enlazada por rowid se recrea enlazada por id y se
+    # repuebla; en PostgreSQL no cambia nada (índice GIN de expresión)
+    ensure_fulltext_index(op.get_bind())
+
+
+def downgrade() -> None:
+    # El índice enlazado por id también es válido para la revisión anterior
+    pass
@@ -1,10 +1,14 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional, Tuple
 from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend.app.db.async_session import get_async_db as _get_async_db
 from backend.app.db.session import get_db as _get_db
 from backend.app.core.security import decode_access_token
-from backend.app.repositories.users import UserRepository
+from backend.app.core.settings import get_settings
+from backend.app.core.token_cache import Principal, get_token_cache
+from backend.app.repositories.users import AsyncUserRepository, UserRepository
 from backend.app.models.user import User
 
 
@@ -15,25 +19,144 @@ def get_db() -> Generator[Session, None, None]:
     yield from _get_db()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None, alias="Authorization"),
-) -> User:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Extrae y valida el usuario actual a partir del header Authorization: Bearer <token>.
-    Lanza 401 si el token es inválido o el usuario no existe.
+    Variante async de get_db para los routers async (DB_ASYNC=true).
     """
+    async for db in _get_async_db():
+        yield db
+
+
+def _bearer_token(authorization: Optional[str]) -> str:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Falta token Bearer")
+    return authorization.split(" ", 1)[1].strip()
+
+
+def _verify_token(token: str) -> Tuple[Principal, bool, Optional[float]]:
+    """
+    Verifica el JWT usando la caché de tokens verificados.
+    Returns (principal, cache_hit, exp). Lanza 401 si el token es inválido.
+    """
+    cached = get_token_cache().get(token)
+    if cached is not None:
+        return cached, True, None
 
-    token = authorization.split(" ", 1)[1].strip()
     payload = decode_access_token(token)
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+    principal = Principal(
+        id=str(payload["sub"]),
+        email=payload.get("email"),
+        is_professional=bool(payload.get("is_professional", False)),
+        token_version=int(payload.get("ver", 0) or 0),
+    )
+    exp = payload.get("exp")
+    return principal, False, float(exp) if exp is not None else None
+
 
-    user_id = str(payload["sub"])
-    user = UserRepository.get_by_id(db, user_id)
-    if not user:
+def _check_version(principal: Principal, current_version: Optional[int]) -> None:
+    if current_version is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
+    if principal.token_version < current_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revocado")
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> User:
+    """
+    Extrae y valida el usuario actual a partir del header Authorization: Bearer <token>.
+    Lanza 401 si el token es inválido, fue revocado o el usuario no existe.
+    Siempre carga el User desde BD (usar en endpoints de escritura).
+    """
+    token = _bearer_token(authorization)
+    principal, hit, exp = _verify_token(token)
+
+    user = UserRepository.get_by_id(db, principal.id)
+    _check_version(principal, user.token_version if user else None)
+    if not hit:
+        get_token_cache().put(token, principal, token_exp=exp)
+    return user
+
 
-    return user
\ No newline at end of file
+def get_current_principal(
+    db: Session = Depends(get_db),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> Principal:
+    """
+    Identidad del usuario para endpoints de solo lectura.
+    Con AUTH_TRUST_CLAIMS=true se confía en los claims del token verificado:
+    un acierto de caché no toca la BD; un fallo hace una única consulta de
+    token_version (revocación) y cachea el principal. Sin el modo activado
+    equivale a get_current_user.
+    """
+    token = _bearer_token(authorization)
+    if not get_settings().AUTH_TRUST_CLAIMS:
+        user = get_current_user(db=db, authorization=authorization)
+        return Principal(
+            id=user.id,
+            email=user.email,
+            is_professional=bool(user.is_professional),
+            token_version=user.token_version,
+        )
+
+    principal, hit, exp = _verify_token(token)
+    if hit:
+        return principal
+    _check_version(principal, UserRepository.get_token_version(db, principal.id))
+    get_token_cache().put(token, principal, token_exp=exp)
+    return principal
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> User:
+    """
+    Equivalente async de get_current_user (misma caché y misma verificación de versión).
+    """
+    token = _bearer_token(authorization)
+    principal, hit, exp = _verify_token(token)
+
+    user = await AsyncUserRepository.get_by_id(db, principal.id)
+    _check_version(principal, user.token_version if user else None)
+    if not hit:
+        get_token_cache().put(token, principal, token_exp=exp)
+    return user
+
+
+async def get_current_principal_async(
+    db: AsyncSession = Depends(get_async_db),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> Principal:
+    """
+    Equivalente async de get_current_principal.
+    """
+    token = _bearer_token(authorization)
+    if not get_settings().AUTH_TRUST_CLAIMS:
+        user = await get_current_user_async(db=db, authorization=authorization)
+        return Principal(
+            id=user.id,
+            email=user.email,
+            is_professional=bool(user.is_professional),
+            token_version=user.token_version,
+        )
+
+    principal, hit, exp = _verify_token(token)
+    if hit:
+        return principal
+    _check_version(principal, await AsyncUserRepository.get_token_version(db, principal.id))
+    get_token_cache().put(token, principal, token_exp=exp)
+    return principal
+
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Restringe el endpoint a los emails configurados en ADMIN_EMAILS.
+    Lanza 403 si el usuario autenticado no es administrador.
+    """
+    if (current_user.email or "").lower() not in get_settings().ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Requiere permisos de administrador")
+    return current_user
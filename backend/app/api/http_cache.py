@@ -0,0 +1,26 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from backend.app.core.profile_cache import CachedProfile
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (RFC 9110): admite "*", listas y prefijo W/.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_json_response(request: Request, cached: CachedProfile) -> Response:
+    """
+    200 con el JSON cacheado y su ETag, o 304 sin cuerpo si el cliente ya lo tiene.
+    """
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,110 @@
+"""
+Middleware ASGI de instrumentación por request.
+
+- Histogramas por ruta (plantilla, no path concreto): duración, nº de consultas
+  SQL y tiempo en BD.
+- Cabecera `Server-Timing` (db, spans como bcrypt/openai, total hasta la
+  respuesta) visible en las DevTools del navegador.
+- Log opcional de requests lentos (SLOW_REQUEST_MS) con las sentencias SQL ejecutadas.
+
+ASGI puro (sin BaseHTTPMiddleware): no envuelve el cuerpo de la respuesta ni
+cambia el modelo de ejecución de las rutas.
+"""
+import logging
+from typing import Any, Dict, List
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+from backend.app.core.tracing import RequestTrace, end_trace, start_trace
+
+logger = logging.getLogger("backend.app.slow_requests")
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+_request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Duración de los requests HTTP por ruta",
+    ["method", "route", "status"],
+)
+_request_queries = registry.histogram(
+    "http_request_db_queries",
+    "Consultas SQL por request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+_request_db_seconds = registry.histogram(
+    "http_request_db_seconds",
+    "Tiempo en BD por request",
+    ["method", "route"],
+)
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """
+    Plantilla de la ruta resuelta (p. ej. /api/profiles/{prof_id}): el
+    `path_format` de la ruta, que ya incluye el prefijo del router y omite los
+    convertidores ({id:int} -> {id}). Las versiones de FastAPI que no copian
+    las rutas al incluir un router dejan la ruta efectiva en scope["fastapi"].
+    """
+    route = (scope.get("fastapi") or {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+def _server_timing(trace: RequestTrace) -> bytes:
+    parts = [f'db;dur={trace.db_time * 1000:.1f};desc="{trace.db_count} queries"']
+    for name, (count, total) in trace.spans.items():
+        parts.append(f'{name};dur={total * 1000:.1f};desc="{count}x"')
+    parts.append(f"total;dur={trace.elapsed() * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        settings = get_settings()
+        self.server_timing = settings.SERVER_TIMING_ENABLED
+        self.slow_s = settings.SLOW_REQUEST_MS / 1000.0
+        self.max_statements = settings.SLOW_REQUEST_MAX_STATEMENTS if self.slow_s > 0 else 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = start_trace(self.max_statements)
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers: List[Any] = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(trace)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_trace(token)
+            self._observe(scope, trace, status)
+
+    def _observe(self, scope: Dict[str, Any], trace: RequestTrace, status: int) -> None:
+        elapsed = trace.elapsed()
+        method = scope.get("method", "")
+        route = _route_template(scope)
+        _request_seconds.observe(elapsed, method=method, route=route, status=str(status))
+        _request_queries.observe(trace.db_count, method=method, route=route)
+        _request_db_seconds.observe(trace.db_time, method=method, route=route)
+
+        if self.slow_s > 0 and elapsed >= self.slow_s:
+            spans = ", ".join(f"{n}={t * 1000:.1f}ms/{c}" for n, (c, t) in trace.spans.items()) or "-"
+            lines = [
+                f"{method} {scope.get('path', '')} -> {status} en {elapsed * 1000:.1f} ms "
+                f"(route={route}, sql={trace.db_count} consultas/{trace.db_time * 1000:.1f} ms, spans: {spans})"
+            ]
+            lines.extend(f"  {d * 1000:8.2f} ms  {stmt}" for d, stmt in trace.statements)
+            if trace.db_count > len(trace.statements):
+                lines.append(f"  ... {trace.db_count - len(trace.statements)} sentencias más")
+            logger.warning("Request lento: %s", "\n".join(lines))
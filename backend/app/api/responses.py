@@ -0,0 +1,78 @@
+"""
+Respuestas JSON ya serializadas.
+
+Devolver un `Response` desde la ruta evita la segunda pasada de FastAPI sobre
+`response_model` (validación, que en rutas síncronas además salta al
+threadpool, y re-serialización). `response_model` se mantiene en el decorador
+solo para OpenAPI.
+
+- Modelos Pydantic: `model_dump_json()` (núcleo en Rust).
+- Estructuras sueltas (dicts, facetas): orjson si está instalado, json si no.
+- Listas: `json_list_response` serializa los items por tandas mientras se
+  envía la respuesta, sin construir el modelo contenedor completo.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+try:
+    import orjson  # dependencia opcional
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+LIST_CHUNK_SIZE = 50
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(obj: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=dumps(obj), status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def json_list_response(
+    items: Iterable[BaseModel],
+    *,
+    key: str = "items",
+    extra: Optional[Dict[str, Any]] = None,
+    chunk_size: int = LIST_CHUNK_SIZE,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    `{...extra, "<key>": [item, ...]}` emitido por tandas de `chunk_size` items.
+    Los items deben estar ya materializados (sin acceso a BD pendiente): el
+    generador corre después de que la ruta devuelve.
+    """
+    head = dumps(extra or {})[:-1]
+    head = head + (b"," if len(head) > 1 else b"") + json.dumps(key).encode("utf-8") + b":["
+
+    async def body() -> AsyncIterator[bytes]:
+        yield head
+        batch = []
+        first = True
+        for item in items:
+            batch.append(item.model_dump_json().encode("utf-8"))
+            if len(batch) >= chunk_size:
+                yield (b"" if first else b",") + b",".join(batch)
+                first = False
+                batch = []
+        if batch:
+            yield (b"" if first else b",") + b",".join(batch)
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type=JSON_MEDIA_TYPE, headers=headers)
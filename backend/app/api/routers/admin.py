@@ -0,0 +1,83 @@
+import io
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from backend.app.api.deps import get_db, require_admin
+from backend.app.models.user import User
+from backend.app.schemas.bulk_import import ImportResult
+from backend.app.services.bulk_import import BulkImportService, INDEX_PACKED
+from backend.app.services.export import ExportService
+from backend.app.services.indexing_service import IndexingService
+
+router = APIRouter()
+
+
+@router.post("/import", response_model=ImportResult)
+def import_professionals(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None, description="csv | jsonl (por defecto según extensión)"),
+    batch_size: Optional[int] = Form(None, ge=1, le=10000),
+    index_mode: str = Form(INDEX_PACKED, description="packed | outbox | none"),
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_admin),
+):
+    """
+    Importación masiva de profesionales desde CSV/JSONL (streaming, inserts por lotes).
+    """
+    fmt = (format or (file.filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Formato no soportado (csv | jsonl)")
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        result = BulkImportService.run(
+            db,
+            BulkImportService.iter_rows(stream, fmt),
+            batch_size=batch_size,
+            index_mode=index_mode,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+    finally:
+        stream.detach()
+
+    if result.index_enqueued:
+        IndexingService.notify_worker()
+    return result
+
+
+@router.get("/export/{table}")
+def export_table(
+    table: str,
+    format: str = Query("ndjson", description="ndjson | csv | parquet"),
+    gzip: bool = Query(False, description="Comprime NDJSON/CSV (.gz); en Parquet elige el códec gzip"),
+    since: Optional[str] = Query(None, description="Cursor de la exportación anterior (incremental)"),
+    batch_size: Optional[int] = Query(None, ge=100, le=50000),
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_admin),
+):
+    """
+    Exporta `users` o `professional_profiles` en streaming (transferencia chunked).
+    La cabecera X-Export-Cursor trae el cursor para la siguiente exportación
+    incremental (`since`); se conoce antes de enviar la primera fila.
+    """
+    try:
+        ExportService.check_format(format)
+        plan = ExportService.plan(db, table, since=since)
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{ExportService.filename(plan, format, gzip)}"',
+        "Cache-Control": "no-store",
+    }
+    if plan.next_cursor:
+        headers["X-Export-Cursor"] = plan.next_cursor
+    return StreamingResponse(
+        ExportService.stream(plan, format, gzip=gzip, batch_size=batch_size),
+        media_type=ExportService.media_type(format, gzip),
+        headers=headers,
+    )
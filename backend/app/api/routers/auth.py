@@ -2,8 +2,13 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from backend.app.api.deps import get_db
+from backend.app.api.deps import get_db, get_current_user
+from backend.app.api.responses import json_response
+from backend.app.core.hashing_pool import HashingPoolBusy
+from backend.app.core.token_cache import get_token_cache
+from backend.app.models.user import User
 from backend.app.schemas.auth import (
     RegisterRequest,
     RegisterResponse,
@@ -13,29 +18,56 @@ from backend.app.schemas.auth import (
 from backend.app.schemas.user import user_to_out
 from backend.app.schemas.professional import prof_to_out
 from backend.app.services.auth_service import AuthService
+from backend.app.services.indexing_service import IndexingService
 
 router = APIRouter()
 
+# register/login son async aunque usen la Session síncrona: bcrypt (hashing_pool)
+# se espera sin ocupar un hilo del threadpool durante ~250 ms, así la saturación
+# se traduce en HashingPoolBusy (503) y no en un threadpool agotado. Las
+# consultas y el commit sí van al threadpool (run_in_threadpool).
+
 
 @router.post("/register", response_model=RegisterResponse)
-def register(body: RegisterRequest, db: Session = Depends(get_db)):
+async def register(body: RegisterRequest, db: Session = Depends(get_db)):
     try:
-        user, prof = AuthService.register(db, body)
+        user, prof = await AuthService.register_offloaded(db, body)
+        # Respuesta antes del commit: tras él los objetos expiran y leerlos
+        # costaría un SELECT por entidad
+        response = RegisterResponse.model_construct(user=user_to_out(user), professional=prof_to_out(prof))
         # Commit de la transacción al final del caso de uso
-        db.commit()
-        return RegisterResponse(user=user_to_out(user), professional=prof_to_out(prof))
+        await run_in_threadpool(db.commit)
+        if prof:
+            IndexingService.notify_worker()
+        return json_response(response)
     except ValueError as ve:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+    except HashingPoolBusy:
+        await run_in_threadpool(db.rollback)
+        raise
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(body: LoginRequest, db: Session = Depends(get_db)):
+async def login(body: LoginRequest, db: Session = Depends(get_db)):
     try:
-        token, user = AuthService.login(db, body)
-        return TokenResponse(access_token=token, user=user_to_out(user))
+        token, user = await AuthService.login_offloaded(db, body)
+        # Respuesta antes del commit (ver register)
+        response = TokenResponse.model_construct(access_token=token, user=user_to_out(user))
+        await run_in_threadpool(db.commit)
+        return json_response(response)
     except ValueError as ve:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(ve))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(ve))
+
+
+@router.post("/revoke-tokens", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_tokens(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Cierra todas las sesiones: invalida todos los tokens emitidos para el usuario.
+    """
+    version = AuthService.revoke_tokens(db, current_user)
+    db.commit()
+    get_token_cache().revoke_user(current_user.id, version)
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.api.deps import get_async_db, get_current_user_async
+from backend.app.api.responses import json_response
+from backend.app.core.hashing_pool import HashingPoolBusy
+from backend.app.core.token_cache import get_token_cache
+from backend.app.models.user import User
+from backend.app.schemas.auth import (
+    RegisterRequest,
+    RegisterResponse,
+    LoginRequest,
+    TokenResponse,
+)
+from backend.app.schemas.user import user_to_out
+from backend.app.schemas.professional import prof_to_out
+from backend.app.services.auth_service import AuthService
+from backend.app.services.indexing_service import IndexingService
+
+# Mismas rutas y contratos que routers/auth.py, sobre AsyncSession (DB_ASYNC=true)
+router = APIRouter()
+
+
+@router.post("/register", response_model=RegisterResponse)
+async def register(body: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
+    try:
+        user, prof = await AuthService.register_async(db, body)
+        await db.commit()
+        if prof:
+            IndexingService.notify_worker()
+        return json_response(RegisterResponse.model_construct(user=user_to_out(user), professional=prof_to_out(prof)))
+    except ValueError as ve:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+    except HashingPoolBusy:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(body: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    try:
+        token, user = await AuthService.login_async(db, body)
+        await db.commit()
+        return json_response(TokenResponse.model_construct(access_token=token, user=user_to_out(user)))
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(ve))
+
+
+@router.post("/revoke-tokens", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_tokens(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Cierra todas las sesiones: invalida todos los tokens emitidos para el usuario.
+    """
+    version = await AuthService.revoke_tokens_async(db, current_user)
+    await db.commit()
+    get_token_cache().revoke_user(current_user.id, version)
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from openai import OpenAI
 
 from backend.app.core.settings import get_settings
+from backend.app.integrations.openai_client import get_async_openai_client
 
 router = APIRouter()
 
@@ -13,12 +13,13 @@ class SessionRequest(BaseModel):
 
 
 @router.post("/session")
-def create_chatkit_session(req: SessionRequest):
+async def create_chatkit_session(req: SessionRequest):
     settings = get_settings()
     if not settings.OPENAI_API_KEY:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY no configurado")
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    session = client.beta.chatkit.sessions.create(
+    # Cliente async compartido: reutiliza conexiones y no ocupa un hilo del threadpool
+    client = get_async_openai_client()
+    session = await client.beta.chatkit.sessions.create(
         workflow={"id": req.workflow_id},
         user=req.user_id,
     )
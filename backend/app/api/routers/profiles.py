@@ -1,35 +1,200 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
-from backend.app.api.deps import get_db, get_current_user
+from backend.app.api.deps import get_db, get_current_principal, get_current_user
+from backend.app.api.http_cache import cached_json_response
+from backend.app.api.responses import json_list_response, json_response
+from backend.app.core import suggestions
+from backend.app.core.gazetteer import get_gazetteer
+from backend.app.core.geo import geo_fields, geo_fields_for_update
+from backend.app.core.normalization import normalize_city, normalize_profession
+from backend.app.core.profile_cache import ProfileCache
+from backend.app.core.token_cache import Principal
 from backend.app.models.user import User
+from backend.app.repositories.index_jobs import IndexJobRepository
 from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.schemas.index_job import IndexJobOut, index_job_to_out
 from backend.app.schemas.professional import (
     ProfessionalProfileOut,
     ProfessionalProfileIn,
+    HybridSearchResponse,
+    NearbySearchResponse,
+    ProfessionalSearchResponse,
+    SuggestResponse,
+    prof_to_hybrid_out,
+    prof_to_nearby_out,
     prof_to_out,
 )
-from backend.app.services.vector_store_service import VectorStoreService
+from backend.app.services.indexing_service import IndexingService
+from backend.app.services.ranking import HybridRanker
 
 router = APIRouter()
 
 
+@router.get("/search", response_model=ProfessionalSearchResponse)
+def search_profiles(
+    q: Optional[str] = Query(None, max_length=200, description="Texto libre (nombre, profesión, descripción)"),
+    profesion: Optional[str] = Query(None, max_length=255),
+    ciudad: Optional[str] = Query(None, max_length=128),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    facets: bool = True,
+    db: Session = Depends(get_db),
+):
+    """
+    Búsqueda local sobre professional_profiles (sin pasar por el Vector Store).
+    - Filtros exactos sobre profesion_normalizada / ciudad_normalizada
+    - Texto completo: tsvector + GIN (PostgreSQL) o FTS5 (SQLite)
+    - Paginación keyset con `cursor` opaco; facetas por ciudad y profesión
+    - La lista se serializa por tandas al enviarse (sin revalidar cada perfil)
+    """
+    profesion_normalizada = normalize_profession(profesion)
+    ciudad_normalizada = normalize_city(ciudad)
+    try:
+        items, next_cursor = ProfessionalRepository.search(
+            db,
+            q=q,
+            profesion_normalizada=profesion_normalizada,
+            ciudad_normalizada=ciudad_normalizada,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+    facet_out = None
+    if facets:
+        raw = ProfessionalRepository.facets(
+            db,
+            q=q,
+            profesion_normalizada=profesion_normalizada,
+            ciudad_normalizada=ciudad_normalizada,
+        )
+        facet_out = {k: [{"value": v, "count": n} for v, n in vals] for k, vals in raw.items()}
+
+    return json_list_response(
+        [prof_to_out(p) for p in items],
+        extra={"next_cursor": next_cursor, "facets": facet_out},
+    )
+
+
+@router.get("/search/hybrid", response_model=HybridSearchResponse)
+def hybrid_search_profiles(
+    q: Optional[str] = Query(None, max_length=200, description="Texto libre (nombre, profesión, descripción)"),
+    profesion: Optional[str] = Query(None, max_length=255),
+    ciudad: Optional[str] = Query(None, max_length=128),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """
+    Búsqueda híbrida: léxica local y semántica (Vector Store) en paralelo,
+    fusionadas en una sola lista (RRF o ponderada, HYBRID_FUSION) con boosts
+    por profesión/ciudad exactas y recencia. Si el Vector Store falla o tarda
+    más de HYBRID_VECTOR_TIMEOUT_S responde solo con la léxica (`degraded`).
+    `timings_ms` desglosa el tiempo por etapa (también en Server-Timing).
+    """
+    if not (q and q.strip()) and not profesion and not ciudad:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indique q, profesion o ciudad",
+        )
+    result = HybridRanker().search(
+        db,
+        q=q,
+        profesion=profesion,
+        ciudad=ciudad,
+        profesion_normalizada=normalize_profession(profesion),
+        ciudad_normalizada=normalize_city(ciudad),
+        limit=limit,
+    )
+    return json_list_response(
+        [prof_to_hybrid_out(r.profile, r.score, r.sources) for r in result.items],
+        extra={
+            "timings_ms": {k: round(v, 3) for k, v in result.timings_ms.items()},
+            "cached": result.cached,
+            "degraded": result.degraded,
+        },
+    )
+
+
+@router.get("/nearby", response_model=NearbySearchResponse)
+def nearby_profiles(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    ciudad: Optional[str] = Query(None, max_length=128, description="Centro por gazetteer si no hay lat/lon"),
+    barrio: Optional[str] = Query(None, max_length=128),
+    radius_km: float = Query(10.0, gt=0, le=200),
+    profesion: Optional[str] = Query(None, max_length=255),
+    q: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Profesionales más cercanos a un punto (lat/lon, o barrio/ciudad geocodificados
+    con el gazetteer offline), dentro de `radius_km` y ordenados por distancia.
+    Solo incluye perfiles con coordenadas.
+    """
+    if lat is None or lon is None:
+        point = get_gazetteer().geocode(ciudad, barrio)
+        if point is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Indique lat/lon o una ciudad conocida",
+            )
+        lat, lon = point
+    found = ProfessionalRepository.nearby(
+        db,
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        limit=limit,
+        q=q,
+        profesion_normalizada=normalize_profession(profesion),
+    )
+    return json_list_response(
+        [prof_to_nearby_out(p, d) for p, d in found],
+        extra={"center": {"lat": lat, "lon": lon}},
+    )
+
+
+@router.get("/suggest", response_model=SuggestResponse, response_model_exclude_none=True)
+def suggest(
+    q: str = Query(..., min_length=1, max_length=64, description="Lo escrito hasta ahora"),
+    field: Optional[Literal["profesion", "ciudad"]] = Query(None, description="Solo un campo (por defecto ambos)"),
+    limit: int = Query(8, ge=1, le=20),
+):
+    """
+    Autocompletado de profesiones y ciudades por prefijo de cualquier palabra,
+    sin tildes ni mayúsculas, ordenado por número de perfiles.
+    Servido desde un índice en memoria (sin consultar la BD por pulsación).
+    """
+    fields = (field,) if field else tuple(suggestions.FIELDS)
+    return json_response(suggestions.suggest(q, fields, limit))
+
+
 @router.get("/me", response_model=ProfessionalProfileOut)
 def get_my_profile(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Devuelve el perfil profesional del usuario autenticado.
     404 si no existe perfil (no profesional).
+    Respuesta servida desde caché con ETag; If-None-Match -> 304.
     """
-    prof = ProfessionalRepository.get_by_user_id(db, current_user.id)
-    if not prof:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
-    out = prof_to_out(prof)
-    if not out:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error al serializar perfil")
-    return out
+    cached = ProfileCache.get_for_user(current_user.id)
+    if cached is None:
+        prof = ProfessionalRepository.get_by_user_id(db, current_user.id)
+        if not prof:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+        out = prof_to_out(prof)
+        if not out:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error al serializar perfil")
+        cached = ProfileCache.store(prof, out.model_dump_json().encode())
+    return cached_json_response(request, cached)
 
 
 @router.put("/me", response_model=ProfessionalProfileOut)
@@ -40,14 +205,16 @@ def upsert_my_profile(
 ):
     """
     Crea o actualiza el perfil profesional del usuario autenticado.
-    - Normaliza campos (profesión/ciudad)
-    - Reindexa sincrónicamente en el Vector Store (devuelve 500 si la indexación falla)
+    - Normaliza campos (profesión/ciudad) y geocodifica barrio/ciudad si no vienen lat/lon
+      (al actualizar, solo si cambian; si no, conserva las coordenadas guardadas)
+    - Encola la reindexación en el Vector Store (outbox); el worker escribe
+      vector_store_file_id al terminar. Ver GET /me/index-status.
+    - Si el documento indexable no cambió (misma huella), no se reindexa.
     """
-    profesion_normalizada = body.profesion_principal.strip().lower() if body.profesion_principal else None
-    ciudad_normalizada = body.ciudad.strip().lower() if body.ciudad else None
+    profesion_normalizada = normalize_profession(body.profesion_principal)
+    ciudad_normalizada = normalize_city(body.ciudad)
 
     prof = ProfessionalRepository.get_by_user_id(db, current_user.id)
-    created = False
     if not prof:
         # Crear perfil si no existía
         prof = ProfessionalRepository.create(
@@ -62,12 +229,11 @@ def upsert_my_profile(
             descripcion_breve=body.descripcion_breve,
             profesion_normalizada=profesion_normalizada,
             ciudad_normalizada=ciudad_normalizada,
+            **geo_fields(body.ciudad, body.barrio, body.lat, body.lon),
         )
-        created = True
     else:
         # Actualizar campos existentes
-        from backend.app.repositories.professionals import ProfessionalRepository as _PR
-        _PR.update(
+        ProfessionalRepository.update(
             db,
             prof,
             nombre_completo=body.nombre_completo,
@@ -79,23 +245,54 @@ def upsert_my_profile(
             descripcion_breve=body.descripcion_breve,
             profesion_normalizada=profesion_normalizada,
             ciudad_normalizada=ciudad_normalizada,
+            **geo_fields_for_update(prof, body.ciudad, body.barrio, body.lat, body.lon),
         )
 
-    # Reindexar en Vector Store (sincrónico para consistencia)
-    from backend.app.schemas.professional import build_prof_json_for_vector_store
-    doc = build_prof_json_for_vector_store(prof, user_id=current_user.id)
+    # Encolar reindexación en la misma transacción que el cambio del perfil
+    # (solo si el documento indexado cambia: los autosave sin cambios no generan job)
     try:
-        file_id = VectorStoreService.add_or_update_professional(doc, prof_id=prof.id)
-        from backend.app.repositories.professionals import ProfessionalRepository as _PR2
-        _PR2.update(db, prof, vector_store_file_id=file_id)
+        job = IndexingService.enqueue_upsert_if_changed(db, prof)
         db.commit()
     except Exception as e:
         db.rollback()
-        # Si se creó el perfil nuevo y falla el indexing, el perfil quedará sin vector_store_file_id
-        # pero mantenemos consistencia devolviendo error; el cliente puede reintentar.
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Indexación falló: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"No se pudo guardar el perfil: {str(e)}")
+    if job is not None:
+        IndexingService.notify_worker()
 
     out = prof_to_out(prof)
     if not out:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error al serializar perfil")
-    return out
\ No newline at end of file
+    return json_response(out)
+
+
+@router.get("/me/index-status", response_model=IndexJobOut)
+def get_my_index_status(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Estado del último job de indexación del perfil del usuario autenticado.
+    404 si no hay perfil o nunca se encoló indexación.
+    """
+    prof = ProfessionalRepository.get_by_user_id(db, current_user.id)
+    if not prof:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+    job = IndexJobRepository.latest_for_prof(db, prof.id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sin jobs de indexación")
+    return index_job_to_out(job)
+
+
+@router.get("/index-jobs/{job_id}", response_model=IndexJobOut)
+def get_index_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Estado de un job de indexación concreto (solo del propio usuario).
+    """
+    job = IndexJobRepository.get_by_id(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job no encontrado")
+    return index_job_to_out(job)
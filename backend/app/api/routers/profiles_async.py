@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.api.deps import get_async_db, get_current_principal_async, get_current_user_async
+from backend.app.api.http_cache import cached_json_response
+from backend.app.api.responses import json_response
+from backend.app.core.geo import geo_fields, geo_fields_for_update
+from backend.app.core.normalization import normalize_city, normalize_profession
+from backend.app.core.profile_cache import ProfileCache
+from backend.app.core.token_cache import Principal
+from backend.app.models.user import User
+from backend.app.repositories.professionals import AsyncProfessionalRepository
+from backend.app.schemas.professional import (
+    ProfessionalProfileOut,
+    ProfessionalProfileIn,
+    prof_to_out,
+)
+from backend.app.services.indexing_service import IndexingService
+
+# Variante async de GET/PUT /me (DB_ASYNC=true); el resto de /profiles sigue en routers/profiles.py
+router = APIRouter()
+
+
+@router.get("/me", response_model=ProfessionalProfileOut)
+async def get_my_profile(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async),
+):
+    """
+    Devuelve el perfil profesional del usuario autenticado.
+    404 si no existe perfil (no profesional).
+    Respuesta servida desde caché con ETag; If-None-Match -> 304.
+    """
+    cached = ProfileCache.get_for_user(current_user.id)
+    if cached is None:
+        prof = await AsyncProfessionalRepository.get_by_user_id(db, current_user.id)
+        if not prof:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+        cached = ProfileCache.store(prof, prof_to_out(prof).model_dump_json().encode())
+    return cached_json_response(request, cached)
+
+
+@router.put("/me", response_model=ProfessionalProfileOut)
+async def upsert_my_profile(
+    body: ProfessionalProfileIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Crea o actualiza el perfil profesional del usuario autenticado y encola
+    la reindexación (outbox) en la misma transacción, salvo que el documento
+    indexable no haya cambiado.
+    """
+    fields = dict(
+        nombre_completo=body.nombre_completo,
+        profesion_principal=body.profesion_principal,
+        ciudad=body.ciudad,
+        barrio=body.barrio,
+        telefono=body.telefono,
+        email=body.email if body.email else current_user.email,
+        descripcion_breve=body.descripcion_breve,
+        profesion_normalizada=normalize_profession(body.profesion_principal),
+        ciudad_normalizada=normalize_city(body.ciudad),
+    )
+
+    try:
+        prof = await AsyncProfessionalRepository.get_by_user_id(db, current_user.id)
+        if not prof:
+            geo = geo_fields(body.ciudad, body.barrio, body.lat, body.lon)
+            prof = await AsyncProfessionalRepository.create(db, user_id=current_user.id, **fields, **geo)
+        else:
+            # Sin lat/lon ni cambio de ciudad/barrio se conservan las coordenadas guardadas
+            geo = geo_fields_for_update(prof, body.ciudad, body.barrio, body.lat, body.lon)
+            await AsyncProfessionalRepository.update(db, prof, **fields, **geo)
+        # IndexJobRepository es síncrono: se ejecuta sobre la misma conexión vía run_sync
+        job = await db.run_sync(lambda s: IndexingService.enqueue_upsert_if_changed(s, prof))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"No se pudo guardar el perfil: {str(e)}")
+    if job is not None:
+        IndexingService.notify_worker()
+    return json_response(prof_to_out(prof))
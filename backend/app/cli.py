@@ -0,0 +1,207 @@
+"""
+Comandos de mantenimiento del backend.
+
+Uso (desde la raíz del proyecto):
+    python -m backend.app.cli <comando> [opciones]
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from backend.app.db.session import SessionLocal, init_db
+
+
+def _cmd_rebuild_vector_mapping(args: argparse.Namespace) -> int:
+    from backend.app.services.indexing_service import IndexingService
+
+    db = SessionLocal()
+    try:
+        stats = IndexingService.rebuild_file_mapping(db, delete_duplicates=args.delete_duplicates)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(json.dumps(stats, ensure_ascii=False))
+    return 0
+
+
+def _cmd_import_professionals(args: argparse.Namespace) -> int:
+    from backend.app.services.bulk_import import BulkImportService
+
+    fmt = args.format or args.path.rsplit(".", 1)[-1].lower()
+    db = SessionLocal()
+    try:
+        with open(args.path, "r", encoding="utf-8-sig", newline="") as fh:
+            result = BulkImportService.run(
+                db,
+                BulkImportService.iter_rows(fh, fmt),
+                batch_size=args.batch_size,
+                index_mode=args.index,
+                hash_workers=args.hash_workers,
+            )
+    finally:
+        db.close()
+    print(result.model_dump_json(indent=2))
+    return 0 if not result.invalid else 2
+
+
+def _cmd_reconcile(args: argparse.Namespace) -> int:
+    from backend.app.services.reconciliation import ReconciliationService
+
+    db = SessionLocal()
+    try:
+        if args.reset:
+            ReconciliationService.reset(db)
+            db.commit()
+        stats = {
+            "profiles": ReconciliationService.reconcile_profiles(
+                db, batch_size=args.batch_size, max_rows=args.max_rows, dry_run=args.dry_run
+            ),
+            "mappings": ReconciliationService.reconcile_stale_mappings(db, batch_size=args.batch_size, dry_run=args.dry_run),
+        }
+        if not args.no_gc:
+            stats["vector_gc"] = ReconciliationService.collect_orphan_files(
+                db, max_pages=args.gc_pages, min_age_s=args.min_age_s, dry_run=args.dry_run
+            )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(json.dumps(stats, ensure_ascii=False))
+    return 0
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    from backend.app.repositories.sync_watermarks import SyncWatermarkRepository
+    from backend.app.services.export import ExportService
+
+    watermark = f"export:{args.table}"
+    db = SessionLocal()
+    try:
+        since = args.since
+        if args.incremental and since is None:
+            wm = SyncWatermarkRepository.get(db, watermark)
+            since = wm.cursor if wm else None
+        try:
+            ExportService.check_format(args.format)
+            plan = ExportService.plan(db, args.table, since=since)
+        except ValueError as ve:
+            print(str(ve), file=sys.stderr)
+            return 2
+        # La lectura va por una sesión propia: no retener la transacción de la planificación
+        db.rollback()
+
+        out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+        try:
+            size = 0
+            for chunk in ExportService.stream(plan, args.format, gzip=args.gzip, batch_size=args.batch_size):
+                out.write(chunk)
+                size += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+
+        if args.incremental and plan.next_cursor:
+            SyncWatermarkRepository.set_cursor(db, watermark, plan.next_cursor)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    summary = {"table": args.table, "format": args.format, "bytes": size, "cursor": plan.next_cursor}
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr if args.out == "-" else sys.stdout)
+    return 0
+
+
+def _cmd_jwt_keygen(args: argparse.Namespace) -> int:
+    import os
+
+    from backend.app.core.tokens import asymmetric_key, generate_private_key_pem
+
+    pem = generate_private_key_pem(args.alg)
+    os.makedirs(args.dir, exist_ok=True)
+    path = os.path.join(args.dir, f"{args.kid}.pem")
+    if os.path.exists(path):
+        print(f"Ya existe {path}", file=sys.stderr)
+        return 1
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(pem)
+    print(json.dumps({"path": path, "jwk": asymmetric_key(args.kid, pem).jwk}, ensure_ascii=False))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="backend.app.cli", description="Comandos de mantenimiento")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser(
+        "rebuild-vector-mapping",
+        help="Reconstruye el mapeo prof_id -> file_id recorriendo todo el Vector Store",
+    )
+    p.add_argument("--delete-duplicates", action="store_true", help="Borra archivos duplicados por profesional")
+    p.set_defaults(func=_cmd_rebuild_vector_mapping)
+
+    p = sub.add_parser("import-professionals", help="Importa profesionales desde CSV/JSONL por lotes")
+    p.add_argument("path", help="Ruta del archivo .csv o .jsonl")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="Por defecto según la extensión")
+    p.add_argument("--batch-size", type=int, default=None, help="Filas por lote (IMPORT_BATCH_SIZE)")
+    p.add_argument(
+        "--index",
+        choices=["packed", "outbox", "none"],
+        default="packed",
+        help="packed: JSONL multi-registro por lote; outbox: jobs para el worker; none: sin indexar",
+    )
+    p.add_argument("--hash-workers", type=int, default=None, help="Hilos para bcrypt (IMPORT_HASH_WORKERS)")
+    p.set_defaults(func=_cmd_import_professionals)
+
+    p = sub.add_parser(
+        "reconcile",
+        help="Reindexa perfiles modificados desde la última pasada y recoge archivos huérfanos",
+    )
+    p.add_argument("--batch-size", type=int, default=None, help="Perfiles por página (RECONCILE_BATCH_SIZE)")
+    p.add_argument("--max-rows", type=int, default=None, help="Máximo de perfiles a revisar en esta pasada")
+    p.add_argument("--no-gc", action="store_true", help="No recorrer el Vector Store en busca de huérfanos")
+    p.add_argument("--gc-pages", type=int, default=None, help="Páginas del store por pasada (RECONCILE_GC_MAX_PAGES)")
+    p.add_argument("--min-age-s", type=float, default=None, help="Antigüedad mínima de un huérfano para borrarlo")
+    p.add_argument("--dry-run", action="store_true", help="Solo informa; no encola, no borra ni avanza marcas")
+    p.add_argument("--reset", action="store_true", help="Reinicia las marcas de agua (recorrido completo)")
+    p.set_defaults(func=_cmd_reconcile)
+
+    p = sub.add_parser("export", help="Exporta users o professional_profiles a NDJSON/CSV/Parquet")
+    p.add_argument("table", choices=["users", "professional_profiles"])
+    p.add_argument("--format", choices=["ndjson", "csv", "parquet"], default="ndjson")
+    p.add_argument("--gzip", action="store_true", help="Comprime NDJSON/CSV; en Parquet usa el códec gzip")
+    p.add_argument("--out", default="-", help="Archivo de salida (por defecto stdout)")
+    p.add_argument("--since", default=None, help="Cursor de una exportación anterior")
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Continúa desde el cursor guardado (marca de agua export:<tabla>) y lo avanza al terminar",
+    )
+    p.add_argument("--batch-size", type=int, default=None, help="Filas por lote (EXPORT_BATCH_SIZE)")
+    p.set_defaults(func=_cmd_export)
+
+    p = sub.add_parser("jwt-keygen", help="Genera una clave privada ES256/EdDSA para el llavero JWT")
+    p.add_argument("--alg", choices=["ES256", "EdDSA"], default="ES256")
+    p.add_argument("--kid", required=True, help="Identificador de la clave (nombre del archivo, p. ej. 2026-10)")
+    p.add_argument("--dir", required=True, help="Directorio del llavero (JWT_KEYS_DIR)")
+    p.set_defaults(func=_cmd_jwt_keygen, needs_db=False)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "needs_db", True):
+        init_db()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
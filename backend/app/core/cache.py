@@ -0,0 +1,169 @@
+"""
+Capa de caché de bytes con backends intercambiables (CACHE_BACKEND):
+
+- "memory":    LRU + TTL en proceso (por defecto)
+- "redis":     cualquier servidor compatible con Redis (paquete `redis`, CACHE_REDIS_URL)
+- "fakeredis": servidor Redis simulado en proceso (paquete `fakeredis`), para desarrollo/tests
+- "none":      desactivada
+
+Todos los backends exponen get/set/delete sobre claves str y valores bytes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+
+_cache_requests = registry.counter(
+    "cache_requests_total",
+    "Lecturas de caché por resultado",
+    ["cache", "result"],
+)
+
+
+class CacheBackend:
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl_s: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl_s: Optional[float] = None) -> None:
+        return None
+
+    def delete(self, *keys: str) -> None:
+        return None
+
+
+class LRUCache(CacheBackend):
+    """LRU acotado por número de entradas, con TTL opcional por entrada. Thread-safe."""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_s: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl_s if ttl_s else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Adaptador para un cliente compatible con redis-py (redis.Redis, fakeredis.FakeRedis, ...).
+    Los errores de conexión se degradan a miss: la caché nunca tumba una lectura.
+    """
+
+    def __init__(self, client: Any, prefix: str = "directorio:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(self.prefix + key)
+        except Exception:
+            return None
+
+    def set(self, key: str, value: bytes, ttl_s: Optional[float] = None) -> None:
+        try:
+            self.client.set(self.prefix + key, value, px=int(ttl_s * 1000) if ttl_s else None)
+        except Exception:
+            pass
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self.client.delete(*(self.prefix + k for k in keys))
+        except Exception:
+            pass
+
+
+class InstrumentedCache(CacheBackend):
+    """Envuelve un backend y cuenta hits/misses por nombre lógico de caché."""
+
+    def __init__(self, backend: CacheBackend, name: str) -> None:
+        self.backend = backend
+        self.name = name
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.backend.get(key)
+        _cache_requests.inc(cache=self.name, result="hit" if value is not None else "miss")
+        return value
+
+    def set(self, key: str, value: bytes, ttl_s: Optional[float] = None) -> None:
+        self.backend.set(key, value, ttl_s)
+
+    def delete(self, *keys: str) -> None:
+        self.backend.delete(*keys)
+
+
+def _build_backend() -> CacheBackend:
+    settings = get_settings()
+    kind = settings.CACHE_BACKEND
+    if kind == "none":
+        return NullCache()
+    if kind == "redis":
+        import redis  # dependencia opcional
+
+        return RedisCache(redis.Redis.from_url(settings.CACHE_REDIS_URL), prefix=settings.CACHE_KEY_PREFIX)
+    if kind == "fakeredis":
+        import fakeredis  # dependencia opcional (desarrollo/tests)
+
+        return RedisCache(fakeredis.FakeRedis(), prefix=settings.CACHE_KEY_PREFIX)
+    return LRUCache(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Backend compartido del proceso (creado perezosamente según CACHE_BACKEND)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend()
+    return _backend
+
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """Reemplaza el backend del proceso (p. ej. un fake en pruebas); None vuelve al de Settings."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
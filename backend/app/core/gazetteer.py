@@ -0,0 +1,72 @@
+"""
+Geocodificación offline de barrio/ciudad con un gazetteer incluido en el repo
+(resources/gazetteer_co.csv: ciudad, barrio, lat, lon).
+
+Las claves se normalizan como los filtros de búsqueda (normalize_city para la
+ciudad, fold para el barrio), así "Medellín"/"medellin"/"Medellin, Antioquia"
+caen en la misma entrada. Sin coincidencia de barrio se usa el centroide de la
+ciudad. GAZETTEER_PATH añade o sobrescribe entradas con el mismo formato.
+"""
+import csv
+import os
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from backend.app.core.normalization import fold, normalize_city
+
+BUNDLED_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "gazetteer_co.csv")
+
+Point = Tuple[float, float]
+
+
+def _read(path: str) -> Iterator[Tuple[str, str, float, float]]:
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        rows = csv.DictReader(line for line in fh if line.strip() and not line.lstrip().startswith("#"))
+        for row in rows:
+            yield row["ciudad"], row.get("barrio") or "", float(row["lat"]), float(row["lon"])
+
+
+class Gazetteer:
+    def __init__(self) -> None:
+        # (ciudad normalizada, barrio plegado | None) -> (lat, lon)
+        self._points: Dict[Tuple[str, Optional[str]], Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def load(self, path: str) -> "Gazetteer":
+        for ciudad, barrio, lat, lon in _read(path):
+            city = normalize_city(ciudad)
+            if city:
+                self._points[(city, fold(barrio))] = (lat, lon)
+        return self
+
+    def geocode(self, ciudad: Optional[str], barrio: Optional[str] = None) -> Optional[Point]:
+        city = normalize_city(ciudad)
+        if not city:
+            return None
+        hood = fold(barrio)
+        if hood:
+            point = self._points.get((city, hood))
+            if point is not None:
+                return point
+        return self._points.get((city, None))
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                from backend.app.core.settings import get_settings
+
+                gazetteer = Gazetteer().load(BUNDLED_PATH)
+                extra = get_settings().GAZETTEER_PATH
+                if extra:
+                    gazetteer.load(extra)
+                _gazetteer = gazetteer
+    return _gazetteer
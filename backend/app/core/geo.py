@@ -0,0 +1,148 @@
+"""
+Geometría para la búsqueda por cercanía: geohash, distancias y coberturas.
+
+El geohash (base32, intercalando bits de longitud y latitud) ordena los puntos
+de forma que cada celda es un rango contiguo de cadenas: con un índice B-tree
+sobre professional_profiles.geohash, "puntos de esta celda" es un range scan
+(`geohash >= celda AND geohash < celda + "~"`). Una búsqueda en radio cubre su
+caja envolvente con unas pocas celdas y filtra por distancia real (haversine).
+"""
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+GEOHASH_PRECISION = 9  # ~4.8 m x 4.8 m; se almacena a esta precisión
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Mayor que cualquier carácter de _BASE32: límite superior de un rango de prefijo
+PREFIX_END = "~"
+# kNN sin índice nativo: primer radio de búsqueda, que se multiplica por
+# KNN_GROWTH hasta reunir suficientes candidatos o llegar al radio pedido
+KNN_INITIAL_RADIUS_KM = 2.0
+KNN_GROWTH = 4.0
+# Candidatos pre-ordenados en la BD por cada resultado pedido
+KNN_OVERFETCH = 4
+
+
+def encode_geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars: List[str] = []
+    bits = 0
+    n = 0
+    even = True  # los bits pares son de longitud
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                n = (n << 1) | 1
+                lon_lo = mid
+            else:
+                n <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                n = (n << 1) | 1
+                lat_lo = mid
+            else:
+                n <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[n])
+            bits = n = 0
+    return "".join(chars)
+
+
+def cell_size_deg(precision: int) -> Tuple[float, float]:
+    """(alto en grados de latitud, ancho en grados de longitud) de una celda."""
+    total = 5 * precision
+    lon_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) que contiene el círculo (sin cruzar el antimeridiano)."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, radius_km / (KM_PER_DEG_LAT * cos_lat))
+    return max(-90.0, lat - dlat), min(90.0, lat + dlat), max(-180.0, lon - dlon), min(180.0, lon + dlon)
+
+
+def covering_cells(lat: float, lon: float, radius_km: float, max_cells: int = 64) -> List[str]:
+    """
+    Prefijos geohash cuya unión contiene el círculo: la precisión más fina que
+    lo cubre con como mucho `max_cells` celdas. Más celdas = más rangos en la
+    consulta pero menos área sobrante que leer (el vecindario fijo de 3x3
+    llega a leer ~8 veces el área del círculo).
+    """
+    lat_min, lat_max, lon_min, lon_max = bounding_box(lat, lon, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        h, w = cell_size_deg(precision)
+        rows = int(math.floor(lat_max / h) - math.floor(lat_min / h)) + 1
+        cols = int(math.floor(lon_max / w) - math.floor(lon_min / w)) + 1
+        if rows * cols > max_cells and precision > 1:
+            continue
+        cells = set()
+        for i in range(rows):
+            # Centro de cada celda de la rejilla (evita ambigüedades en los bordes)
+            cell_lat = min(89.999999, (math.floor(lat_min / h) + i + 0.5) * h)
+            for j in range(cols):
+                cell_lon = min(179.999999, (math.floor(lon_min / w) + j + 0.5) * w)
+                cells.add(encode_geohash(cell_lat, cell_lon, precision))
+        return sorted(cells)
+    return [""]
+
+
+def geo_fields(
+    ciudad: Optional[str],
+    barrio: Optional[str],
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Optional[object]]:
+    """
+    Columnas lat/lon/geohash de un perfil: coordenadas explícitas si vienen
+    (p. ej. un pin en el mapa); si no, el gazetteer por barrio/ciudad.
+    """
+    if lat is None or lon is None:
+        from backend.app.core.gazetteer import get_gazetteer
+
+        point = get_gazetteer().geocode(ciudad, barrio)
+        lat, lon = point if point else (None, None)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "geohash": encode_geohash(lat, lon) if lat is not None and lon is not None else None,
+    }
+
+
+def geo_fields_for_update(
+    prof: Any,
+    ciudad: Optional[str],
+    barrio: Optional[str],
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> Dict[str, Optional[object]]:
+    """
+    Como geo_fields, pero para actualizar `prof`: solo las columnas a cambiar.
+    Sin coordenadas explícitas se conservan las guardadas salvo que cambie
+    ciudad/barrio, y un fallo del gazetteer nunca borra las existentes.
+    """
+    if lat is not None and lon is not None:
+        return geo_fields(ciudad, barrio, lat, lon)
+    if (ciudad, barrio) == (prof.ciudad, prof.barrio):
+        return {}
+    geo = geo_fields(ciudad, barrio)
+    return geo if geo["lat"] is not None else {}
@@ -0,0 +1,162 @@
+"""
+Pool acotado de procesos para bcrypt (hash/verify).
+
+bcrypt es CPU-bound (~250 ms por llamada): ejecutarlo en los hilos de request
+agota el threadpool de Starlette y bloquea health checks y lecturas. Aquí se
+ejecuta en un ProcessPoolExecutor de tamaño fijo con una cola acotada; si la
+cola está llena se rechaza de inmediato (HashingPoolBusy -> 503 + Retry-After)
+en lugar de encolar hilos de request detrás del hashing.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional, Tuple
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+from backend.app.core.tracing import record_span
+
+_hash_seconds = registry.histogram(
+    "password_hash_seconds",
+    "Duración de operaciones bcrypt (incluye espera en cola)",
+    ["op"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0),
+)
+_hash_rejected = registry.counter(
+    "password_hash_rejected_total",
+    "Operaciones bcrypt rechazadas por pool lleno o timeout",
+    ["op", "reason"],
+)
+_hash_inflight = registry.gauge(
+    "password_hash_inflight",
+    "Operaciones bcrypt en ejecución o en cola",
+)
+
+
+class HashingPoolBusy(Exception):
+    """El pool de hashing está saturado; el cliente debe reintentar."""
+
+    def __init__(self, retry_after_s: int = 1) -> None:
+        super().__init__("Servicio de autenticación saturado, reintenta en unos segundos")
+        self.retry_after_s = retry_after_s
+
+
+# -------------------------
+# Funciones ejecutadas en los procesos hijo (deben ser picklables)
+# -------------------------
+def _ctx():
+    from backend.app.core.security import _pwd_context
+
+    return _pwd_context
+
+
+def _do_hash(password: str) -> str:
+    return _ctx().hash(password)
+
+
+def _do_verify(password: str, hashed: str) -> bool:
+    return _ctx().verify(password, hashed)
+
+
+def _do_verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    # Rehash si el hash usa un esquema/cost deprecado (deprecated="auto")
+    return _ctx().verify_and_update(password, hashed)
+
+
+class HashingPool:
+    def __init__(self) -> None:
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> Optional[ProcessPoolExecutor]:
+        settings = get_settings()
+        if settings.HASHING_POOL_WORKERS <= 0:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._slots = threading.BoundedSemaphore(
+                        settings.HASHING_POOL_WORKERS + settings.HASHING_POOL_MAX_PENDING
+                    )
+                    # spawn: evita heredar locks de hilos del proceso padre (fork + threads)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=settings.HASHING_POOL_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def submit(self, op: str, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        executor = self._ensure()
+        if executor is None:
+            # Modo inline (HASHING_POOL_WORKERS=0): útil en desarrollo/tests
+            fut: "Future[Any]" = Future()
+            try:
+                fut.set_result(fn(*args))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+
+        assert self._slots is not None
+        if not self._slots.acquire(blocking=False):
+            _hash_rejected.inc(op=op, reason="queue_full")
+            raise HashingPoolBusy()
+        _hash_inflight.inc()
+        try:
+            fut = executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            _hash_inflight.dec()
+            raise
+
+        def _release(_f: "Future[Any]") -> None:
+            self._slots.release()
+            _hash_inflight.dec()
+
+        fut.add_done_callback(_release)
+        return fut
+
+    def run(self, op: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta y espera. Respeta HASHING_POOL_TIMEOUT_S. El hilo que llama queda
+        bloqueado toda la operación: las rutas HTTP usan run_async (también las
+        de auth sobre la Session síncrona); esto queda para CLI y scripts.
+        """
+        start = time.perf_counter()
+        fut = self.submit(op, fn, *args)
+        try:
+            return fut.result(timeout=get_settings().HASHING_POOL_TIMEOUT_S)
+        except FutureTimeout:
+            _hash_rejected.inc(op=op, reason="timeout")
+            raise HashingPoolBusy()
+        finally:
+            elapsed = time.perf_counter() - start
+            _hash_seconds.observe(elapsed, op=op)
+            record_span("bcrypt", elapsed)
+
+    async def run_async(self, op: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Variante para rutas async: no bloquea el event loop ni un hilo del threadpool."""
+        start = time.perf_counter()
+        fut = self.submit(op, fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout=get_settings().HASHING_POOL_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            _hash_rejected.inc(op=op, reason="timeout")
+            raise HashingPoolBusy()
+        finally:
+            elapsed = time.perf_counter() - start
+            _hash_seconds.observe(elapsed, op=op)
+            record_span("bcrypt", elapsed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._slots = None
+
+
+# Pool de proceso (se crea perezosamente en la primera operación)
+hashing_pool = HashingPool()
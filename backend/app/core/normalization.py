@@ -0,0 +1,108 @@
+"""
+Normalización de campos de búsqueda (profesión/ciudad) compartida por
+registro, actualización de perfil, importación masiva y filtros de búsqueda.
+
+- Plegado Unicode (NFKD + casefold) y eliminación de tildes: "Medellín" -> "medellin".
+- Puntuación y espacios repetidos colapsados: "Bogotá, D.C." -> "bogota d c".
+- Sinónimos a una forma canónica: "fontanero" -> "plomero", "bogota d c" -> "bogota".
+  NORMALIZATION_SYNONYMS_PATH (JSON {"profesion": {...}, "ciudad": {...}}) amplía
+  las listas incluidas.
+
+Las erratas ("Medelin") no se corrigen al escribir: se resuelven al buscar con
+el índice de trigramas (ver db/trigram.py).
+"""
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+PROFESSION_SYNONYMS: Dict[str, str] = {
+    "fontanero": "plomero",
+    "fontanera": "plomero",
+    "plomera": "plomero",
+    "gasfiter": "plomero",
+    "gasfitero": "plomero",
+    "electricista residencial": "electricista",
+    "tecnico electricista": "electricista",
+    "abogada": "abogado",
+    "contadora": "contador",
+    "contador publico": "contador",
+    "contadora publica": "contador",
+    "mecanica": "mecanico",
+    "mecanico automotriz": "mecanico",
+    "carpintera": "carpintero",
+    "ebanista": "carpintero",
+    "pintora": "pintor",
+    "disenadora": "disenador",
+    "disenador grafico": "disenador",
+    "disenadora grafica": "disenador",
+    "medica": "medico",
+    "doctor": "medico",
+    "doctora": "medico",
+    "odontologa": "odontologo",
+    "dentista": "odontologo",
+    "psicologa": "psicologo",
+    "profesora": "profesor",
+    "docente": "profesor",
+    "enfermero": "enfermeria",
+    "enfermera": "enfermeria",
+}
+
+CITY_SYNONYMS: Dict[str, str] = {
+    "bogota d c": "bogota",
+    "bogota dc": "bogota",
+    "santa fe de bogota": "bogota",
+    "santafe de bogota": "bogota",
+    "santiago de cali": "cali",
+    "cartagena de indias": "cartagena",
+    "san jose de cucuta": "cucuta",
+    "medellin antioquia": "medellin",
+}
+
+
+def fold(value: Optional[str]) -> Optional[str]:
+    """
+    Minúsculas, sin tildes (ñ -> n, como el tokenizador FTS) ni puntuación,
+    espacios colapsados. None/vacío -> None.
+    """
+    if not value:
+        return None
+    text = unicodedata.normalize("NFKD", value).casefold()
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _NON_ALNUM.sub(" ", text).strip()
+    return text or None
+
+
+@lru_cache(maxsize=1)
+def _synonyms() -> Dict[str, Dict[str, str]]:
+    from backend.app.core.settings import get_settings
+
+    out = {"profesion": dict(PROFESSION_SYNONYMS), "ciudad": dict(CITY_SYNONYMS)}
+    path = get_settings().NORMALIZATION_SYNONYMS_PATH
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            extra = json.load(fh)
+        for kind in out:
+            for variant, canonical in (extra.get(kind) or {}).items():
+                key, value = fold(variant), fold(canonical)
+                if key and value:
+                    out[kind][key] = value
+    return out
+
+
+def normalize_field(value: Optional[str]) -> Optional[str]:
+    """Plegado genérico (sin sinónimos)."""
+    return fold(value)
+
+
+def normalize_profession(value: Optional[str]) -> Optional[str]:
+    folded = fold(value)
+    return _synonyms()["profesion"].get(folded, folded) if folded else None
+
+
+def normalize_city(value: Optional[str]) -> Optional[str]:
+    folded = fold(value)
+    return _synonyms()["ciudad"].get(folded, folded) if folded else None
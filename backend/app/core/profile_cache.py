@@ -0,0 +1,104 @@
+"""
+Caché read-through de perfiles profesionales serializados (ProfessionalProfileOut en JSON).
+
+Claves:
+- profile:body:<prof_id>:<hash>  -> bytes JSON de la respuesta
+- profile:user:<user_id> / profile:id:<prof_id> -> puntero {"k": clave body, "e": etag}
+
+El ETag y la clave del cuerpo son un hash del contenido: dos versiones con el
+mismo updated_at (precisión de segundos en SQLite, o escrituras de indexación
+que no lo mueven) nunca comparten cuerpo ni ETag. Las escrituras vía
+ProfessionalRepository invalidan los punteros al hacer flush y otra vez tras el
+commit; un lector concurrente que repoble con datos previos queda acotado por
+PROFILE_CACHE_TTL_S.
+"""
+import hashlib
+import json
+from typing import Any, NamedTuple, Optional
+
+from backend.app.core.cache import CacheBackend, InstrumentedCache, get_cache_backend
+from backend.app.core.settings import get_settings
+from backend.app.db.hooks import after_commit
+
+
+class CachedProfile(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def _cache() -> CacheBackend:
+    return InstrumentedCache(get_cache_backend(), "profile")
+
+
+def _user_key(user_id: str) -> str:
+    return f"profile:user:{user_id}"
+
+
+def _id_key(prof_id: str) -> str:
+    return f"profile:id:{prof_id}"
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + _digest(body) + '"'
+
+
+class ProfileCache:
+    @staticmethod
+    def _resolve(pointer_key: str) -> Optional[CachedProfile]:
+        cache = _cache()
+        raw = cache.get(pointer_key)
+        if raw is None:
+            return None
+        try:
+            pointer = json.loads(raw)
+        except ValueError:
+            cache.delete(pointer_key)
+            return None
+        body = cache.get(pointer["k"])
+        if body is None:
+            return None
+        return CachedProfile(body=body, etag=pointer["e"])
+
+    @staticmethod
+    def get_for_user(user_id: str) -> Optional[CachedProfile]:
+        return ProfileCache._resolve(_user_key(user_id))
+
+    @staticmethod
+    def get_by_id(prof_id: str) -> Optional[CachedProfile]:
+        return ProfileCache._resolve(_id_key(prof_id))
+
+    @staticmethod
+    def store(prof: Any, body: bytes) -> CachedProfile:
+        """
+        Guarda el cuerpo serializado de `prof` (necesita id y user_id cargados).
+        """
+        ttl = get_settings().PROFILE_CACHE_TTL_S
+        digest = _digest(body)
+        cached = CachedProfile(body=body, etag=f'"{digest}"')
+        body_key = f"profile:body:{prof.id}:{digest}"
+        pointer = json.dumps({"k": body_key, "e": cached.etag}).encode()
+        cache = _cache()
+        cache.set(body_key, body, ttl)
+        cache.set(_user_key(prof.user_id), pointer, ttl)
+        cache.set(_id_key(prof.id), pointer, ttl)
+        return cached
+
+    @staticmethod
+    def invalidate(prof_id: str, user_id: Optional[str]) -> None:
+        keys = [_id_key(prof_id)]
+        if user_id:
+            keys.append(_user_key(user_id))
+        _cache().delete(*keys)
+
+    @staticmethod
+    def invalidate_on_write(db: Any, prof: Any) -> None:
+        """
+        Invalida ya (flush) y de nuevo tras el commit de `db` (Session o AsyncSession).
+        """
+        prof_id, user_id = prof.id, prof.user_id
+        ProfileCache.invalidate(prof_id, user_id)
+        after_commit(db, lambda: ProfileCache.invalidate(prof_id, user_id), key=("profile", prof_id))
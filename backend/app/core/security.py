@@ -1,23 +1,64 @@
-import datetime as dt
-from typing import Optional, Dict, Any
+import secrets
+from typing import Optional, Dict, Any, Tuple
 
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-from backend.app.core.settings import get_settings
+from backend.app.core.hashing_pool import hashing_pool, _do_hash, _do_verify, _do_verify_and_update
+from backend.app.core.tokens import get_token_service
 
 # Password hashing context
 _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Marca de contraseña no utilizable (usuarios importados sin contraseña)
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+
+def _is_unusable(hashed_password: Optional[str]) -> bool:
+    return not hashed_password or hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return _pwd_context.verify(plain_password, hashed_password)
+    if _is_unusable(hashed_password):
+        return False
+    return hashing_pool.run("verify", _do_verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica y, si el hash usa un cost/esquema deprecado, devuelve el nuevo hash.
+    Returns (ok, nuevo_hash | None).
+    """
+    if _is_unusable(hashed_password):
+        return False, None
+    return hashing_pool.run("verify", _do_verify_and_update, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    if _is_unusable(hashed_password):
+        return False, None
+    return await hashing_pool.run_async("verify", _do_verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
+    return hashing_pool.run("hash", _do_hash, password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run_async("hash", _do_hash, password)
+
+
+def hash_password_inline(password: str) -> str:
+    """
+    Hash en el hilo actual, sin pasar por el pool acotado. Solo para procesos
+    batch (importación masiva) que gestionan su propio paralelismo.
+    """
     return _pwd_context.hash(password)
 
 
+def make_unusable_password() -> str:
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(16)
+
+
 def create_access_token(
     subject: str,
     extra_claims: Optional[Dict[str, Any]] = None,
@@ -26,25 +67,13 @@ def create_access_token(
     """
     Creates a signed JWT with provided subject and optional extra claims.
     """
-    settings = get_settings()
-    to_encode: Dict[str, Any] = {}
-    if extra_claims:
-        to_encode.update(extra_claims)
-
-    exp_minutes = expires_minutes if expires_minutes is not None else settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    expire = dt.datetime.now(dt.timezone.utc) + dt.timedelta(minutes=exp_minutes)
-    to_encode.update({"sub": subject, "exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
-    return encoded_jwt
+    claims: Dict[str, Any] = dict(extra_claims) if extra_claims else {}
+    claims["sub"] = subject
+    return get_token_service().encode(claims, expires_minutes=expires_minutes)
 
 
 def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Verifies and decodes a JWT. Returns payload or None if invalid/expired.
     """
-    settings = get_settings()
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        return payload
-    except JWTError:
-        return None
\ No newline at end of file
+    return get_token_service().decode(token)
@@ -0,0 +1,301 @@
+"""
+Autocompletado (typeahead) de profesiones y ciudades servido desde memoria.
+
+- Vocabulario: valores distintos de profesion_normalizada / ciudad_normalizada
+  con su número de perfiles (popularidad) y una etiqueta para mostrar (la
+  grafía original más frecuente: "Medellín" para "medellin").
+- Índice de prefijos: lista ordenada de claves con bisect. Cada valor se indexa
+  por cada inicio de palabra ("electricista residencial" aparece con "res").
+- Actualización incremental: ProfessionalRepository.create/update registran el
+  cambio y se aplica tras el commit (un rollback lo descarta). Los cambios de
+  otros procesos (CLI, otros workers) llegan con la reconstrucción periódica
+  (SUGGEST_REFRESH_S) en segundo plano: las consultas no esperan a la BD salvo
+  la primera carga, si no se precalentó al arrancar.
+- Cada cambio aplicado recibe un número de secuencia; la reconstrucción anota la
+  secuencia al empezar cada lectura y solo reaplica los cambios posteriores (los
+  anteriores ya estaban confirmados y vienen en la lectura).
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.app.core.metrics import registry
+from backend.app.core.normalization import fold
+from backend.app.core.settings import get_settings
+from backend.app.db.hooks import after_commit
+
+logger = logging.getLogger(__name__)
+
+# Campo público -> (columna normalizada, columna original) de professional_profiles
+FIELDS: Dict[str, Tuple[str, str]] = {
+    "profesion": ("profesion_normalizada", "profesion_principal"),
+    "ciudad": ("ciudad_normalizada", "ciudad"),
+}
+
+_rebuilds = registry.counter(
+    "suggest_index_rebuilds_total",
+    "Reconstrucciones completas del índice de autocompletado",
+    ["result"],
+)
+_vocabulary_size = registry.gauge(
+    "suggest_index_values",
+    "Valores distintos en el índice de autocompletado",
+    ["field"],
+)
+
+RESULT_CACHE_SIZE = 4096
+
+# (campo, valor normalizado, etiqueta original, delta de conteo)
+Change = Tuple[str, str, Optional[str], int]
+Snapshot = Dict[str, Optional[str]]
+
+
+class PrefixIndex:
+    """
+    Valores con conteo, buscables por prefijo de cualquiera de sus palabras.
+    No es thread-safe por sí solo: SuggestionIndex serializa el acceso.
+    """
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[str, str]] = []  # (clave, valor), ordenada
+        self.counts: Dict[str, int] = {}
+        self.labels: Dict[str, str] = {}
+        # Resultados por (prefijo, limit): los prefijos cortos abarcan mucho
+        # vocabulario y se repiten en cada sesión de tecleo. Se vacía en cada cambio.
+        self._results: Dict[Tuple[str, int], List[Tuple[str, str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @staticmethod
+    def _keys_for(value: str) -> List[Tuple[str, str]]:
+        words = value.split(" ")
+        return [(" ".join(words[i:]), value) for i in range(len(words))]
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[str, Optional[str], int]]) -> "PrefixIndex":
+        """`rows`: (valor, etiqueta, conteo); con varias etiquetas por valor gana la de mayor conteo."""
+        index = cls()
+        best: Dict[str, int] = {}
+        for value, label, n in rows:
+            if not value or n <= 0:
+                continue
+            index.counts[value] = index.counts.get(value, 0) + n
+            if label and n > best.get(value, 0):
+                best[value] = n
+                index.labels[value] = label
+        index._keys = sorted(k for v in index.counts for k in cls._keys_for(v))
+        return index
+
+    def add(self, value: str, label: Optional[str], delta: int) -> None:
+        self._results.clear()
+        count = self.counts.get(value, 0) + delta
+        if count > 0:
+            if value not in self.counts:
+                for key in self._keys_for(value):
+                    insort(self._keys, key)
+            self.counts[value] = count
+            if label and value not in self.labels:
+                self.labels[value] = label
+        elif value in self.counts:
+            del self.counts[value]
+            self.labels.pop(value, None)
+            for key in self._keys_for(value):
+                i = bisect_left(self._keys, key)
+                if i < len(self._keys) and self._keys[i] == key:
+                    del self._keys[i]
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[str, str, int]]:
+        """Hasta `limit` (valor, etiqueta, conteo), más populares primero."""
+        cached = self._results.get((prefix, limit))
+        if cached is not None:
+            return cached
+        lo = bisect_left(self._keys, (prefix,))
+        hi = bisect_left(self._keys, (prefix + "\uffff",), lo)
+        candidates = {value for _, value in self._keys[lo:hi]}
+        counts = self.counts
+        top = heapq.nsmallest(limit, candidates, key=lambda v: (-counts[v], v))
+        result = [(v, self.labels.get(v, v), counts[v]) for v in top]
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            self._results.clear()
+        self._results[(prefix, limit)] = result
+        return result
+
+
+def _load_from_db(mark: Callable[[], int]) -> Tuple[Dict[str, PrefixIndex], Dict[str, int]]:
+    """
+    Índices por campo y, por campo, la secuencia de cambios (`mark()`) anotada
+    justo antes de su lectura. Cada campo se lee en su propia transacción para
+    que la lectura vea todo lo confirmado hasta esa marca en cualquier motor.
+    """
+    from sqlalchemy import func, select
+
+    from backend.app.db.session import SessionLocal
+    from backend.app.models.professional import ProfessionalProfile
+
+    out: Dict[str, PrefixIndex] = {}
+    marks: Dict[str, int] = {}
+    db = SessionLocal()
+    try:
+        for field, (norm_name, label_name) in FIELDS.items():
+            norm = getattr(ProfessionalProfile, norm_name)
+            label = getattr(ProfessionalProfile, label_name)
+            stmt = select(norm, label, func.count()).where(norm.isnot(None)).group_by(norm, label)
+            marks[field] = mark()
+            out[field] = PrefixIndex.build(db.execute(stmt).all())
+            db.rollback()
+    finally:
+        db.close()
+    return out, marks
+
+
+class SuggestionIndex:
+    def __init__(self, refresh_s: float) -> None:
+        self.refresh_s = refresh_s
+        self._indexes: Dict[str, PrefixIndex] = {}
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        # Secuencia del último cambio aplicado
+        self._seq = 0
+        # (secuencia, cambio) aplicados durante una reconstrucción: se reaplican
+        # sobre el índice nuevo los posteriores a la lectura de su campo
+        self._pending: Optional[List[Tuple[int, Change]]] = None
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._indexes)
+
+    def rebuild(self) -> None:
+        """Reconstrucción completa desde BD (al arrancar y cada SUGGEST_REFRESH_S)."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            self._pending = []
+        try:
+            indexes, marks = _load_from_db(self._mark)
+        except Exception:
+            _rebuilds.inc(result="error")
+            logger.exception("No se pudo reconstruir el índice de autocompletado")
+            with self._lock:
+                self._rebuilding = False
+                self._pending = None
+                # Reintento tras otro intervalo completo, sin bloquear consultas
+                self._built_at = time.monotonic()
+            return
+        with self._lock:
+            # Un cambio con secuencia <= la marca de su campo se confirmó antes
+            # de leerlo y ya está en el índice nuevo; los posteriores se reaplican.
+            # (Un commit anterior a la lectura cuyo callback llegue después aún se
+            # reaplica: desvía un conteo hasta la siguiente reconstrucción.)
+            for seq, (field, value, label, delta) in self._pending or ():
+                if seq > marks[field]:
+                    indexes[field].add(value, label, delta)
+            self._indexes = indexes
+            self._built_at = time.monotonic()
+            self._rebuilding = False
+            self._pending = None
+        _rebuilds.inc(result="ok")
+        for field, index in indexes.items():
+            _vocabulary_size.set(len(index), field=field)
+
+    def _refresh_if_stale(self) -> None:
+        stale = self.refresh_s > 0 and time.monotonic() - self._built_at > self.refresh_s
+        if not self._indexes:
+            # Sin precalentar: la primera consulta carga en línea (y tras un fallo, una vez por intervalo)
+            if self._built_at == 0.0 or stale:
+                self.rebuild()
+        elif stale and not self._rebuilding:
+            threading.Thread(target=self.rebuild, name="suggest-rebuild", daemon=True).start()
+
+    def suggest(self, field: str, prefix: str, limit: int) -> List[Tuple[str, str, int]]:
+        self._refresh_if_stale()
+        with self._lock:
+            index = self._indexes.get(field)
+            return index.search(prefix, limit) if index is not None else []
+
+    def _mark(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def apply(self, changes: List[Change]) -> None:
+        with self._lock:
+            self._seq += 1
+            if self._pending is not None:
+                self._pending.extend((self._seq, change) for change in changes)
+            for field, value, label, delta in changes:
+                index = self._indexes.get(field)
+                if index is not None:
+                    index.add(value, label, delta)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes = {}
+            self._built_at = 0.0
+
+
+_index: Optional[SuggestionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SuggestionIndex(get_settings().SUGGEST_REFRESH_S)
+    return _index
+
+
+def snapshot(prof: Any) -> Snapshot:
+    """Valores indexables de `prof`, para comparar antes/después de modificarlo."""
+    return {field: getattr(prof, norm_name) for field, (norm_name, _) in FIELDS.items()}
+
+
+def _changes(before: Optional[Snapshot], prof: Any) -> List[Change]:
+    out: List[Change] = []
+    for field, (norm_name, label_name) in FIELDS.items():
+        old, new = (before or {}).get(field), getattr(prof, norm_name)
+        if old == new:
+            continue
+        if old:
+            out.append((field, old, None, -1))
+        if new:
+            out.append((field, new, getattr(prof, label_name), 1))
+    return out
+
+
+def record_write(db: Any, before: Optional[Snapshot], prof: Any) -> None:
+    """
+    Aplica tras el commit de `db` (Session o AsyncSession) el cambio de
+    vocabulario de `prof` respecto a `before` (None: perfil nuevo). Varias
+    escrituras del mismo perfil en una transacción se suman (A->B, B->C = A->C).
+    """
+    changes = _changes(before, prof)
+    if changes:
+        after_commit(db, lambda: get_suggestion_index().apply(changes))
+
+
+def record_inserts(db: Any, rows: Iterable[Dict[str, Any]]) -> None:
+    """Altas por lote (importación masiva), como dicts de columnas."""
+    changes = [c for row in rows for c in _changes(None, SimpleNamespace(**row))]
+    if changes:
+        after_commit(db, lambda: get_suggestion_index().apply(changes))
+
+
+def suggest(q: str, fields: Iterable[str], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Sugerencias por campo para el texto `q` (plegado igual que los valores)."""
+    prefix = fold(q)
+    index = get_suggestion_index()
+    return {
+        field: [
+            {"value": value, "label": label, "count": n}
+            for value, label, n in (index.suggest(field, prefix, limit) if prefix else [])
+        ]
+        for field in fields
+    }
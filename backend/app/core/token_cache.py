@@ -0,0 +1,114 @@
+"""
+Caché acotada (LRU + TTL) de tokens JWT ya verificados -> Principal.
+
+Evita repetir la verificación de firma y, en modo AUTH_TRUST_CLAIMS, la
+consulta del usuario en cada request autenticado de solo lectura.
+La revocación se apoya en `users.token_version`: los tokens llevan el claim
+`ver`; al revocar se incrementa la versión en BD y se invalida localmente.
+En otros procesos la revocación se aplica como máximo tras AUTH_TOKEN_CACHE_TTL_S.
+Las versiones mínimas por usuario también son LRU acotadas (mismo max_size) y
+caducan a `revocation_ttl_s` (vida de un token): pasado ese tiempo ya no queda
+ningún token válido emitido antes de la revocación.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identidad ligera del usuario autenticado (construida desde los claims)."""
+
+    id: str
+    email: Optional[str]
+    is_professional: bool
+    token_version: int = 0
+
+
+class TokenCache:
+    def __init__(self, max_size: int = 10000, ttl_s: float = 60.0, revocation_ttl_s: float = 3600.0) -> None:
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.revocation_ttl_s = revocation_ttl_s
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        # user_id -> (versión mínima aceptada, caducidad): revocaciones conocidas por este proceso
+        self._min_version: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _min_version_for(self, user_id: str, now: float) -> int:
+        entry = self._min_version.get(user_id)
+        if entry is None:
+            return 0
+        version, expires_at = entry
+        if expires_at <= now:
+            del self._min_version[user_id]
+            return 0
+        return version
+
+    def get(self, token: str) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= now or principal.token_version < self._min_version_for(principal.id, now):
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None) -> None:
+        """
+        Cachea hasta min(TTL, expiración del token). `token_exp` en epoch (claim exp).
+        """
+        ttl = self.ttl_s
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (principal, time.monotonic() + ttl)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def revoke_user(self, user_id: str, min_version: int) -> None:
+        """Invalida en este proceso todo token del usuario con versión < min_version."""
+        now = time.monotonic()
+        with self._lock:
+            version = max(min_version, self._min_version_for(user_id, now))
+            self._min_version[user_id] = (version, now + self.revocation_ttl_s)
+            self._min_version.move_to_end(user_id)
+            while len(self._min_version) > self.max_size:
+                self._min_version.popitem(last=False)
+            stale = [t for t, (p, _) in self._entries.items() if p.id == user_id and p.token_version < min_version]
+            for t in stale:
+                del self._entries[t]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._min_version.clear()
+
+
+_cache: Optional[TokenCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from backend.app.core.settings import get_settings
+
+                settings = get_settings()
+                _cache = TokenCache(
+                    max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+                    ttl_s=settings.AUTH_TOKEN_CACHE_TTL_S,
+                    revocation_ttl_s=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + settings.JWT_LEEWAY_S,
+                )
+    return _cache
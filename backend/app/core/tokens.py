@@ -0,0 +1,323 @@
+"""
+Emisión y verificación de JWT con material de claves precargado.
+
+- HS256/384/512: la clave HMAC se prepara una vez; firmar y verificar es un
+  HMAC de la librería estándar sobre `header.payload`.
+- ES256 / EdDSA (Ed25519): claves PEM en JWT_KEYS_DIR, una por archivo
+  (`<kid>.pem`). Las privadas firman y verifican; las públicas solo verifican
+  (claves retiradas durante una rotación). Las públicas se publican en
+  /.well-known/jwks.json para que otros servicios verifiquen sin el secreto.
+- Cabecera `kid` en todos los tokens; los tokens antiguos sin `kid` se
+  verifican con la clave activa y, si no, con los secretos HMAC anteriores
+  del mismo algoritmo.
+- JWT_PREVIOUS_SECRETS: secretos HMAC que se siguen aceptando (rotación del
+  secreto o migración de HS256 a una clave asimétrica).
+
+La verificación solo valida lo que usamos: firma, `exp` (y `nbf` si viene) e
+`iss` si JWT_ISSUER está configurado. La cabecera de los tokens propios se
+reconoce comparando bytes, sin parsear JSON.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+HMAC_ALGS = {"HS256": "sha256", "HS384": "sha384", "HS512": "sha512"}
+ASYMMETRIC_ALGS = ("ES256", "EdDSA")
+
+
+class TokenConfigError(RuntimeError):
+    """Configuración de claves inválida (se detecta al arrancar)."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _json_segment(obj: Dict[str, Any]) -> bytes:
+    return _b64encode(json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    alg: str
+    verify: Callable[[bytes, bytes], bool]
+    sign: Optional[Callable[[bytes], bytes]] = None
+    jwk: Optional[Dict[str, Any]] = None
+    header: bytes = field(init=False, default=b"")
+
+    def __post_init__(self) -> None:
+        self.header = _json_segment({"alg": self.alg, "kid": self.kid, "typ": "JWT"})
+
+
+def hmac_key(secret: str, alg: str = "HS256") -> SigningKey:
+    digest = HMAC_ALGS[alg]
+    key = secret.encode("utf-8")
+    # kid derivado del secreto (no lo revela) para distinguir secretos en rotación
+    kid = "hs-" + hashlib.sha256(b"jwt-kid:" + key).hexdigest()[:12]
+
+    def sign(msg: bytes) -> bytes:
+        return hmac.digest(key, msg, digest)
+
+    def verify(msg: bytes, sig: bytes) -> bool:
+        return hmac.compare_digest(hmac.digest(key, msg, digest), sig)
+
+    return SigningKey(kid=kid, alg=alg, sign=sign, verify=verify)
+
+
+def asymmetric_key(kid: str, pem: bytes) -> SigningKey:
+    """Clave ES256 (P-256) o Ed25519 desde PEM, privada o solo pública."""
+    try:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+    except ImportError as exc:  # pragma: no cover - depende del entorno
+        raise TokenConfigError("Las claves ES256/EdDSA requieren el paquete 'cryptography'") from exc
+
+    private = None
+    try:
+        private = serialization.load_pem_private_key(pem, password=None)
+        public = private.public_key()
+    except (ValueError, TypeError):
+        try:
+            public = serialization.load_pem_public_key(pem)
+        except ValueError as exc:
+            raise TokenConfigError(f"Clave {kid}: PEM inválido") from exc
+
+    if isinstance(public, ec.EllipticCurvePublicKey):
+        if not isinstance(public.curve, ec.SECP256R1):
+            raise TokenConfigError(f"Clave {kid}: ES256 requiere la curva P-256")
+        ecdsa = ec.ECDSA(hashes.SHA256())
+        numbers = public.public_numbers()
+        jwk = {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64encode(numbers.x.to_bytes(32, "big")).decode("ascii"),
+            "y": _b64encode(numbers.y.to_bytes(32, "big")).decode("ascii"),
+        }
+
+        def verify(msg: bytes, sig: bytes) -> bool:
+            # JWS usa r||s (64 bytes); cryptography espera DER
+            if len(sig) != 64:
+                return False
+            der = encode_dss_signature(int.from_bytes(sig[:32], "big"), int.from_bytes(sig[32:], "big"))
+            try:
+                public.verify(der, msg, ecdsa)
+                return True
+            except InvalidSignature:
+                return False
+
+        sign = None
+        if private is not None:
+
+            def sign(msg: bytes) -> bytes:
+                r, s = decode_dss_signature(private.sign(msg, ecdsa))
+                return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+        alg = "ES256"
+    elif isinstance(public, ed25519.Ed25519PublicKey):
+        raw = public.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        jwk = {"kty": "OKP", "crv": "Ed25519", "x": _b64encode(raw).decode("ascii")}
+
+        def verify(msg: bytes, sig: bytes) -> bool:
+            try:
+                public.verify(sig, msg)
+                return True
+            except InvalidSignature:
+                return False
+
+        sign = private.sign if private is not None else None
+        alg = "EdDSA"
+    else:
+        raise TokenConfigError(f"Clave {kid}: tipo no soportado (usar EC P-256 o Ed25519)")
+
+    jwk.update({"kid": kid, "alg": alg, "use": "sig"})
+    return SigningKey(kid=kid, alg=alg, sign=sign, verify=verify, jwk=jwk)
+
+
+def load_key_dir(path: str) -> List[SigningKey]:
+    """Carga `<kid>.pem` de `path` (orden por nombre)."""
+    keys: List[SigningKey] = []
+    for name in sorted(os.listdir(path)):
+        if not name.endswith(".pem"):
+            continue
+        with open(os.path.join(path, name), "rb") as fh:
+            keys.append(asymmetric_key(name[: -len(".pem")], fh.read()))
+    return keys
+
+
+class TokenService:
+    """
+    Firma con la clave activa y verifica contra todo el llavero (por `kid`).
+    Inmutable tras construirse: se comparte entre hilos sin locks.
+    """
+
+    def __init__(
+        self,
+        active: SigningKey,
+        keys: List[SigningKey],
+        *,
+        expire_minutes: int = 60,
+        issuer: Optional[str] = None,
+        leeway_s: float = 0.0,
+    ) -> None:
+        if active.sign is None:
+            raise TokenConfigError(f"La clave activa {active.kid} no tiene parte privada")
+        self.active = active
+        self.expire_minutes = expire_minutes
+        self.issuer = issuer
+        self.leeway_s = leeway_s
+        self._by_kid: Dict[str, SigningKey] = {}
+        for key in [active, *keys]:
+            self._by_kid.setdefault(key.kid, key)
+        # Tokens emitidos antes de usar `kid` (p. ej. python-jose: {"alg":..,"typ":"JWT"}):
+        # candidatas por algoritmo, la activa primero y luego los secretos HMAC anteriores
+        self._kidless: Dict[str, List[SigningKey]] = {}
+        for key in self._by_kid.values():
+            if key is active or key.alg in HMAC_ALGS:
+                self._kidless.setdefault(key.alg, []).append(key)
+        # Cabecera exacta (bytes) -> claves: los tokens propios no requieren parsear la cabecera
+        self._by_header: Dict[bytes, List[SigningKey]] = {k.header: [k] for k in self._by_kid.values()}
+        for alg, candidates in self._kidless.items():
+            self._by_header[_json_segment({"alg": alg, "typ": "JWT"})] = candidates
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "TokenService":
+        alg = settings.JWT_ALG
+        keys: List[SigningKey] = []
+        if alg in HMAC_ALGS:
+            active = hmac_key(settings.JWT_SECRET, alg)
+        elif alg in ASYMMETRIC_ALGS:
+            if not settings.JWT_KEYS_DIR or not os.path.isdir(settings.JWT_KEYS_DIR):
+                raise TokenConfigError(f"JWT_ALG={alg} requiere JWT_KEYS_DIR con claves PEM")
+            keys = load_key_dir(settings.JWT_KEYS_DIR)
+            signers = [k for k in keys if k.sign is not None and k.alg == alg]
+            if settings.JWT_ACTIVE_KID:
+                signers = [k for k in signers if k.kid == settings.JWT_ACTIVE_KID]
+            if not signers:
+                raise TokenConfigError(f"No hay clave privada {alg} para firmar en {settings.JWT_KEYS_DIR}")
+            # Sin JWT_ACTIVE_KID firma la última por nombre (p. ej. kids con fecha)
+            active = signers[-1]
+        else:
+            raise TokenConfigError(f"JWT_ALG no soportado: {alg}")
+        keys.extend(hmac_key(secret, alg if alg in HMAC_ALGS else "HS256") for secret in settings.JWT_PREVIOUS_SECRETS)
+        return cls(
+            active,
+            keys,
+            expire_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+            issuer=settings.JWT_ISSUER,
+            leeway_s=settings.JWT_LEEWAY_S,
+        )
+
+    def encode(self, claims: Dict[str, Any], expires_minutes: Optional[int] = None) -> str:
+        payload = dict(claims)
+        minutes = expires_minutes if expires_minutes is not None else self.expire_minutes
+        payload["exp"] = int(time.time()) + int(minutes * 60)
+        if self.issuer:
+            payload["iss"] = self.issuer
+        signing_input = self.active.header + b"." + _json_segment(payload)
+        return (signing_input + b"." + _b64encode(self.active.sign(signing_input))).decode("ascii")
+
+    def _keys_for(self, header_b64: bytes) -> List[SigningKey]:
+        """Claves con las que probar la firma (vacío: cabecera no aceptada)."""
+        keys = self._by_header.get(header_b64)
+        if keys is not None:
+            return keys
+        try:
+            header = json.loads(_b64decode(header_b64))
+        except (ValueError, binascii.Error):
+            return []
+        if not isinstance(header, dict):
+            return []
+        alg, kid = header.get("alg"), header.get("kid")
+        if kid is None:
+            return self._kidless.get(alg, []) if isinstance(alg, str) else []
+        key = self._by_kid.get(kid) if isinstance(kid, str) else None
+        # El algoritmo lo fija la clave, nunca la cabecera (evita alg=none / confusión HS/ES)
+        if key is None or alg != key.alg:
+            return []
+        return [key]
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """Payload si la firma y los claims son válidos; None en otro caso."""
+        try:
+            raw = token.encode("ascii")
+        except (UnicodeEncodeError, AttributeError):
+            return None
+        header_b64, sep1, rest = raw.partition(b".")
+        payload_b64, sep2, sig_b64 = rest.partition(b".")
+        if not sep1 or not sep2 or b"." in sig_b64:
+            return None
+        keys = self._keys_for(header_b64)
+        if not keys:
+            return None
+        signing_input = raw[: len(header_b64) + 1 + len(payload_b64)]
+        try:
+            sig = _b64decode(sig_b64)
+            if not any(key.verify(signing_input, sig) for key in keys):
+                return None
+            payload = json.loads(_b64decode(payload_b64))
+        except (ValueError, binascii.Error):
+            return None
+        if not isinstance(payload, dict):
+            return None
+
+        now = time.time()
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool) or now >= exp + self.leeway_s:
+            return None
+        nbf = payload.get("nbf")
+        if nbf is not None and (not isinstance(nbf, (int, float)) or now + self.leeway_s < nbf):
+            return None
+        if self.issuer and payload.get("iss") != self.issuer:
+            return None
+        return payload
+
+    def jwks(self) -> Dict[str, Any]:
+        """Claves públicas (JWKS); las HMAC nunca se publican."""
+        return {"keys": [k.jwk for k in self._by_kid.values() if k.jwk is not None]}
+
+
+_service: Optional[TokenService] = None
+_service_lock = threading.Lock()
+
+
+def get_token_service() -> TokenService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from backend.app.core.settings import get_settings
+
+                _service = TokenService.from_settings(get_settings())
+    return _service
+
+
+def generate_private_key_pem(alg: str) -> bytes:
+    """PEM PKCS8 de una clave nueva (ES256 o EdDSA), para `cli jwt-keygen`."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if alg == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif alg == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise TokenConfigError(f"Algoritmo asimétrico no soportado: {alg}")
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
@@ -0,0 +1,81 @@
+"""
+Traza ligera por request: consultas SQL, tiempo en BD y spans (bcrypt, OpenAI, ...).
+
+La traza vive en un ContextVar que abre RequestTimingMiddleware; las rutas
+síncronas se ejecutan en el threadpool con una copia del contexto, así que los
+hooks de SQLAlchemy y los spans registrados desde esos hilos llegan a la misma
+traza. Fuera de un request (worker, CLI) solo se alimentan los histogramas.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.app.core.metrics import registry
+
+_span_seconds = registry.histogram(
+    "app_span_seconds",
+    "Duración de operaciones instrumentadas (bcrypt, llamadas a OpenAI, ...)",
+    ["name"],
+)
+
+# Longitud máxima de una sentencia SQL guardada para el log de requests lentos
+MAX_STATEMENT_CHARS = 500
+
+
+class RequestTrace:
+    __slots__ = ("started", "db_count", "db_time", "spans", "statements", "max_statements")
+
+    def __init__(self, max_statements: int = 0) -> None:
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.spans: Dict[str, Tuple[int, float]] = {}  # nombre -> (veces, segundos)
+        self.statements: List[Tuple[float, str]] = []
+        self.max_statements = max_statements
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add_query(self, statement: str, duration: float) -> None:
+        self.db_count += 1
+        self.db_time += duration
+        if len(self.statements) < self.max_statements:
+            self.statements.append((duration, " ".join(statement.split())[:MAX_STATEMENT_CHARS]))
+
+    def add_span(self, name: str, duration: float) -> None:
+        count, total = self.spans.get(name, (0, 0.0))
+        self.spans[name] = (count + 1, total + duration)
+
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def start_trace(max_statements: int = 0) -> Tuple[RequestTrace, Token]:
+    trace = RequestTrace(max_statements=max_statements)
+    return trace, _current.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+def record_span(name: str, duration: float) -> None:
+    _span_seconds.observe(duration, name=name)
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span(name, duration)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Mide el bloque como span `name` (histograma + traza del request actual)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
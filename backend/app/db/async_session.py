@@ -0,0 +1,65 @@
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.app.core.settings import get_settings
+from backend.app.db.pool import engine_pool_kwargs, instrument_engine
+from backend.app.db.sql_stats import instrument_sql
+
+# Driver async por backend cuando la URL usa uno síncrono
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",       # psycopg 3 soporta async de forma nativa
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Traduce DATABASE_URL a su variante async (psycopg async / asyncpg / aiosqlite).
+    """
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Engine async creado perezosamente: solo se requiere el driver async si DB_ASYNC está activo.
+    """
+    global _engine, _session_factory
+    if _engine is None:
+        settings = get_settings()
+        url = async_database_url(settings.DATABASE_URL)
+        _engine = create_async_engine(url, **engine_pool_kwargs(url, settings, name="async", is_async=True))
+        instrument_engine(_engine.sync_engine, settings, name="async")
+        instrument_sql(_engine.sync_engine)
+        _session_factory = async_sessionmaker(bind=_engine, autoflush=False, expire_on_commit=False)
+    return _engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    get_async_engine()
+    assert _session_factory is not None
+    return _session_factory
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields an AsyncSession."""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
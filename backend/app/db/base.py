@@ -15,4 +15,8 @@ def import_models() -> None:
     """
     # Importación perezosa para evitar dependencias cíclicas
     from backend.app.models import user as _user  # noqa: F401
-    from backend.app.models import professional as _professional  # noqa: F401
\ No newline at end of file
+    from backend.app.models import professional as _professional  # noqa: F401
+    from backend.app.models import index_job as _index_job  # noqa: F401
+    from backend.app.models import vector_file as _vector_file  # noqa: F401
+    from backend.app.models import vector_shard as _vector_shard  # noqa: F401
+    from backend.app.models import sync_watermark as _sync_watermark  # noqa: F401
@@ -0,0 +1,135 @@
+"""
+Índice de texto completo sobre professional_profiles, según el backend de BD:
+- PostgreSQL: índice GIN sobre to_tsvector('spanish', ...) (expresión).
+- SQLite: tabla virtual FTS5 con su propia copia del texto, enlazada por `id`
+  (columna UNINDEXED) y sincronizada con triggers. No se usa el rowid implícito
+  de professional_profiles: su clave es un String y un VACUUM puede renumerarlo.
+Campos indexados: nombre_completo, profesion_principal, descripcion_breve.
+"""
+import re
+from typing import List
+
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.elements import ColumnElement
+
+FTS_TABLE = "professional_profiles_fts"
+PG_FTS_INDEX = "ix_prof_profiles_fts"
+PG_TS_CONFIG = "spanish"
+
+# Palabras vacías frecuentes en consultas ("plomero en medellín")
+_STOPWORDS = {
+    "a", "al", "de", "del", "el", "en", "la", "las", "lo", "los", "para",
+    "por", "un", "una", "y", "o", "con",
+}
+
+_PG_DOCUMENT_SQL = (
+    "coalesce(nombre_completo, '') || ' ' || "
+    "coalesce(profesion_principal, '') || ' ' || "
+    "coalesce(descripcion_breve, '')"
+)
+
+_SQLITE_COLUMNS = "nombre_completo, profesion_principal, descripcion_breve"
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        id UNINDEXED, {_SQLITE_COLUMNS},
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON professional_profiles BEGIN
+        INSERT INTO {FTS_TABLE}(id, {_SQLITE_COLUMNS})
+        VALUES (new.id, new.nombre_completo, new.profesion_principal, new.descripcion_breve);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON professional_profiles BEGIN
+        DELETE FROM {FTS_TABLE} WHERE id = old.id;
+    END
+    """,
+    # Solo si cambia el texto indexado (o el id): las escrituras de contabilidad
+    # (vector_store_file_id, geo, ...) no tocan el índice
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF id, {_SQLITE_COLUMNS} ON professional_profiles BEGIN
+        DELETE FROM {FTS_TABLE} WHERE id = old.id;
+        INSERT INTO {FTS_TABLE}(id, {_SQLITE_COLUMNS})
+        VALUES (new.id, new.nombre_completo, new.profesion_principal, new.descripcion_breve);
+    END
+    """,
+]
+
+
+def ensure_fulltext_index(bind) -> None:
+    """
+    Crea (idempotente) el índice de texto completo para el dialecto de `bind`
+    (Engine o Connection). Otros dialectos se ignoran: la búsqueda cae a LIKE.
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            ensure_fulltext_index(conn)
+        return
+
+    conn: Connection = bind
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS {PG_FTS_INDEX} ON professional_profiles "
+                f"USING gin (to_tsvector('{PG_TS_CONFIG}', {_PG_DOCUMENT_SQL}))"
+            )
+        )
+    elif dialect == "sqlite":
+        columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({FTS_TABLE})"))}
+        if columns and "id" not in columns:
+            # Versión anterior enlazada por rowid: se recrea enlazada por id
+            drop_fulltext_index(conn)
+        for ddl in _SQLITE_DDL:
+            conn.execute(text(ddl))
+        if not columns or "id" not in columns:
+            # Indexa filas previas a la creación de la tabla FTS
+            conn.execute(
+                text(
+                    f"INSERT INTO {FTS_TABLE}(id, {_SQLITE_COLUMNS}) "
+                    f"SELECT id, {_SQLITE_COLUMNS} FROM professional_profiles"
+                )
+            )
+
+
+def drop_fulltext_index(bind) -> None:
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        bind.execute(text(f"DROP INDEX IF EXISTS {PG_FTS_INDEX}"))
+    elif dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            bind.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"))
+        bind.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def query_terms(q: str) -> List[str]:
+    """
+    Tokeniza la consulta del usuario en términos seguros (sin sintaxis FTS) y sin palabras vacías.
+    """
+    terms = [t for t in re.findall(r"\w+", q.lower()) if t not in _STOPWORDS]
+    return terms
+
+
+def sqlite_match_expression(terms: List[str]) -> str:
+    """
+    Expresión MATCH de FTS5: todos los términos (AND), el último como prefijo.
+    """
+    quoted = [f'"{t}"' for t in terms]
+    if quoted:
+        quoted[-1] = quoted[-1] + "*"
+    return " ".join(quoted)
+
+
+def pg_document() -> ColumnElement:
+    """Misma expresión que el índice GIN (imprescindible para que el planner lo use)."""
+    return func.to_tsvector(literal_column(f"'{PG_TS_CONFIG}'"), literal_column(_PG_DOCUMENT_SQL))
+
+
+def pg_query(terms: List[str]) -> ColumnElement:
+    return func.plainto_tsquery(literal_column(f"'{PG_TS_CONFIG}'"), " ".join(terms))
@@ -0,0 +1,43 @@
+"""
+Callbacks a ejecutar tras el commit de una Session (p. ej. invalidar cachés).
+
+Se registran por sesión en `session.info` y se descartan en rollback, de modo
+que efectos externos solo ocurren si la transacción se confirmó. Acepta tanto
+Session como AsyncSession (usa su `sync_session`).
+"""
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_INFO_KEY = "after_commit_callbacks"
+
+
+def after_commit(db: Any, fn: Callable[[], None], key: Optional[Hashable] = None) -> None:
+    """
+    Programa `fn` para después del próximo commit de `db`. Con `key`, un callback
+    repetido en la misma transacción se registra una sola vez.
+    """
+    session: Session = getattr(db, "sync_session", db)
+    callbacks: Dict[Hashable, Callable[[], None]] = session.info.setdefault(_INFO_KEY, {})
+    callbacks[key if key is not None else object()] = fn
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    callbacks = session.info.pop(_INFO_KEY, None)
+    if not callbacks:
+        return
+    for fn in callbacks.values():
+        try:
+            fn()
+        except Exception:
+            logger.exception("Fallo en callback after_commit")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
@@ -0,0 +1,150 @@
+"""
+Configuración e instrumentación del pool de conexiones.
+
+- Tamaños/timeouts desde Settings (DB_POOL_*)
+- Estrategia de pre-ping: "always" (SQLAlchemy, un round-trip por checkout),
+  "idle" (solo si la conexión estuvo inactiva más de DB_POOL_PRE_PING_IDLE_S) o "never"
+- Métricas: espera de checkout (histograma), conexiones en uso / overflow (gauges),
+  timeouts y checkouts lentos (contadores + warning en log)
+"""
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+PRE_PING_ALWAYS = "always"
+PRE_PING_IDLE = "idle"
+PRE_PING_NEVER = "never"
+
+_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tiempo de espera para obtener una conexión del pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts que agotaron DB_POOL_TIMEOUT_S (pool agotado)",
+    ["pool"],
+)
+_slow_checkouts = registry.counter(
+    "db_pool_slow_checkouts_total",
+    "Checkouts que esperaron más de DB_POOL_SLOW_CHECKOUT_MS",
+    ["pool"],
+)
+_pings = registry.counter(
+    "db_pool_pings_total",
+    "Pre-pings ejecutados en checkout (estrategia idle)",
+    ["pool", "result"],
+)
+_checked_out = registry.gauge("db_pool_checked_out", "Conexiones en uso", ["pool"])
+_overflow = registry.gauge("db_pool_overflow", "Conexiones abiertas por encima de pool_size", ["pool"])
+_pool_size = registry.gauge("db_pool_size", "Tamaño configurado del pool", ["pool"])
+_checked_in = registry.gauge("db_pool_checked_in", "Conexiones ociosas en el pool", ["pool"])
+
+
+class _TimedCheckoutMixin:
+    """
+    Mide la espera de checkout. SQLAlchemy no emite un evento *antes* del
+    checkout, así que se envuelve _do_get (bloquea mientras el pool está agotado).
+    """
+
+    metrics_name = "default"
+    slow_checkout_s = 0.1
+
+    def _do_get(self):  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            _checkout_wait.observe(time.perf_counter() - start, pool=self.metrics_name)
+            _checkout_timeouts.inc(pool=self.metrics_name)
+            logger.warning("Pool %s agotado tras %.2fs: %s", self.metrics_name, time.perf_counter() - start, self.status())
+            raise
+        waited = time.perf_counter() - start
+        _checkout_wait.observe(waited, pool=self.metrics_name)
+        if waited >= self.slow_checkout_s:
+            _slow_checkouts.inc(pool=self.metrics_name)
+            logger.warning("Checkout lento en pool %s: %.1f ms (%s)", self.metrics_name, waited * 1000, self.status())
+        return conn
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_pool_kwargs(url: str, settings: Settings, *, name: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Argumentos de pool para create_engine / create_async_engine.
+    SQLite en memoria conserva su pool por defecto (una conexión por hilo).
+    """
+    kwargs: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING == PRE_PING_ALWAYS}
+    if _is_memory_sqlite(url):
+        return kwargs
+    pool_cls = InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+    kwargs.update(
+        poolclass=type(
+            pool_cls.__name__,
+            (pool_cls,),
+            {"metrics_name": name, "slow_checkout_s": settings.DB_POOL_SLOW_CHECKOUT_MS / 1000.0},
+        ),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_S,
+        pool_recycle=settings.DB_POOL_RECYCLE_S,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+    )
+    return kwargs
+
+
+def instrument_engine(engine: Engine, settings: Settings, *, name: str) -> None:
+    """
+    Registra gauges del pool y, con la estrategia "idle", el pre-ping condicional.
+    Para un AsyncEngine pasar `engine.sync_engine`.
+    """
+    # Se lee engine.pool en cada exposición: dispose()/recreate() reemplazan el pool
+    def _pool_stat(method: str):
+        return lambda: float(getattr(engine.pool, method)()) if hasattr(engine.pool, method) else 0.0
+
+    _checked_out.set_function(_pool_stat("checkedout"), pool=name)
+    _overflow.set_function(lambda: float(max(0, engine.pool.overflow())) if hasattr(engine.pool, "overflow") else 0.0, pool=name)
+    _pool_size.set_function(_pool_stat("size"), pool=name)
+    _checked_in.set_function(_pool_stat("checkedin"), pool=name)
+
+    if settings.DB_POOL_PRE_PING != PRE_PING_IDLE:
+        return
+    idle_s = settings.DB_POOL_PRE_PING_IDLE_S
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        last = connection_record.info.get("checked_in_at")
+        if last is None or time.monotonic() - last < idle_s:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            _pings.inc(pool=name, result="disconnect")
+            # DisconnectionError hace que el pool descarte la conexión y reintente el checkout
+            raise exc.DisconnectionError(f"Conexión inactiva descartada: {e}") from e
+        _pings.inc(pool=name, result="ok")
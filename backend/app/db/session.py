@@ -5,12 +5,23 @@ from sqlalchemy.orm import sessionmaker, Session
 
 from backend.app.core.settings import get_settings
 from backend.app.db.base import Base, import_models
+from backend.app.db.fulltext import ensure_fulltext_index
+from backend.app.db.spatial import ensure_geo_index
+from backend.app.db.trigram import ensure_trigram_index
+from backend.app.db.pool import engine_pool_kwargs, instrument_engine
+from backend.app.db.sql_stats import instrument_sql
 
 # Load settings
 settings = get_settings()
 
-# Engine and session factory
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, future=True)
+# Engine and session factory (pool sized/instrumented from DB_POOL_* settings)
+engine = create_engine(
+    settings.DATABASE_URL,
+    future=True,
+    **engine_pool_kwargs(settings.DATABASE_URL, settings, name="sync"),
+)
+instrument_engine(engine, settings, name="sync")
+instrument_sql(engine)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
@@ -29,4 +40,7 @@ def init_db() -> None:
     Ensures models are imported so they are registered with Base.metadata.
     """
     import_models()
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    ensure_fulltext_index(engine)
+    ensure_trigram_index(engine)
+    ensure_geo_index(engine)
@@ -0,0 +1,71 @@
+"""
+Índice espacial de professional_profiles.
+
+- Todos los dialectos: B-tree sobre `geohash` (modelo); la búsqueda por radio
+  recorre los rangos de las celdas que cubren el círculo (ver core/geo.py).
+- PostgreSQL con las extensiones cube + earthdistance: índice GiST sobre
+  ll_to_earth(lat, lon); `earth_box(...) @> ll_to_earth(lat, lon)` lo usa y
+  earth_distance() ordena en la propia BD (kNN en una sola consulta).
+"""
+import logging
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+PG_EARTH_INDEX = "ix_prof_profiles_earth"
+
+
+def ensure_geo_index(bind) -> None:
+    """
+    Crea (idempotente) cube/earthdistance y el índice GiST en PostgreSQL. Sin
+    permisos para las extensiones se registra y la búsqueda usa el geohash.
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            ensure_geo_index(conn)
+        return
+
+    conn: Connection = bind
+    if conn.dialect.name != "postgresql":
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS cube"))
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS earthdistance"))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("No se pudo crear la extensión earthdistance (%s); búsqueda por geohash", exc)
+        return
+    conn.execute(
+        text(
+            f"CREATE INDEX IF NOT EXISTS {PG_EARTH_INDEX} ON professional_profiles "
+            "USING gist (ll_to_earth(lat, lon)) WHERE lat IS NOT NULL AND lon IS NOT NULL"
+        )
+    )
+
+
+def drop_geo_index(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        bind.execute(text(f"DROP INDEX IF EXISTS {PG_EARTH_INDEX}"))
+
+
+_earthdistance_by_engine: Dict[int, bool] = {}
+
+
+def earthdistance_available(conn: Connection) -> bool:
+    """¿Están earthdistance y su índice? (consultado una vez por engine)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    key = id(conn.engine)
+    if key not in _earthdistance_by_engine:
+        found = conn.execute(
+            text(
+                "SELECT 1 FROM pg_extension e, pg_indexes i "
+                "WHERE e.extname = 'earthdistance' AND i.indexname = :name"
+            ),
+            {"name": PG_EARTH_INDEX},
+        ).first()
+        _earthdistance_by_engine[key] = found is not None
+    return _earthdistance_by_engine[key]
@@ -0,0 +1,56 @@
+"""
+Hooks before/after_cursor_execute: cuentan consultas y tiempo en BD por request
+(traza de core/tracing.py) y alimentan un histograma por tipo de sentencia.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.app.core.metrics import registry
+from backend.app.core.tracing import current_trace
+
+_query_seconds = registry.histogram(
+    "db_query_seconds",
+    "Duración de las sentencias SQL ejecutadas",
+    ["op"],
+)
+
+_OPS = ("select", "insert", "update", "delete")
+_START_KEY = "sql_stats_start"
+
+
+def _op_of(statement: str) -> str:
+    head = statement.lstrip()[:6].lower()
+    return head if head in _OPS else "other"
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    _query_seconds.observe(duration, op=_op_of(statement))
+    trace = current_trace()
+    if trace is not None:
+        trace.add_query(statement, duration)
+
+
+def _error(context):  # noqa: ANN001
+    # after_cursor_execute no se emite si la sentencia falla
+    conn = context.connection
+    if conn is not None and conn.info.get(_START_KEY):
+        conn.info[_START_KEY].pop()
+
+
+def instrument_sql(engine: Engine) -> None:
+    """Registra los hooks en `engine` (para un AsyncEngine, pasar `engine.sync_engine`)."""
+    if event.contains(engine, "before_cursor_execute", _before):
+        return
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    event.listen(engine, "handle_error", _error)
@@ -0,0 +1,29 @@
+"""
+Comparaciones keyset sobre columnas de timestamp, portables entre PostgreSQL y SQLite.
+
+SQLite guarda CURRENT_TIMESTAMP como texto 'YYYY-MM-DD HH:MM:SS' (sin
+microsegundos) y SQLAlchemy enlaza los datetime con '.000000': la igualdad del
+desempate (updated_at, id) fallaría. Ahí se compara como texto en el mismo
+formato que guarda la BD.
+"""
+import datetime as dt
+from typing import Any
+
+from sqlalchemy import String, type_coerce
+from sqlalchemy.orm import Session
+
+
+def ts_bound(db: Session, ts: dt.datetime) -> Any:
+    """Valor comparable con `comparable_ts(db, col)` en SQL."""
+    if db.get_bind().dialect.name != "sqlite":
+        return ts
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    text = ts.strftime("%Y-%m-%d %H:%M:%S")
+    return text + (f".{ts.microsecond:06d}" if ts.microsecond else "")
+
+
+def comparable_ts(db: Session, column: Any) -> Any:
+    if db.get_bind().dialect.name == "sqlite":
+        return type_coerce(column, String)
+    return column
@@ -0,0 +1,163 @@
+"""
+Búsqueda difusa (erratas) sobre profesion_normalizada / ciudad_normalizada.
+
+- PostgreSQL: extensión pg_trgm + índices GIN (gin_trgm_ops); el operador `%`
+  usa el índice y `similarity()` ordena.
+- Otros dialectos (SQLite): índice de n-gramas en memoria sobre los valores
+  distintos de la columna (pocos: ciudades y profesiones), reconstruido cada
+  SEARCH_FUZZY_REFRESH_S. Misma definición de trigramas y similitud que pg_trgm.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+FUZZY_COLUMNS = ("profesion_normalizada", "ciudad_normalizada")
+PG_TRGM_INDEXES = {col: f"ix_prof_profiles_{col}_trgm" for col in FUZZY_COLUMNS}
+
+
+def ensure_trigram_index(bind) -> None:
+    """
+    Crea (idempotente) pg_trgm y los índices GIN en PostgreSQL. Si la extensión
+    no se puede instalar (permisos), se registra y la búsqueda usa el índice en memoria.
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            ensure_trigram_index(conn)
+        return
+
+    conn: Connection = bind
+    if conn.dialect.name != "postgresql":
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("No se pudo crear la extensión pg_trgm (%s); búsqueda difusa en memoria", exc)
+        return
+    for col, name in PG_TRGM_INDEXES.items():
+        conn.execute(
+            text(f"CREATE INDEX IF NOT EXISTS {name} ON professional_profiles USING gin ({col} gin_trgm_ops)")
+        )
+
+
+def drop_trigram_index(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        for name in PG_TRGM_INDEXES.values():
+            bind.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+_pg_trgm_by_engine: Dict[int, bool] = {}
+
+
+def pg_trgm_available(conn: Connection) -> bool:
+    """¿Está pg_trgm instalada? (consultado una vez por engine)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    key = id(conn.engine)
+    if key not in _pg_trgm_by_engine:
+        found = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+        _pg_trgm_by_engine[key] = found is not None
+    return _pg_trgm_by_engine[key]
+
+
+# -------------------------
+# Trigramas compatibles con pg_trgm
+# -------------------------
+def trigrams(value: str) -> Set[str]:
+    """Cada palabra con dos espacios delante y uno detrás, como pg_trgm."""
+    out: Set[str] = set()
+    for word in value.split():
+        padded = f"  {word} "
+        out.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return out
+
+
+def similarity(a: str, b: str) -> float:
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    shared = len(ta & tb)
+    return shared / (len(ta) + len(tb) - shared)
+
+
+class NgramIndex:
+    """Índice invertido trigrama -> valores; consultas por similitud de Jaccard."""
+
+    def __init__(self, values: Iterable[str]) -> None:
+        self._grams: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        for v in values:
+            if v and v not in self._grams:
+                grams = trigrams(v)
+                self._grams[v] = grams
+                for g in grams:
+                    self._postings[g].add(v)
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def search(self, term: str, threshold: float, limit: int) -> List[Tuple[str, float]]:
+        query = trigrams(term)
+        if not query:
+            return []
+        shared: Dict[str, int] = defaultdict(int)
+        for g in query:
+            for v in self._postings.get(g, ()):
+                shared[v] += 1
+        scored = []
+        for v, n in shared.items():
+            score = n / (len(query) + len(self._grams[v]) - n)
+            if score >= threshold:
+                scored.append((v, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+
+class VocabularyIndex:
+    """
+    NgramIndex por columna construido con SELECT DISTINCT y renovado por TTL.
+    Compartido por proceso (las columnas tienen pocos valores distintos).
+    """
+
+    def __init__(self, refresh_s: float) -> None:
+        self.refresh_s = refresh_s
+        self._indexes: Dict[str, Tuple[NgramIndex, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, conn: Connection, column) -> NgramIndex:  # noqa: ANN001
+        key = column.key
+        now = time.monotonic()
+        entry = self._indexes.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        with self._lock:
+            entry = self._indexes.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            values = conn.execute(select(column).where(column.isnot(None)).distinct()).scalars()
+            index = NgramIndex(values)
+            self._indexes[key] = (index, now + self.refresh_s)
+            return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+_vocabulary: Optional[VocabularyIndex] = None
+
+
+def get_vocabulary_index() -> VocabularyIndex:
+    global _vocabulary
+    if _vocabulary is None:
+        from backend.app.core.settings import get_settings
+
+        _vocabulary = VocabularyIndex(get_settings().SEARCH_FUZZY_REFRESH_S)
+    return _vocabulary
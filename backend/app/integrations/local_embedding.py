@@ -0,0 +1,95 @@
+"""
+Embedders locales (sin red) para el índice vectorial embebido.
+
+Un embedder es cualquier objeto con:
+    dim: int
+    embed(texts: List[str]) -> np.ndarray  # (n, dim) float32, filas L2-normalizadas
+Se selecciona con LOCAL_EMBEDDER="paquete.modulo:Clase" (por defecto HashingEmbedder).
+"""
+import importlib
+import math
+import re
+import unicodedata
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backend.app.core.settings import get_settings
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fold(text: str) -> str:
+    """Minúsculas y sin tildes ("Medellín" -> "medellin")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class HashingEmbedder:
+    """
+    Vectorizador por hashing (hashing trick) con tf sublineal:
+    - unigramas de palabra (peso 1.0)
+    - trigramas de caracteres por palabra (peso 0.5), tolera typos y plurales
+    El signo del hash reduce colisiones sesgadas. Determinista entre procesos (crc32).
+    """
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = int(dim)
+
+    def _features(self, text: str) -> Dict[int, float]:
+        feats: Dict[int, float] = {}
+
+        def add(token: str, weight: float) -> None:
+            h = zlib.crc32(token.encode("utf-8"))
+            idx = h % self.dim
+            sign = 1.0 if (h >> 31) & 1 == 0 else -1.0
+            feats[idx] = feats.get(idx, 0.0) + sign * weight
+
+        for word in _TOKEN_RE.findall(_fold(text)):
+            add("w:" + word, 1.0)
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                add("c:" + padded[i:i + 3], 0.5)
+        return feats
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for idx, value in self._features(text or "").items():
+                # tf sublineal conservando el signo
+                out[row, idx] = math.copysign(1.0 + math.log(abs(value)), value) if value else 0.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        out /= norms
+        return out
+
+
+def profile_text(doc: Dict[str, Any]) -> str:
+    """
+    Texto a embeber a partir del documento de build_prof_json_for_vector_store.
+    La profesión se repite para darle más peso que a la descripción.
+    """
+    parts = [
+        doc.get("profesion_principal"),
+        doc.get("profesion_principal"),
+        doc.get("nombre_completo"),
+        doc.get("ciudad"),
+        doc.get("barrio"),
+        doc.get("descripcion_breve"),
+    ]
+    return " ".join(p for p in parts if p)
+
+
+def load_embedder() -> Any:
+    """
+    Instancia el embedder configurado en LOCAL_EMBEDDER ("modulo:Clase").
+    La clase recibe `dim` como argumento con nombre.
+    """
+    settings = get_settings()
+    spec = settings.LOCAL_EMBEDDER
+    if not spec:
+        return HashingEmbedder(dim=settings.LOCAL_EMBEDDING_DIM)
+    module_name, _, attr = spec.partition(":")
+    cls = getattr(importlib.import_module(module_name), attr)
+    return cls(dim=settings.LOCAL_EMBEDDING_DIM)
@@ -0,0 +1,358 @@
+"""
+Índice vectorial embebido (en proceso) como backend alternativo del Vector Store.
+
+- Vectores en una matriz NumPy contigua (capacidad con crecimiento geométrico)
+- Búsqueda top-k exacta (producto punto) o aproximada IVF (k-means + nprobe)
+- Persistencia en .npy cargado con mmap (copy-on-write) + sidecar JSON de ids
+- Alta/baja incremental por prof_id
+
+Expone la misma API de módulo que openai_vector_store para que
+VectorStoreService pueda alternar backends por configuración.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from backend.app.core.settings import get_settings
+from backend.app.integrations.local_embedding import load_embedder, profile_text
+
+logger = logging.getLogger(__name__)
+
+FILE_ID_PREFIX = "local:"
+
+
+class LocalVectorIndex:
+    """
+    Matriz (capacidad x dim) float32 con filas L2-normalizadas; el coseno es un producto punto.
+    Las filas liberadas se reutilizan. Thread-safe mediante un RLock.
+    """
+
+    def __init__(self, dim: int, ivf_min_size: int = 4096, nprobe: int = 8) -> None:
+        self.dim = int(dim)
+        self.ivf_min_size = int(ivf_min_size)
+        self.nprobe = int(nprobe)
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._ids: List[Optional[str]] = []
+        self._pos: Dict[str, int] = {}
+        self._free: List[int] = []
+        # Estado IVF
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None  # fila -> lista (-1 si libre)
+        self._lists: List[List[int]] = []
+        self._trained_size = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, prof_id: str) -> bool:
+        return prof_id in self._pos
+
+    # -------------------------
+    # Mutaciones
+    # -------------------------
+    def _grow(self, min_rows: int) -> None:
+        cap = self._vectors.shape[0]
+        if cap >= min_rows:
+            return
+        new_cap = max(min_rows, cap * 2, 64)
+        grown = np.zeros((new_cap, self.dim), dtype=np.float32)
+        grown[:cap] = self._vectors
+        self._vectors = grown
+        self._ids.extend([None] * (new_cap - cap))
+        if self._assign is not None:
+            assign = np.full(new_cap, -1, dtype=np.int32)
+            assign[:cap] = self._assign
+            self._assign = assign
+
+    def upsert(self, prof_id: str, vector: np.ndarray) -> None:
+        vec = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            row = self._pos.get(prof_id)
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    row = len(self._pos) + len(self._free)
+                    self._grow(row + 1)
+                self._pos[prof_id] = row
+                self._ids[row] = prof_id
+            else:
+                self._ivf_unassign(row)
+            self._vectors[row] = vec
+            self._ivf_assign(row)
+            self.dirty = True
+            self._maybe_train()
+
+    def remove(self, prof_id: str) -> bool:
+        with self._lock:
+            row = self._pos.pop(prof_id, None)
+            if row is None:
+                return False
+            self._ivf_unassign(row)
+            self._vectors[row] = 0.0
+            self._ids[row] = None
+            self._free.append(row)
+            self.dirty = True
+            return True
+
+    # -------------------------
+    # IVF (inverted file) aproximado
+    # -------------------------
+    def _maybe_train(self) -> None:
+        n = len(self._pos)
+        if n < self.ivf_min_size:
+            return
+        # Reentrena cuando el índice duplica su tamaño desde el último entrenamiento
+        if self._centroids is None or n >= 2 * self._trained_size:
+            self.train_ivf()
+
+    def train_ivf(self, iterations: int = 8, seed: int = 0) -> None:
+        with self._lock:
+            rows = np.fromiter(self._pos.values(), dtype=np.int64)
+            if rows.size == 0:
+                return
+            data = self._vectors[rows]
+            n_lists = max(1, int(np.sqrt(rows.size)))
+            rng = np.random.default_rng(seed)
+            centroids = data[rng.choice(rows.size, size=n_lists, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                for c in range(n_lists):
+                    members = data[labels == c]
+                    if len(members):
+                        center = members.mean(axis=0)
+                        norm = np.linalg.norm(center)
+                        centroids[c] = center / norm if norm else center
+            labels = np.argmax(data @ centroids.T, axis=1)
+
+            self._centroids = centroids.astype(np.float32)
+            self._assign = np.full(self._vectors.shape[0], -1, dtype=np.int32)
+            self._lists = [[] for _ in range(n_lists)]
+            for row, label in zip(rows.tolist(), labels.tolist()):
+                self._assign[row] = label
+                self._lists[label].append(row)
+            self._trained_size = rows.size
+
+    def _ivf_assign(self, row: int) -> None:
+        if self._centroids is None or self._assign is None:
+            return
+        label = int(np.argmax(self._centroids @ self._vectors[row]))
+        self._assign[row] = label
+        self._lists[label].append(row)
+
+    def _ivf_unassign(self, row: int) -> None:
+        if self._centroids is None or self._assign is None:
+            return
+        label = int(self._assign[row])
+        if label >= 0:
+            try:
+                self._lists[label].remove(row)
+            except ValueError:
+                pass
+            self._assign[row] = -1
+
+    # -------------------------
+    # Búsqueda
+    # -------------------------
+    def search(self, vector: np.ndarray, k: int = 10, approximate: bool = False) -> List[Tuple[str, float]]:
+        """
+        Top-k por similitud coseno. `approximate=True` usa IVF si está entrenado
+        (explora las `nprobe` listas más cercanas); si no, fuerza bruta.
+        """
+        q = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if not self._pos:
+                return []
+            if approximate and self._centroids is not None:
+                probe = np.argsort(-(self._centroids @ q))[: self.nprobe]
+                rows = np.fromiter(
+                    (r for c in probe.tolist() for r in self._lists[c]), dtype=np.int64
+                )
+            else:
+                rows = np.fromiter(self._pos.values(), dtype=np.int64)
+            if rows.size == 0:
+                return []
+            scores = self._vectors[rows] @ q
+            k = min(k, rows.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[int(rows[i])], float(scores[i])) for i in top]
+
+    # -------------------------
+    # Persistencia
+    # -------------------------
+    def save(self, path: str) -> None:
+        """
+        Escribe `<path>.npy` (solo filas ocupadas, compactado) y `<path>.ids.json`
+        de forma atómica (archivo temporal + os.replace).
+        """
+        with self._lock:
+            ids = list(self._pos.keys())
+            rows = [self._pos[i] for i in ids]
+            matrix = self._vectors[rows] if rows else np.zeros((0, self.dim), dtype=np.float32)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_npy = path + ".npy.tmp"
+            with open(tmp_npy, "wb") as fh:
+                np.save(fh, np.ascontiguousarray(matrix))
+            tmp_ids = path + ".ids.json.tmp"
+            with open(tmp_ids, "w", encoding="utf-8") as fh:
+                json.dump({"dim": self.dim, "ids": ids}, fh)
+            os.replace(tmp_npy, path + ".npy")
+            os.replace(tmp_ids, path + ".ids.json")
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, dim: int, **kwargs: Any) -> "LocalVectorIndex":
+        """
+        Carga el índice con np.load(mmap_mode="c"): las páginas se leen bajo demanda
+        y las escrituras quedan en memoria (copy-on-write) hasta el próximo save().
+        """
+        index = cls(dim=dim, **kwargs)
+        npy, ids_path = path + ".npy", path + ".ids.json"
+        if not (os.path.exists(npy) and os.path.exists(ids_path)):
+            return index
+        with open(ids_path, "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if int(meta.get("dim", dim)) != dim:
+            logger.warning("Índice local con dim=%s distinta a la configurada (%s); se ignora", meta.get("dim"), dim)
+            return index
+        matrix = np.load(npy, mmap_mode="c")
+        ids = meta.get("ids", [])
+        if matrix.shape[0] != len(ids):
+            logger.warning("Índice local inconsistente (%d filas, %d ids); se ignora", matrix.shape[0], len(ids))
+            return index
+        index._vectors = matrix
+        index._ids = list(ids)
+        index._pos = {pid: row for row, pid in enumerate(ids)}
+        index._maybe_train()
+        return index
+
+
+# -------------------------
+# Backend de módulo (misma API que openai_vector_store)
+# -------------------------
+_index: Optional[LocalVectorIndex] = None
+_embedder: Any = None
+_init_lock = threading.Lock()
+_mutations = 0
+
+
+def _get_index() -> LocalVectorIndex:
+    global _index, _embedder
+    if _index is None:
+        with _init_lock:
+            if _index is None:
+                settings = get_settings()
+                _embedder = load_embedder()
+                _index = LocalVectorIndex.load(
+                    settings.LOCAL_VECTOR_INDEX_PATH,
+                    dim=_embedder.dim,
+                    ivf_min_size=settings.LOCAL_IVF_MIN_SIZE,
+                    nprobe=settings.LOCAL_IVF_NPROBE,
+                )
+    return _index
+
+
+def _after_mutation() -> None:
+    """Persistencia diferida: guarda cada LOCAL_VECTOR_FLUSH_EVERY mutaciones (y en shutdown)."""
+    global _mutations
+    _mutations += 1
+    every = get_settings().LOCAL_VECTOR_FLUSH_EVERY
+    if every > 0 and _mutations % every == 0:
+        flush()
+
+
+def flush() -> None:
+    if _index is not None and _index.dirty:
+        _index.save(get_settings().LOCAL_VECTOR_INDEX_PATH)
+
+
+def add_or_update_professional(prof: Dict, prof_id: str, previous_file_id: Optional[str] = None) -> str:
+    """
+    Embebe el documento y lo inserta/reemplaza en el índice. Sin espera de indexación.
+    Returns: identificador sintético "local:<prof_id>".
+    """
+    index = _get_index()
+    vec = _embedder.embed([profile_text(prof)])[0]
+    index.upsert(prof_id, vec)
+    _after_mutation()
+    return FILE_ID_PREFIX + prof_id
+
+
+def add_professionals_batch(docs: List[Dict], batch_name: Optional[str] = None) -> Dict[str, str]:
+    """
+    Embebe el lote en una sola llamada vectorizada y lo inserta en el índice.
+    Returns: prof_id -> "local:<prof_id>".
+    """
+    if not docs:
+        return {}
+    index = _get_index()
+    vectors = _embedder.embed([profile_text(d) for d in docs])
+    for doc, vec in zip(docs, vectors):
+        index.upsert(doc["prof_id"], vec)
+    if get_settings().LOCAL_VECTOR_FLUSH_EVERY > 0:
+        flush()
+    return {d["prof_id"]: FILE_ID_PREFIX + d["prof_id"] for d in docs}
+
+
+def add_or_update_many(items: List[Tuple[Dict, str, Optional[str]]]) -> Dict[str, Union[str, Exception]]:
+    """
+    Variante por lotes de add_or_update_professional: un solo embed vectorizado.
+    Returns: prof_id -> "local:<prof_id>".
+    """
+    if not items:
+        return {}
+    index = _get_index()
+    vectors = _embedder.embed([profile_text(doc) for doc, _, _ in items])
+    for (_, prof_id, _), vec in zip(items, vectors):
+        index.upsert(prof_id, vec)
+        _after_mutation()
+    return {prof_id: FILE_ID_PREFIX + prof_id for _, prof_id, _ in items}
+
+
+def remove_professional(prof_id: str, file_id: Optional[str] = None) -> bool:
+    ok = _get_index().remove(prof_id)
+    if ok:
+        _after_mutation()
+    return ok
+
+
+def scan_professional_files(client: Any = None) -> Dict[str, List[str]]:
+    index = _get_index()
+    with index._lock:
+        return {pid: [FILE_ID_PREFIX + pid] for pid in index._pos}
+
+
+def list_files_page(after: Optional[str] = None, limit: int = 100) -> Tuple[List[Tuple[str, Optional[int]]], bool]:
+    """
+    Página de identificadores sintéticos ("local:<prof_id>") en orden, a partir de `after`.
+    Sin fecha de creación (None).
+    """
+    index = _get_index()
+    with index._lock:
+        ids = sorted(FILE_ID_PREFIX + pid for pid in index._pos)
+    if after:
+        ids = [fid for fid in ids if fid > after]
+    return [(fid, None) for fid in ids[:limit]], len(ids) > limit
+
+
+def delete_file(file_id: str) -> bool:
+    if not file_id.startswith(FILE_ID_PREFIX):
+        return False
+    return remove_professional(file_id[len(FILE_ID_PREFIX):])
+
+
+def search_professionals(query: str, k: int = 10) -> List[Tuple[str, float]]:
+    """
+    Top-k (prof_id, score coseno) para una consulta en texto libre.
+    """
+    settings = get_settings()
+    index = _get_index()
+    vec = _embedder.embed([query])[0]
+    return index.search(vec, k=k, approximate=settings.LOCAL_VECTOR_SEARCH == "ivf")
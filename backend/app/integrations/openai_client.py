@@ -0,0 +1,143 @@
+"""
+Clientes OpenAI compartidos por proceso (sync y async).
+
+Construir un OpenAI(...) por llamada crea un pool HTTP nuevo y paga un
+handshake TCP+TLS en cada sesión de ChatKit o reindexación. Aquí se crea un
+único cliente por proceso sobre un httpx.Client con keep-alive, límites y
+timeouts configurables (OPENAI_*), y HTTP/2 opcional. OPENAI_BASE_URL permite
+apuntar a un servidor stub local (ver backend/benchmarks/openai_stub.py).
+Cada llamada HTTP se registra como span "openai" (core/tracing.py).
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from openai import AsyncOpenAI, OpenAI  # type: ignore[import-not-found]
+
+from backend.app.core.settings import Settings, get_settings
+from backend.app.core.tracing import record_span
+
+logger = logging.getLogger(__name__)
+
+
+def _http_client_kwargs(settings: Settings) -> Dict[str, Any]:
+    # httpx (declarado en requirements.txt) se importa aquí para no cargarlo si no se usa
+    import httpx
+
+    http2 = settings.OPENAI_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("OPENAI_HTTP2=true pero falta el paquete 'h2' (httpx[http2]); se usa HTTP/1.1")
+            http2 = False
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_S,
+        ),
+        "timeout": httpx.Timeout(settings.OPENAI_TIMEOUT_S, connect=settings.OPENAI_CONNECT_TIMEOUT_S),
+    }
+
+
+_START_EXT = "app_span_start"
+
+
+def _on_request(request: Any) -> None:
+    request.extensions[_START_EXT] = time.perf_counter()
+
+
+def _on_response(response: Any) -> None:
+    # Se emite al recibir las cabeceras: latencia de la llamada sin leer el cuerpo
+    start = response.request.extensions.get(_START_EXT)
+    if start is not None:
+        record_span("openai", time.perf_counter() - start)
+
+
+async def _on_request_async(request: Any) -> None:
+    _on_request(request)
+
+
+async def _on_response_async(response: Any) -> None:
+    _on_response(response)
+
+
+def _client_kwargs(settings: Settings) -> Dict[str, Any]:
+    if not settings.OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY no configurado")
+    kwargs: Dict[str, Any] = {
+        "api_key": settings.OPENAI_API_KEY,
+        "max_retries": settings.OPENAI_MAX_RETRIES,
+        "timeout": settings.OPENAI_TIMEOUT_S,
+    }
+    if settings.OPENAI_BASE_URL:
+        kwargs["base_url"] = settings.OPENAI_BASE_URL
+    return kwargs
+
+
+class OpenAIClientManager:
+    """
+    Crea perezosamente un OpenAI y un AsyncOpenAI por proceso y los cierra en shutdown.
+    Ambos son thread-safe; el async debe usarse desde el event loop de la app.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sync: Optional[OpenAI] = None
+        self._async: Optional[AsyncOpenAI] = None
+
+    def get(self) -> OpenAI:
+        if self._sync is None:
+            with self._lock:
+                if self._sync is None:
+                    import httpx
+
+                    settings = get_settings()
+                    self._sync = OpenAI(
+                        http_client=httpx.Client(
+                            event_hooks={"request": [_on_request], "response": [_on_response]},
+                            **_http_client_kwargs(settings),
+                        ),
+                        **_client_kwargs(settings),
+                    )
+        return self._sync
+
+    def get_async(self) -> AsyncOpenAI:
+        if self._async is None:
+            with self._lock:
+                if self._async is None:
+                    import httpx
+
+                    settings = get_settings()
+                    self._async = AsyncOpenAI(
+                        http_client=httpx.AsyncClient(
+                            event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+                            **_http_client_kwargs(settings),
+                        ),
+                        **_client_kwargs(settings),
+                    )
+        return self._async
+
+    async def aclose(self) -> None:
+        with self._lock:
+            sync_client, async_client = self._sync, self._async
+            self._sync = self._async = None
+        if sync_client is not None:
+            sync_client.close()
+        if async_client is not None:
+            await async_client.close()
+
+
+# Gestor de proceso
+openai_clients = OpenAIClientManager()
+
+
+def get_openai_client() -> OpenAI:
+    return openai_clients.get()
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    return openai_clients.get_async()
@@ -0,0 +1,248 @@
+"""
+Seguimiento concurrente de la indexación en el Vector Store remoto.
+
+Sustituye al sondeo bloqueante de 1 s por archivo: un único hilo sigue todos los
+file ids / file batches pendientes y resuelve un Future por cada uno.
+
+- Backoff adaptativo por elemento (VECTOR_POLL_INITIAL_S * VECTOR_POLL_BACKOFF^n,
+  hasta VECTOR_POLL_MAX_S); el plazo (VECTOR_POLL_TIMEOUT_S) es absoluto desde el
+  envío y no se reinicia.
+- Consultas en lote: con muchos archivos vencidos del mismo store se listan los
+  `in_progress` (y luego `failed`/`cancelled`) en lugar de un retrieve por archivo.
+- Los file batches se consultan con una sola llamada por lote.
+- El hilo duerme hasta el próximo vencimiento o hasta un nuevo envío.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+KIND_FILE = "file"
+KIND_BATCH = "batch"
+
+_time_to_indexed = registry.histogram(
+    "vector_index_time_to_indexed_seconds",
+    "Tiempo desde el envío hasta un estado terminal de indexación",
+    ["kind", "result"],
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+_poll_requests = registry.counter(
+    "vector_index_poll_requests_total",
+    "Llamadas de consulta de estado al Vector Store",
+    ["method"],
+)
+_pending_gauge = registry.gauge(
+    "vector_index_poll_pending",
+    "Archivos/lotes pendientes de indexación en seguimiento",
+    ["kind"],
+)
+
+
+class _Tracked:
+    __slots__ = ("kind", "vector_store_id", "target_id", "future", "submitted_at", "deadline", "next_check", "interval")
+
+    def __init__(self, kind: str, vector_store_id: str, target_id: str, timeout_s: float, initial_s: float) -> None:
+        now = time.monotonic()
+        self.kind = kind
+        self.vector_store_id = vector_store_id
+        self.target_id = target_id
+        self.future: "Future[str]" = Future()
+        self.submitted_at = now
+        self.deadline = now + timeout_s
+        self.interval = initial_s
+        self.next_check = now + initial_s
+
+
+def _status_of(item: Any) -> Optional[str]:
+    return getattr(item, "status", None) or (item.get("status") if isinstance(item, dict) else None)
+
+
+class IndexPoller:
+    def __init__(self, client_factory: Any = None) -> None:
+        self._client_factory = client_factory
+        self._pending: Dict[Tuple[str, str, str], _Tracked] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        _pending_gauge.set_function(lambda: self.depth(KIND_FILE), kind=KIND_FILE)
+        _pending_gauge.set_function(lambda: self.depth(KIND_BATCH), kind=KIND_BATCH)
+
+    # -------------------------
+    # API
+    # -------------------------
+    def watch_file(self, vector_store_id: str, file_id: str, timeout_s: Optional[float] = None) -> "Future[str]":
+        """Future que se resuelve con el estado terminal del archivo (o "timeout")."""
+        return self._submit(KIND_FILE, vector_store_id, file_id, timeout_s)
+
+    def watch_batch(self, vector_store_id: str, batch_id: str, timeout_s: Optional[float] = None) -> "Future[str]":
+        """Future que se resuelve con el estado terminal del file batch (o "timeout")."""
+        return self._submit(KIND_BATCH, vector_store_id, batch_id, timeout_s)
+
+    def depth(self, kind: Optional[str] = None) -> int:
+        with self._cond:
+            return sum(1 for t in self._pending.values() if kind is None or t.kind == kind)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopping = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._cond.notify_all()
+        for t in pending:
+            self._resolve(t, "cancelled")
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    # -------------------------
+    # Internos
+    # -------------------------
+    def _client(self) -> Any:
+        if self._client_factory is not None:
+            return self._client_factory()
+        from backend.app.integrations.openai_client import get_openai_client
+
+        return get_openai_client()
+
+    def _submit(self, kind: str, vector_store_id: str, target_id: str, timeout_s: Optional[float]) -> "Future[str]":
+        settings = get_settings()
+        key = (kind, vector_store_id, target_id)
+        with self._cond:
+            existing = self._pending.get(key)
+            if existing is not None:
+                return existing.future
+            tracked = _Tracked(
+                kind,
+                vector_store_id,
+                target_id,
+                timeout_s or settings.VECTOR_POLL_TIMEOUT_S,
+                settings.VECTOR_POLL_INITIAL_S,
+            )
+            self._pending[key] = tracked
+            self._stopping = False
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="vector-index-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return tracked.future
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                due = [t for t in self._pending.values() if t.next_check <= now]
+                if not due:
+                    self._cond.wait(timeout=min(t.next_check for t in self._pending.values()) - now)
+                    continue
+            try:
+                statuses = self._check(due)
+            except Exception:
+                logger.exception("Error consultando el estado de indexación")
+                statuses = {}
+            self._settle(due, statuses)
+
+    def _settle(self, due: List[_Tracked], statuses: Dict[Tuple[str, str, str], str]) -> None:
+        settings = get_settings()
+        now = time.monotonic()
+        finished: List[Tuple[_Tracked, str]] = []
+        with self._cond:
+            for t in due:
+                key = (t.kind, t.vector_store_id, t.target_id)
+                status = statuses.get(key)
+                if status in TERMINAL_STATUSES:
+                    finished.append((t, status))
+                elif now >= t.deadline:
+                    finished.append((t, "timeout"))
+                else:
+                    t.interval = min(t.interval * settings.VECTOR_POLL_BACKOFF, settings.VECTOR_POLL_MAX_S)
+                    t.next_check = min(now + t.interval, t.deadline)
+                    continue
+                self._pending.pop(key, None)
+        for t, status in finished:
+            self._resolve(t, status)
+
+    @staticmethod
+    def _resolve(t: _Tracked, status: str) -> None:
+        _time_to_indexed.observe(time.monotonic() - t.submitted_at, kind=t.kind, result=status)
+        if not t.future.done():
+            t.future.set_result(status)
+
+    def _check(self, due: Iterable[_Tracked]) -> Dict[Tuple[str, str, str], str]:
+        settings = get_settings()
+        client = self._client()
+        out: Dict[Tuple[str, str, str], str] = {}
+        files_by_store: Dict[str, List[str]] = {}
+        for t in due:
+            if t.kind == KIND_BATCH:
+                _poll_requests.inc(method="batch_retrieve")
+                try:
+                    batch = client.vector_stores.file_batches.retrieve(t.target_id, vector_store_id=t.vector_store_id)
+                    out[(KIND_BATCH, t.vector_store_id, t.target_id)] = _status_of(batch)
+                except Exception as e:
+                    logger.warning("No se pudo consultar el lote %s: %s", t.target_id, e)
+            else:
+                files_by_store.setdefault(t.vector_store_id, []).append(t.target_id)
+
+        for vs_id, file_ids in files_by_store.items():
+            if len(file_ids) >= settings.VECTOR_POLL_LIST_THRESHOLD:
+                statuses = self._statuses_by_listing(client, vs_id, file_ids)
+            else:
+                statuses = self._statuses_by_retrieve(client, vs_id, file_ids)
+            for fid, status in statuses.items():
+                out[(KIND_FILE, vs_id, fid)] = status
+        return out
+
+    @staticmethod
+    def _statuses_by_retrieve(client: Any, vs_id: str, file_ids: List[str]) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        for fid in file_ids:
+            _poll_requests.inc(method="file_retrieve")
+            try:
+                out[fid] = _status_of(client.vector_stores.files.retrieve(vector_store_id=vs_id, file_id=fid))
+            except Exception as e:
+                logger.warning("No se pudo consultar el archivo %s: %s", fid, e)
+        return out
+
+    @staticmethod
+    def _list_ids(client: Any, vs_id: str, status_filter: str, wanted: Set[str]) -> Set[str]:
+        """Ids de `wanted` presentes en el listado filtrado por estado (paginado)."""
+        found: Set[str] = set()
+        after: Optional[str] = None
+        while True:
+            _poll_requests.inc(method="file_list")
+            kwargs: Dict[str, Any] = {"vector_store_id": vs_id, "filter": status_filter, "limit": 100}
+            if after:
+                kwargs["after"] = after
+            page = client.vector_stores.files.list(**kwargs)
+            data = list(page.data)
+            found.update(f.id for f in data if f.id in wanted)
+            if not data or not getattr(page, "has_more", False) or found == wanted:
+                return found
+            after = data[-1].id
+
+    def _statuses_by_listing(self, client: Any, vs_id: str, file_ids: List[str]) -> Dict[str, str]:
+        wanted = set(file_ids)
+        in_progress = self._list_ids(client, vs_id, "in_progress", wanted)
+        done = wanted - in_progress
+        out: Dict[str, str] = {}
+        if done:
+            failed = self._list_ids(client, vs_id, "failed", done)
+            cancelled = self._list_ids(client, vs_id, "cancelled", done - failed)
+            for fid in done:
+                out[fid] = "failed" if fid in failed else "cancelled" if fid in cancelled else "completed"
+        return out
+
+
+# Poller de proceso (el hilo arranca con el primer envío)
+index_poller = IndexPoller()
@@ -1,18 +1,27 @@
 import io
 import json
-import time
-from typing import Dict
+import logging
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
-from openai import OpenAI  # type: ignore[import-not-found]
+from openai import NotFoundError, OpenAI  # type: ignore[import-not-found]
 
+from backend.app.core.normalization import fold
 from backend.app.core.settings import get_settings
+from backend.app.integrations.openai_client import get_openai_client
+from backend.app.integrations.openai_index_poller import index_poller
+
+logger = logging.getLogger(__name__)
+
+_PROF_ID_RE = re.compile(r'"prof_id"\s*:\s*"([^"]+)"')
+# Tope de resultados por búsqueda del Vector Store
+MAX_SEARCH_RESULTS = 50
 
 
 def _get_client() -> OpenAI:
-    settings = get_settings()
-    if not settings.OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY no configurado")
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
+    # Cliente compartido del proceso (pool HTTP keep-alive)
+    return get_openai_client()
 
 
 def _get_vs_id() -> str:
@@ -22,104 +31,363 @@ def _get_vs_id() -> str:
     return settings.VECTOR_STORE_ID
 
 
-def _poll_file_index(client: OpenAI, vector_store_id: str, file_id: str, timeout_s: int = 120) -> str:
+def _poll_file_index(client: OpenAI, vector_store_id: str, file_id: str, timeout_s: Optional[float] = None) -> str:
     """
-    Espera hasta que el archivo esté indexado (status completed/error/timeout).
+    Espera hasta que el archivo esté indexado (completed/failed/cancelled/timeout).
+    El seguimiento lo hace el poller compartido (backoff adaptativo, consultas en lote);
+    aquí solo se espera el Future.
     """
-    start = time.time()
-    while True:
-        item = client.vector_stores.files.retrieve(
-            vector_store_id=vector_store_id,
-            file_id=file_id,
-        )
-        status = getattr(item, "status", None) or (item.get("status") if isinstance(item, dict) else None)
-        if status in ("completed", "error"):
-            return status
-        if time.time() - start > timeout_s:
-            return "timeout"
-        time.sleep(1.0)
+    return index_poller.watch_file(vector_store_id, file_id, timeout_s=timeout_s).result()
+
+
+def _prof_filename(prof_id: str) -> str:
+    return f"prof_{prof_id}.json"
+
+
+def _delete_file(client: OpenAI, vector_store_id: str, file_id: str) -> bool:
+    """
+    Desvincula el archivo del Vector Store y borra el File subyacente.
+    Returns True si el archivo existía en el store.
+    """
+    try:
+        client.vector_stores.files.delete(vector_store_id=vector_store_id, file_id=file_id)
+        ok = True
+    except NotFoundError:
+        ok = False
+    # borrar File subyacente (opcional)
+    try:
+        client.files.delete(file_id)
+    except Exception:
+        pass
+    return ok
 
 
-def add_or_update_professional(prof: Dict, prof_id: str) -> str:
+def add_or_update_professional(prof: Dict, prof_id: str, previous_file_id: Optional[str] = None) -> str:
     """
     Crea/actualiza un profesional en el Vector Store como archivo independiente.
     prof: dict con campos (nombre_completo, profesion_principal, ciudad, etc.)
     prof_id: identificador propio de tu BD (ej. UUID)
+    previous_file_id: File ID de la versión anterior (del mapeo persistente); se
+        elimina directamente, sin recorrer el store.
     Returns: OpenAI File ID (subyacente) cuando la indexación complete.
     """
     client = _get_client()
     vs_id = _get_vs_id()
 
-    # 1) Elimina versión previa si existiera
-    try:
-        files = client.vector_stores.files.list(vector_store_id=vs_id)
-        for f in files.data:
-            # Preferir coincidencia por nombre de archivo; fallback a metadata si existe
-            try:
-                finfo = client.files.retrieve(f.id)
-                fname = getattr(finfo, "filename", None) or (finfo.get("filename") if isinstance(finfo, dict) else None)
-            except Exception:
-                fname = None
-            md = getattr(f, "metadata", {}) or {}
-            if (fname == f"prof_{prof_id}.json") or (md.get("prof_id") == prof_id):
-                client.vector_stores.files.delete(vector_store_id=vs_id, file_id=f.id)
-                # borrar File subyacente (opcional)
-                try:
-                    client.files.delete(f.id)
-                except Exception:
-                    pass
-    except Exception:
-        # Ignorar errores de limpieza
-        pass
-
-    # 2) Crea el contenido JSON (puede ser JSONL si quieres múltiples registros)
+    # 1) Crea el contenido JSON (puede ser JSONL si quieres múltiples registros)
     blob = json.dumps(prof, ensure_ascii=False).encode("utf-8")
     bio = io.BytesIO(blob)
-    bio.name = f"prof_{prof_id}.json"  # nombre para el upload
+    bio.name = _prof_filename(prof_id)  # nombre para el upload
 
-    # 3) Sube el File al proyecto (sin metadata; el SDK no lo acepta en files.create)
+    # 2) Sube el File al proyecto (sin metadata; el SDK no lo acepta en files.create)
     up = client.files.create(
         file=bio,
         purpose="assistants",
     )
 
-    # 4) Adjunta el File al Vector Store
+    # 3) Adjunta el File al Vector Store
     vsf = client.vector_stores.files.create(
         vector_store_id=vs_id,
         file_id=up.id,
     )
 
-    # 5) Espera indexación
+    # 4) Espera indexación
     status = _poll_file_index(client, vs_id, vsf.id)
     if status != "completed":
         raise RuntimeError(f"Indexación falló/expiró: {status}")
 
+    # 5) Elimina la versión previa solo cuando la nueva ya está indexada
+    if previous_file_id and previous_file_id != up.id:
+        try:
+            _delete_file(client, vs_id, previous_file_id)
+        except Exception:
+            # Ignorar errores de limpieza (la reconciliación recoge huérfanos)
+            pass
+
     return up.id
 
 
-def remove_professional(prof_id: str) -> bool:
+def add_professionals_batch(docs: List[Dict], batch_name: Optional[str] = None) -> Dict[str, str]:
+    """
+    Sube varios profesionales empaquetados en un único archivo JSONL (un registro
+    por línea) y espera su indexación. Pensado para importaciones masivas.
+    Returns: prof_id -> OpenAI File ID (el mismo para todo el lote).
+    """
+    if not docs:
+        return {}
+    client = _get_client()
+    vs_id = _get_vs_id()
+
+    blob = "\n".join(json.dumps(d, ensure_ascii=False) for d in docs).encode("utf-8")
+    bio = io.BytesIO(blob)
+    bio.name = f"{batch_name or 'batch'}.jsonl"
+
+    up = client.files.create(file=bio, purpose="assistants")
+    vsf = client.vector_stores.files.create(vector_store_id=vs_id, file_id=up.id)
+    status = _poll_file_index(client, vs_id, vsf.id, timeout_s=600)
+    if status != "completed":
+        raise RuntimeError(f"Indexación del lote falló/expiró: {status}")
+    return {d["prof_id"]: up.id for d in docs}
+
+
+def _upload_blob(client: OpenAI, filename: str, blob: bytes) -> str:
+    bio = io.BytesIO(blob)
+    bio.name = filename
+    return client.files.create(file=bio, purpose="assistants").id
+
+
+def _upload_and_index(blobs: Dict[str, Tuple[str, bytes]]) -> Dict[str, Union[str, Exception]]:
+    """
+    Sube varios archivos y espera su indexación en conjunto.
+    blobs: clave -> (filename, contenido)
+    - Subidas en paralelo (VECTOR_UPLOAD_CONCURRENCY)
+    - Un único file batch para adjuntarlos y un solo Future de espera
+      (si file_batches no está disponible, adjuntos individuales vía poller)
+    Returns: clave -> File ID, o la excepción de esa clave.
+    """
+    if not blobs:
+        return {}
+    settings = get_settings()
+    client = _get_client()
+    vs_id = _get_vs_id()
+    results: Dict[str, Union[str, Exception]] = {}
+
+    # 1) Subidas concurrentes (el cliente compartido es thread-safe)
+    uploaded: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(settings.VECTOR_UPLOAD_CONCURRENCY, len(blobs)))) as pool:
+        futures = {pool.submit(_upload_blob, client, name, blob): key for key, (name, blob) in blobs.items()}
+        for fut, key in futures.items():
+            try:
+                uploaded[key] = fut.result()
+            except Exception as e:
+                results[key] = e
+    if not uploaded:
+        return results
+
+    # 2) Adjuntar + esperar
+    timeout_s = settings.VECTOR_POLL_TIMEOUT_S
+    file_ids = list(uploaded.values())
+    failed: set = set()
+    try:
+        batch = client.vector_stores.file_batches.create(vector_store_id=vs_id, file_ids=file_ids)
+        status = index_poller.watch_batch(vs_id, batch.id, timeout_s=timeout_s).result()
+        if status == "timeout":
+            failed = set(file_ids)
+        elif status != "completed":
+            failed = _failed_batch_files(client, vs_id, batch.id, status, file_ids)
+    except Exception as e:
+        logger.warning("file_batches no disponible (%s); se adjuntan archivos individualmente", e)
+        waits: Dict[str, "Future[str]"] = {}
+        for fid in file_ids:
+            try:
+                client.vector_stores.files.create(vector_store_id=vs_id, file_id=fid)
+                waits[fid] = index_poller.watch_file(vs_id, fid, timeout_s=timeout_s)
+            except Exception:
+                failed.add(fid)
+        failed.update(fid for fid, w in waits.items() if w.result() != "completed")
+
+    for key, fid in uploaded.items():
+        if fid in failed:
+            results[key] = RuntimeError(f"Indexación falló/expiró: {fid}")
+            # El archivo nuevo no quedó indexado: no dejarlo huérfano
+            try:
+                _delete_file(client, vs_id, fid)
+            except Exception:
+                pass
+        else:
+            results[key] = fid
+    return results
+
+
+def delete_file(file_id: str) -> bool:
+    """Desvincula y borra un archivo concreto del Vector Store."""
+    return _delete_file(_get_client(), _get_vs_id(), file_id)
+
+
+def add_or_update_many(
+    items: List[Tuple[Dict, str, Optional[str]]],
+) -> Dict[str, Union[str, Exception]]:
+    """
+    Variante por lotes de add_or_update_professional (un archivo por perfil).
+    items: [(doc, prof_id, previous_file_id)]
+    Las versiones previas se borran solo para los perfiles que quedaron indexados.
+    Returns: prof_id -> File ID, o la excepción de ese perfil.
+    """
+    results = _upload_and_index(
+        {prof_id: (_prof_filename(prof_id), json.dumps(doc, ensure_ascii=False).encode("utf-8")) for doc, prof_id, _ in items}
+    )
+    previous = {prof_id: prev for _, prof_id, prev in items}
+    for prof_id, fid in results.items():
+        prev = previous.get(prof_id)
+        if isinstance(fid, str) and prev and prev != fid:
+            try:
+                delete_file(prev)
+            except Exception:
+                pass
+    return results
+
+
+def write_jsonl_shards(shards: Dict[str, Tuple[str, List[Dict]]]) -> Dict[str, Union[str, Exception]]:
+    """
+    Sube shards JSONL (un registro por perfil) y espera su indexación en conjunto.
+    shards: shard_key -> (filename, docs). No borra versiones previas: el llamador
+    lo hace tras confirmar el cambio de manifiesto (copy-on-write).
+    """
+    return _upload_and_index(
+        {
+            key: (filename, "\n".join(json.dumps(d, ensure_ascii=False) for d in docs).encode("utf-8"))
+            for key, (filename, docs) in shards.items()
+        }
+    )
+
+
+def _failed_batch_files(client: OpenAI, vs_id: str, batch_id: str, status: str, file_ids: List[str]) -> set:
+    """Archivos no completados de un lote terminado en failed/cancelled."""
+    try:
+        done: set = set()
+        after: Optional[str] = None
+        while True:
+            kwargs: Dict[str, Any] = {"vector_store_id": vs_id, "filter": "completed", "limit": 100}
+            if after:
+                kwargs["after"] = after
+            page = client.vector_stores.file_batches.list_files(batch_id, **kwargs)
+            data = list(page.data)
+            done.update(f.id for f in data)
+            if not data or not getattr(page, "has_more", False):
+                break
+            after = data[-1].id
+        return set(file_ids) - done
+    except Exception:
+        logger.warning("Lote %s terminó en %s y no se pudo listar su detalle", batch_id, status)
+        return set(file_ids)
+
+
+def remove_professional(prof_id: str, file_id: Optional[str] = None) -> bool:
     """
     Borra el archivo de ese profesional del Vector Store (y opcionalmente el File).
+    Con `file_id` (del mapeo persistente) es O(1); sin él se recurre a un
+    escaneo completo del store (ruta legada para perfiles sin mapeo).
     Returns True si eliminó al menos un archivo asociado al prof_id.
     """
     client = _get_client()
     vs_id = _get_vs_id()
 
-    files = client.vector_stores.files.list(vector_store_id=vs_id)
+    if file_id:
+        return _delete_file(client, vs_id, file_id)
+
     ok = False
-    for f in files.data:
-        # Preferir coincidencia por nombre; fallback a metadata si estuviera disponible
-        try:
-            finfo = client.files.retrieve(f.id)
-            fname = getattr(finfo, "filename", None) or (finfo.get("filename") if isinstance(finfo, dict) else None)
-        except Exception:
-            fname = None
-        md = getattr(f, "metadata", {}) or {}
-        if (fname == f"prof_{prof_id}.json") or (md.get("prof_id") == prof_id):
-            client.vector_stores.files.delete(vector_store_id=vs_id, file_id=f.id)
+    for fid in scan_professional_files(client).get(prof_id, []):
+        _delete_file(client, vs_id, fid)
+        ok = True
+    return ok
+
+
+def iter_vector_store_files(client: Optional[OpenAI] = None, page_size: int = 100) -> Iterator[Any]:
+    """
+    Itera todos los archivos del Vector Store siguiendo la paginación por cursor.
+    """
+    client = client or _get_client()
+    vs_id = _get_vs_id()
+    after: Optional[str] = None
+    while True:
+        kwargs: Dict[str, Any] = {"vector_store_id": vs_id, "limit": page_size}
+        if after:
+            kwargs["after"] = after
+        page = client.vector_stores.files.list(**kwargs)
+        data = list(page.data)
+        for f in data:
+            yield f
+        if not data or not getattr(page, "has_more", False):
+            return
+        after = data[-1].id
+
+
+def list_files_page(after: Optional[str] = None, limit: int = 100) -> Tuple[List[Tuple[str, Optional[int]]], bool]:
+    """
+    Una página del listado del Vector Store a partir del cursor `after`.
+    Returns: ([(file_id, created_at unix)], has_more).
+    """
+    kwargs: Dict[str, Any] = {"vector_store_id": _get_vs_id(), "limit": limit}
+    if after:
+        kwargs["after"] = after
+    page = _get_client().vector_stores.files.list(**kwargs)
+    data = list(page.data)
+    return [(f.id, getattr(f, "created_at", None)) for f in data], bool(data) and bool(getattr(page, "has_more", False))
+
+
+def scan_professional_files(client: Optional[OpenAI] = None) -> Dict[str, List[str]]:
+    """
+    Reconciliación completa: recorre todo el store (todas las páginas) y
+    resuelve prof_id -> [file_ids] por nombre de archivo o metadata.
+    Es O(N) llamadas remotas; usar solo para reconstruir el mapeo persistente.
+    """
+    client = client or _get_client()
+    found: Dict[str, List[str]] = {}
+    for f in iter_vector_store_files(client):
+        md = getattr(f, "metadata", None) or getattr(f, "attributes", None) or {}
+        prof_id = md.get("prof_id") if isinstance(md, dict) else None
+        if not prof_id:
             try:
-                client.files.delete(f.id)
+                finfo = client.files.retrieve(f.id)
+                fname = getattr(finfo, "filename", None) or (finfo.get("filename") if isinstance(finfo, dict) else None)
             except Exception:
-                pass
-            ok = True
-    return ok
\ No newline at end of file
+                fname = None
+            if fname and fname.startswith("prof_") and fname.endswith(".json"):
+                prof_id = fname[len("prof_"):-len(".json")]
+        if prof_id:
+            found.setdefault(prof_id, []).append(f.id)
+    return found
+
+
+def _best_record(text: str, query_terms: set) -> Optional[str]:
+    """
+    prof_id del registro JSONL de `text` (un chunk de un lote/shard) que mejor
+    coincide con la consulta: más términos de la consulta en sus valores y, a
+    igualdad (coincidencia solo semántica), el que ocupa más texto del chunk.
+    Los fragmentos sin prof_id (registro cortado al inicio del chunk) no cuentan.
+    """
+    best: Optional[Tuple[int, int]] = None
+    best_id: Optional[str] = None
+    for line in text.splitlines():
+        m = _PROF_ID_RE.search(line)
+        if m is None:
+            continue
+        try:
+            values = " ".join(str(v) for v in json.loads(line).values() if v is not None)
+        except ValueError:
+            values = line  # registro cortado al final del chunk
+        key = (len(query_terms & set((fold(values) or "").split())), len(line))
+        if best is None or key > best:
+            best, best_id = key, m.group(1)
+    return best_id
+
+
+def search_professionals(query: str, k: int = 10) -> List[Tuple[str, float]]:
+    """
+    Búsqueda semántica en el Vector Store remoto.
+    Returns lista (prof_id, score) deducida del nombre de archivo o, en archivos
+    JSONL (lotes/shards), del registro que coincide dentro del chunk: un chunk
+    abarca varios registros y solo uno de ellos es el resultado.
+    """
+    client = _get_client()
+    vs_id = _get_vs_id()
+    # Varios chunks pueden apuntar al mismo perfil: se piden más y se deduplica
+    page = client.vector_stores.search(
+        vector_store_id=vs_id, query=query, max_num_results=min(MAX_SEARCH_RESULTS, k * 2)
+    )
+    query_terms = set((fold(query) or "").split())
+    out: List[Tuple[str, float]] = []
+    seen: set = set()
+    for r in page.data:
+        score = float(getattr(r, "score", 0.0) or 0.0)
+        prof_id: Optional[str] = None
+        fname = getattr(r, "filename", None) or ""
+        if fname.startswith("prof_") and fname.endswith(".json"):
+            prof_id = fname[len("prof_"):-len(".json")]
+        else:
+            text = "\n".join(getattr(chunk, "text", "") or "" for chunk in getattr(r, "content", None) or [])
+            prof_id = _best_record(text, query_terms)
+        if prof_id and prof_id not in seen:
+            seen.add(prof_id)
+            out.append((prof_id, score))
+    return out[:k]
@@ -0,0 +1,86 @@
+"""
+Escritores de shards JSONL del Vector Store.
+
+- OpenAIShardWriter: sube los shards al Vector Store remoto (subidas concurrentes,
+  un file batch, espera conjunta vía poller).
+- LocalShardWriter: escribe los shards como archivos JSONL en disco
+  (LOCAL_SHARD_DIR); permite ejercitar el flujo completo sin red.
+
+Ambos devuelven un File ID nuevo por cada escritura (copy-on-write): nunca
+sobrescriben el archivo vigente de un shard.
+"""
+import json
+import os
+import re
+import uuid
+from typing import Dict, List, Union
+
+from backend.app.core.settings import get_settings
+
+LOCAL_SHARD_PREFIX = "localshard:"
+
+_UNSAFE = re.compile(r"[^a-z0-9_.-]+")
+
+
+def shard_filename(shard_key: str) -> str:
+    return f"shard_{_UNSAFE.sub('_', shard_key.lower())}.jsonl"
+
+
+class OpenAIShardWriter:
+    def write_shards(self, shards: Dict[str, List[Dict]]) -> Dict[str, Union[str, Exception]]:
+        from backend.app.integrations import openai_vector_store
+
+        return openai_vector_store.write_jsonl_shards(
+            {key: (shard_filename(key), docs) for key, docs in shards.items()}
+        )
+
+    def delete(self, file_id: str) -> bool:
+        from backend.app.integrations import openai_vector_store
+
+        return openai_vector_store.delete_file(file_id)
+
+
+class LocalShardWriter:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _path(self, file_id: str) -> str:
+        return os.path.join(self.directory, file_id[len(LOCAL_SHARD_PREFIX):])
+
+    def write_shards(self, shards: Dict[str, List[Dict]]) -> Dict[str, Union[str, Exception]]:
+        os.makedirs(self.directory, exist_ok=True)
+        out: Dict[str, Union[str, Exception]] = {}
+        for key, docs in shards.items():
+            name = shard_filename(key)[: -len(".jsonl")] + f".{uuid.uuid4().hex[:12]}.jsonl"
+            file_id = LOCAL_SHARD_PREFIX + name
+            try:
+                tmp = self._path(file_id) + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    for doc in docs:
+                        fh.write(json.dumps(doc, ensure_ascii=False) + "\n")
+                os.replace(tmp, self._path(file_id))
+                out[key] = file_id
+            except OSError as e:
+                out[key] = e
+        return out
+
+    def delete(self, file_id: str) -> bool:
+        if not file_id.startswith(LOCAL_SHARD_PREFIX):
+            return False
+        try:
+            os.remove(self._path(file_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def read(self, file_id: str) -> List[Dict]:
+        with open(self._path(file_id), "r", encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+
+
+def get_shard_writer():
+    """Escritor según VECTOR_SHARD_WRITER ("openai" | "local")."""
+    settings = get_settings()
+    if settings.VECTOR_SHARD_WRITER == "local":
+        return LocalShardWriter(settings.LOCAL_SHARD_DIR)
+    return OpenAIShardWriter()
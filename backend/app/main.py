@@ -1,11 +1,34 @@
 import os
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+
+from backend.app.api.middleware import RequestTimingMiddleware
+from backend.app.core.hashing_pool import HashingPoolBusy, hashing_pool
+from backend.app.core.metrics import registry
 
 from backend.app.core.settings import get_settings
+from backend.app.core.suggestions import get_suggestion_index
+from backend.app.core.tokens import get_token_service
 from backend.app.db.session import init_db
 
 
+def _include_with_override(app: FastAPI, override: APIRouter, router: APIRouter, prefix: str, tags: list) -> None:
+    """
+    Incluye `override` y, de `router`, solo las rutas (path + método) que `override`
+    no cubre. `override` va primero, así que tiene prioridad en el enrutado.
+    """
+    covered = {(r.path, m) for r in override.routes if isinstance(r, APIRoute) for m in r.methods}
+    remaining = APIRouter()
+    remaining.routes.extend(
+        r for r in router.routes
+        if not (isinstance(r, APIRoute) and all((r.path, m) in covered for m in r.methods))
+    )
+    app.include_router(override, prefix=prefix, tags=tags)
+    app.include_router(remaining, prefix=prefix, tags=tags)
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
 
@@ -19,6 +42,8 @@ def create_app() -> FastAPI:
         allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization"],
     )
+    # Instrumentación (la última en añadirse es la más externa: mide también CORS)
+    app.add_middleware(RequestTimingMiddleware)
 
     # Events
     @app.on_event("startup")
@@ -26,20 +51,75 @@ def create_app() -> FastAPI:
         # Inicialización mínima de tablas (MVP).
         # En producción, usar migraciones (Alembic).
         init_db()
+        # Carga las claves JWT al arrancar: un llavero mal configurado falla aquí, no en el primer login
+        get_token_service()
+        # Vocabulario del autocompletado: la primera pulsación no espera a la BD
+        get_suggestion_index().rebuild()
+        if settings.INDEX_WORKER_ENABLED:
+            from backend.app.services.indexing_worker import indexing_worker
+            indexing_worker.start()
+        if settings.RECONCILE_INTERVAL_S > 0:
+            from backend.app.services.reconciliation import reconciliation_scheduler
+            reconciliation_scheduler.start()
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        from backend.app.db.async_session import dispose_async_engine
+        from backend.app.integrations.openai_client import openai_clients
+        from backend.app.integrations.openai_index_poller import index_poller
+        from backend.app.services.indexing_worker import indexing_worker
+        from backend.app.services.vector_store_service import VectorStoreService
+        from backend.app.services.reconciliation import reconciliation_scheduler
+        reconciliation_scheduler.stop()
+        indexing_worker.stop()
+        index_poller.shutdown()
+        VectorStoreService.flush()
+        hashing_pool.shutdown()
+        await dispose_async_engine()
+        await openai_clients.aclose()
+
+    @app.exception_handler(HashingPoolBusy)
+    async def _hashing_busy(_request: Request, exc: HashingPoolBusy):
+        # Backpressure: el pool de bcrypt está lleno, el cliente reintenta
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after_s)},
+        )
 
     # Health
     @app.get("/health")
     def health():
         return {"ok": True, "env": "dev", "app": settings.APP_NAME}
 
+    # Métricas en formato de texto Prometheus (requests, SQL, pool de BD, hashing, ...)
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    # Claves públicas para que otros servicios verifiquen los tokens (ES256/EdDSA)
+    @app.get("/.well-known/jwks.json", include_in_schema=False)
+    def jwks():
+        return JSONResponse(get_token_service().jwks(), headers={"Cache-Control": "public, max-age=300"})
+
     # Routers
+    from backend.app.api.routers import admin as admin_router
     from backend.app.api.routers import auth as auth_router
     from backend.app.api.routers import chatkit as chatkit_router
     from backend.app.api.routers import profiles as profiles_router
  
-    app.include_router(auth_router.router, prefix="/api/auth", tags=["auth"])
+    if settings.DB_ASYNC:
+        # Las rutas async reemplazan a sus equivalentes síncronas (mismo path y método)
+        from backend.app.api.routers import auth_async as auth_async_router
+        from backend.app.api.routers import profiles_async as profiles_async_router
+
+        _include_with_override(app, auth_async_router.router, auth_router.router, "/api/auth", ["auth"])
+        _include_with_override(app, profiles_async_router.router, profiles_router.router, "/api/profiles", ["profiles"])
+    else:
+        app.include_router(auth_router.router, prefix="/api/auth", tags=["auth"])
+        app.include_router(profiles_router.router, prefix="/api/profiles", tags=["profiles"])
     app.include_router(chatkit_router.router, prefix="/api/chatkit", tags=["chatkit"])
-    app.include_router(profiles_router.router, prefix="/api/profiles", tags=["profiles"])
+    app.include_router(admin_router.router, prefix="/api/admin", tags=["admin"])
  
     return app
 
@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Text, Integer, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+
+
+def _uuid() -> str:
+    return str(uuid.uuid4())
+
+
+# Estados posibles de un job de indexación (outbox)
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Operaciones soportadas sobre el Vector Store
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+
+class IndexJob(Base):
+    """
+    Outbox durable de trabajos de indexación en el Vector Store.
+    Se inserta en la misma transacción que el cambio del perfil y lo
+    consume el worker de indexación en segundo plano.
+    """
+
+    __tablename__ = "vector_index_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
+
+    # Sin FK: un job de borrado debe sobrevivir a la eliminación del perfil
+    prof_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=True)
+
+    operation: Mapped[str] = mapped_column(String(16), nullable=False, default=OP_UPSERT)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=JOB_PENDING)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Resultado: OpenAI File ID cuando la indexación completa
+    file_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        # El worker reclama jobs por (status, next_attempt_at)
+        Index("ix_vector_index_jobs_status_next", "status", "next_attempt_at"),
+    )
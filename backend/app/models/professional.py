@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from sqlalchemy import String, Text, DateTime, Float, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.db.base import Base
@@ -13,6 +13,14 @@ def _uuid() -> str:
 
 class ProfessionalProfile(Base):
     __tablename__ = "professional_profiles"
+    __table_args__ = (
+        # Recorrido incremental por (updated_at, id) de la reconciliación
+        Index("ix_professional_profiles_updated_at_id", "updated_at", "id"),
+        # Proximity search: range scans per geohash cell, covering (no table
+        # reads), with and without the profession filter
+        Index("ix_professional_profiles_geo", "geohash", "lat", "lon", "id"),
+        Index("ix_professional_profiles_profesion_geo", "profesion_normalizada", "geohash", "lat", "lon", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
 
@@ -38,6 +46,12 @@ class ProfessionalProfile(Base):
     profesion_normalizada: Mapped[str] = mapped_column(String(255), nullable=True, index=True)
     ciudad_normalizada: Mapped[str] = mapped_column(String(128), nullable=True, index=True)
 
+    # Location for proximity search: explicit coordinates or geocoded from
+    # barrio/ciudad (offline gazetteer); geohash is the spatial grid key
+    lat: Mapped[float] = mapped_column(Float, nullable=True)
+    lon: Mapped[float] = mapped_column(Float, nullable=True)
+    geohash: Mapped[str] = mapped_column(String(12), nullable=True)
+
     # Optional: OpenAI File id stored in the Vector Store
     vector_store_file_id: Mapped[str] = mapped_column(String(128), nullable=True)
 
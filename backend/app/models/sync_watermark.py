@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+
+
+class SyncWatermark(Base):
+    """
+    Posición persistente de un proceso incremental (p. ej. la reconciliación
+    BD <-> Vector Store). `position_ts` + `position_key` forman un cursor
+    (updated_at, id) para reanudar sin volver a recorrer filas ya revisadas;
+    `cursor` guarda un cursor opaco remoto (paginación `after` del store).
+    """
+
+    __tablename__ = "sync_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    position_ts: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    position_key: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    cursor: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
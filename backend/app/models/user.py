@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, Boolean, DateTime, func
+from sqlalchemy import String, Boolean, Integer, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.db.base import Base
@@ -13,6 +13,10 @@ def _uuid() -> str:
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Exportación incremental por (updated_at, id)
+        Index("ix_users_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
@@ -23,6 +27,9 @@ class User(Base):
 
     is_professional: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
+    # Se incrementa para revocar todos los tokens emitidos (claim "ver")
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+
+
+class VectorStoreFile(Base):
+    """
+    Mapeo persistente prof_id -> OpenAI File ID dentro del Vector Store.
+    Evita listar el store completo (y un files.retrieve por archivo) para
+    encontrar el documento de un profesional al actualizarlo o borrarlo.
+    """
+
+    __tablename__ = "vector_store_files"
+
+    # Sin FK: el mapeo debe sobrevivir al borrado del perfil hasta limpiar el archivo remoto
+    prof_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    file_id: Mapped[str] = mapped_column(String(128), nullable=False, index=True)
+    vector_store_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    filename: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Shard JSONL que contiene al perfil (None: archivo individual o de lote)
+    shard_key: Mapped[Optional[str]] = mapped_column(String(160), nullable=True, index=True)
+    # Huella del documento indexado (vector_document_hash); la usa la reconciliación
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+
+
+class VectorShard(Base):
+    """
+    Manifiesto de shards JSONL del Vector Store (VECTOR_SHARDING != off).
+    Cada shard agrupa varios perfiles en un único archivo remoto; una
+    actualización reescribe el shard completo en un archivo nuevo
+    (copy-on-write) y solo entonces se cambia `file_id` y se borra el anterior.
+    `version` se usa como control de concurrencia optimista entre workers.
+    """
+
+    __tablename__ = "vector_shards"
+
+    shard_key: Mapped[str] = mapped_column(String(160), primary_key=True)
+    file_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True, index=True)
+    vector_store_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    record_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
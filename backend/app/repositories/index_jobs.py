@@ -0,0 +1,184 @@
+import datetime as dt
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from backend.app.models.index_job import (
+    IndexJob,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_DONE,
+    JOB_FAILED,
+    OP_UPSERT,
+    _uuid,
+)
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+class IndexJobRepository:
+    """
+    Acceso a datos para el outbox de indexación (IndexJob).
+    """
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        *,
+        prof_id: str,
+        user_id: Optional[str] = None,
+        operation: str = OP_UPSERT,
+        max_attempts: int = 5,
+        new_profile: bool = False,
+    ) -> IndexJob:
+        """
+        Encola un job de indexación en la transacción actual (no hace commit).
+        Si ya existe un job pendiente para el mismo perfil y operación, se reutiliza.
+        `new_profile=True` (perfil creado en esta transacción, sin jobs previos):
+        sin esa lectura ni flush; el INSERT sale con el siguiente flush/commit.
+        """
+        if new_profile:
+            job = IndexJob(
+                id=_uuid(),
+                prof_id=prof_id,
+                user_id=user_id,
+                operation=operation,
+                status=JOB_PENDING,
+                attempts=0,
+                max_attempts=max_attempts,
+                next_attempt_at=_now(),
+            )
+            db.add(job)
+            return job
+
+        existing = (
+            db.query(IndexJob)
+            .filter(
+                IndexJob.prof_id == prof_id,
+                IndexJob.operation == operation,
+                IndexJob.status == JOB_PENDING,
+            )
+            .first()
+        )
+        if existing:
+            existing.attempts = 0
+            existing.next_attempt_at = _now()
+            existing.last_error = None
+            db.flush()
+            return existing
+
+        job = IndexJob(
+            prof_id=prof_id,
+            user_id=user_id,
+            operation=operation,
+            status=JOB_PENDING,
+            max_attempts=max_attempts,
+            next_attempt_at=_now(),
+        )
+        db.add(job)
+        db.flush()
+        return job
+
+    @staticmethod
+    def get_by_id(db: Session, job_id: str) -> Optional[IndexJob]:
+        return db.query(IndexJob).filter(IndexJob.id == job_id).first()
+
+    @staticmethod
+    def latest_for_prof(db: Session, prof_id: str) -> Optional[IndexJob]:
+        return (
+            db.query(IndexJob)
+            .filter(IndexJob.prof_id == prof_id)
+            .order_by(IndexJob.created_at.desc())
+            .first()
+        )
+
+    @staticmethod
+    def has_in_flight(db: Session, prof_id: str) -> bool:
+        """True si el perfil tiene un job pendiente (o reintentando) o en ejecución."""
+        row = db.execute(
+            select(IndexJob.id)
+            .where(IndexJob.prof_id == prof_id, IndexJob.status.in_((JOB_PENDING, JOB_RUNNING)))
+            .limit(1)
+        ).first()
+        return row is not None
+
+    @staticmethod
+    def claim_due(db: Session, limit: int) -> List[IndexJob]:
+        """
+        Reclama hasta `limit` jobs vencidos marcándolos como 'running'.
+        En PostgreSQL usa FOR UPDATE SKIP LOCKED para que varios workers
+        (o réplicas) no tomen el mismo job.
+        """
+        stmt = (
+            select(IndexJob)
+            .where(IndexJob.status == JOB_PENDING, IndexJob.next_attempt_at <= _now())
+            .order_by(IndexJob.next_attempt_at)
+            .limit(limit)
+        )
+        if db.get_bind().dialect.name == "postgresql":
+            stmt = stmt.with_for_update(skip_locked=True)
+            jobs = list(db.execute(stmt).scalars())
+        else:
+            # Sin SKIP LOCKED: reclamo atómico con UPDATE condicional por job
+            jobs = []
+            for job in db.execute(stmt).scalars().all():
+                res = db.execute(
+                    update(IndexJob)
+                    .where(IndexJob.id == job.id, IndexJob.status == JOB_PENDING)
+                    .values(status=JOB_RUNNING)
+                    .execution_options(synchronize_session=False)
+                )
+                if res.rowcount == 1:
+                    jobs.append(job)
+        for job in jobs:
+            job.status = JOB_RUNNING
+            job.attempts = (job.attempts or 0) + 1
+        db.flush()
+        return jobs
+
+    @staticmethod
+    def mark_done(db: Session, job: IndexJob, file_id: Optional[str] = None) -> IndexJob:
+        job.status = JOB_DONE
+        job.file_id = file_id
+        job.last_error = None
+        db.flush()
+        return job
+
+    @staticmethod
+    def mark_failed(
+        db: Session,
+        job: IndexJob,
+        error: str,
+        backoff_base_s: float,
+        backoff_max_s: float,
+    ) -> IndexJob:
+        """
+        Registra el fallo y reprograma con backoff exponencial.
+        Al agotar max_attempts el job queda en 'failed' definitivamente.
+        """
+        job.last_error = error[:2000]
+        if job.attempts >= job.max_attempts:
+            job.status = JOB_FAILED
+        else:
+            delay = min(backoff_max_s, backoff_base_s * (2 ** max(0, job.attempts - 1)))
+            job.status = JOB_PENDING
+            job.next_attempt_at = _now() + dt.timedelta(seconds=delay)
+        db.flush()
+        return job
+
+    @staticmethod
+    def requeue_stale_running(db: Session, older_than_s: float) -> int:
+        """
+        Devuelve a 'pending' los jobs que quedaron en 'running' (p. ej. por un
+        reinicio del proceso a mitad de indexación).
+        """
+        cutoff = _now() - dt.timedelta(seconds=older_than_s)
+        res = db.execute(
+            update(IndexJob)
+            .where(IndexJob.status == JOB_RUNNING, IndexJob.updated_at < cutoff)
+            .values(status=JOB_PENDING, next_attempt_at=_now())
+        )
+        return res.rowcount or 0
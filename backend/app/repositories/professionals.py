@@ -1,7 +1,35 @@
-from typing import Optional
-from sqlalchemy.orm import Session
+import base64
+import heapq
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
 
-from backend.app.models.professional import ProfessionalProfile
+from sqlalchemy import and_, func, literal_column, or_, select, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, lazyload
+from sqlalchemy.sql import Select
+
+from backend.app.core import geo, suggestions
+from backend.app.core.profile_cache import ProfileCache
+from backend.app.core.settings import get_settings
+from backend.app.db import fulltext, spatial, trigram
+from backend.app.models.professional import ProfessionalProfile, _uuid
+
+
+def _encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Cursor inválido")
+    return values
 
 
 class ProfessionalRepository:
@@ -27,8 +55,17 @@ class ProfessionalRepository:
         descripcion_breve: Optional[str] = None,
         profesion_normalizada: Optional[str] = None,
         ciudad_normalizada: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        geohash: Optional[str] = None,
+        flush: bool = True,
     ) -> ProfessionalProfile:
+        """
+        `flush=False` difiere el INSERT al siguiente flush/commit (registro: se
+        escribe junto con el job de indexación); el id se genera aquí.
+        """
         prof = ProfessionalProfile(
+            id=_uuid(),
             user_id=user_id,
             nombre_completo=nombre_completo,
             profesion_principal=profesion_principal,
@@ -39,9 +76,15 @@ class ProfessionalRepository:
             descripcion_breve=descripcion_breve,
             profesion_normalizada=profesion_normalizada,
             ciudad_normalizada=ciudad_normalizada,
+            lat=lat,
+            lon=lon,
+            geohash=geohash,
         )
         db.add(prof)
-        db.flush()
+        if flush:
+            db.flush()
+        ProfileCache.invalidate_on_write(db, prof)
+        suggestions.record_write(db, None, prof)
         return prof
 
     @staticmethod
@@ -52,8 +95,314 @@ class ProfessionalRepository:
     ) -> ProfessionalProfile:
         """
         Actualiza los campos del perfil profesional y hace flush.
+        Invalida la caché de respuestas del perfil (ahora y tras el commit) y
+        actualiza el autocompletado tras el commit.
         """
+        before = suggestions.snapshot(prof)
         for k, v in fields.items():
             setattr(prof, k, v)
         db.flush()
-        return prof
\ No newline at end of file
+        ProfileCache.invalidate_on_write(db, prof)
+        suggestions.record_write(db, before, prof)
+        return prof
+
+    @staticmethod
+    def set_vector_file(db: Session, prof: ProfessionalProfile, file_id: Optional[str]) -> None:
+        """
+        Apunta el perfil a su archivo del Vector Store sin mover updated_at: es
+        contabilidad de indexación, no una edición (la recencia del ranking, la
+        reconciliación y la exportación incremental leen updated_at).
+        """
+        if prof.vector_store_file_id == file_id:
+            return
+        prof.vector_store_file_id = file_id
+        prof.updated_at = ProfessionalProfile.updated_at
+        db.flush()
+        ProfileCache.invalidate_on_write(db, prof)
+
+    # -------------------------
+    # Búsqueda
+    # -------------------------
+    @staticmethod
+    def fuzzy_variants(db: Session, column: Any, value: str) -> List[str]:
+        """
+        Valores de `column` parecidos a `value` (erratas: "medelin" -> "medellin"),
+        siempre incluido el propio valor. pg_trgm en PostgreSQL; índice de
+        n-gramas en memoria en el resto. SEARCH_FUZZY_THRESHOLD=0 lo desactiva.
+        """
+        settings = get_settings()
+        threshold = settings.SEARCH_FUZZY_THRESHOLD
+        if threshold <= 0:
+            return [value]
+        limit = settings.SEARCH_FUZZY_MAX_VARIANTS
+        conn = db.connection()
+        if trigram.pg_trgm_available(conn):
+            score = func.similarity(column, value)
+            stmt = (
+                select(column, score)
+                .where(column.op("%")(value), score >= threshold)
+                .group_by(column)
+                .order_by(score.desc())
+                .limit(limit)
+            )
+            variants = [v for v, _ in db.execute(stmt).all()]
+        else:
+            index = trigram.get_vocabulary_index().get(conn, column)
+            variants = [v for v, _ in index.search(value, threshold, limit)]
+        return [value] + [v for v in variants if v != value]
+
+    @staticmethod
+    def _match(db: Session, column: Any, value: str, fuzzy: bool) -> Any:
+        values = ProfessionalRepository.fuzzy_variants(db, column, value) if fuzzy else [value]
+        return column == values[0] if len(values) == 1 else column.in_(values)
+
+    @staticmethod
+    def _apply_filters(
+        db: Session,
+        stmt: Select,
+        *,
+        terms: List[str],
+        profesion_normalizada: Optional[str],
+        ciudad_normalizada: Optional[str],
+        fuzzy: bool = True,
+    ) -> Tuple[Select, Optional[Any]]:
+        """
+        Aplica filtros sobre las columnas normalizadas indexadas (valor exacto
+        más sus variantes con erratas si `fuzzy`) y el filtro de texto completo
+        según el dialecto. Devuelve (stmt, expresión de score).
+        """
+        P = ProfessionalProfile
+        if profesion_normalizada:
+            stmt = stmt.where(ProfessionalRepository._match(db, P.profesion_normalizada, profesion_normalizada, fuzzy))
+        if ciudad_normalizada:
+            stmt = stmt.where(ProfessionalRepository._match(db, P.ciudad_normalizada, ciudad_normalizada, fuzzy))
+        if not terms:
+            return stmt, None
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            document = fulltext.pg_document()
+            tsq = fulltext.pg_query(terms)
+            stmt = stmt.where(document.op("@@")(tsq))
+            return stmt, func.ts_rank(document, tsq)
+        if dialect == "sqlite":
+            fts = table(fulltext.FTS_TABLE, column("id"))
+            fts_ref = literal_column(fulltext.FTS_TABLE)
+            stmt = stmt.join(fts, fts.c.id == P.id).where(
+                fts_ref.op("MATCH")(fulltext.sqlite_match_expression(terms))
+            )
+            # bm25: menor es mejor; se invierte para ordenar desc como en PostgreSQL
+            return stmt, -func.bm25(fts_ref)
+
+        # Fallback genérico sin índice de texto completo
+        for t in terms:
+            like = f"%{t}%"
+            stmt = stmt.where(
+                or_(
+                    func.lower(P.nombre_completo).like(like),
+                    func.lower(P.profesion_principal).like(like),
+                    func.lower(P.descripcion_breve).like(like),
+                )
+            )
+        return stmt, None
+
+    @staticmethod
+    def search(
+        db: Session,
+        *,
+        q: Optional[str] = None,
+        profesion_normalizada: Optional[str] = None,
+        ciudad_normalizada: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fuzzy: bool = True,
+    ) -> Tuple[List[ProfessionalProfile], Optional[str]]:
+        """
+        Búsqueda con paginación keyset. Con texto: orden por relevancia (score desc, id);
+        sin texto: orden alfabético (nombre_completo, id). Devuelve (perfiles, next_cursor).
+        Lanza ValueError si el cursor es inválido.
+        """
+        P = ProfessionalProfile
+        terms = fulltext.query_terms(q or "")
+        stmt = select(P).options(lazyload(P.user))
+        stmt, score = ProfessionalRepository._apply_filters(
+            db,
+            stmt,
+            terms=terms,
+            profesion_normalizada=profesion_normalizada,
+            ciudad_normalizada=ciudad_normalizada,
+            fuzzy=fuzzy,
+        )
+
+        if score is not None:
+            stmt = stmt.add_columns(score.label("score"))
+            if cursor:
+                last_score, last_id = _decode_cursor(cursor)
+                stmt = stmt.where(or_(score < last_score, and_(score == last_score, P.id > last_id)))
+            stmt = stmt.order_by(score.desc(), P.id)
+        else:
+            if cursor:
+                last_name, last_id = _decode_cursor(cursor)
+                stmt = stmt.where(
+                    or_(P.nombre_completo > last_name, and_(P.nombre_completo == last_name, P.id > last_id))
+                )
+            stmt = stmt.order_by(P.nombre_completo, P.id)
+
+        rows = db.execute(stmt.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [r[0] for r in rows]
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            if score is not None:
+                next_cursor = _encode_cursor([float(last[1]), last[0].id])
+            else:
+                next_cursor = _encode_cursor([last[0].nombre_completo, last[0].id])
+        return items, next_cursor
+
+    @staticmethod
+    def facets(
+        db: Session,
+        *,
+        q: Optional[str] = None,
+        profesion_normalizada: Optional[str] = None,
+        ciudad_normalizada: Optional[str] = None,
+        size: int = 10,
+        fuzzy: bool = True,
+    ) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Conteos por ciudad_normalizada y profesion_normalizada sobre el mismo
+        conjunto filtrado que `search` (sin paginar).
+        """
+        P = ProfessionalProfile
+        terms = fulltext.query_terms(q or "")
+        out: Dict[str, List[Tuple[str, int]]] = {}
+        for name, col in (("ciudad", P.ciudad_normalizada), ("profesion", P.profesion_normalizada)):
+            stmt = select(col, func.count().label("n")).select_from(P)
+            stmt, _ = ProfessionalRepository._apply_filters(
+                db,
+                stmt,
+                terms=terms,
+                profesion_normalizada=profesion_normalizada,
+                ciudad_normalizada=ciudad_normalizada,
+                fuzzy=fuzzy,
+            )
+            stmt = stmt.where(col.isnot(None)).group_by(col).order_by(func.count().desc(), col).limit(size)
+            out[name] = [(v, int(n)) for v, n in db.execute(stmt).all()]
+        return out
+
+    @staticmethod
+    def nearby(
+        db: Session,
+        *,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        limit: int = 20,
+        q: Optional[str] = None,
+        profesion_normalizada: Optional[str] = None,
+        fuzzy: bool = True,
+    ) -> List[Tuple[ProfessionalProfile, float]]:
+        """
+        Los `limit` perfiles más cercanos a (lat, lon) dentro de `radius_km`,
+        ordenados por distancia: [(perfil, distancia en km)].
+        - PostgreSQL + earthdistance: una consulta kNN sobre el índice GiST.
+        - Resto: radio creciente desde KNN_INITIAL_RADIUS_KM. En cada paso se
+          recorren los rangos de las celdas geohash que cubren el círculo
+          (índice cubriente geohash, lat, lon, id), la BD pre-ordena por
+          distancia equirectangular y solo los primeros KNN_OVERFETCH x limit
+          candidatos se reordenan con haversine.
+        """
+        P = ProfessionalProfile
+        terms = fulltext.query_terms(q or "")
+        has_point = and_(P.lat.isnot(None), P.lon.isnot(None))
+
+        if spatial.earthdistance_available(db.connection()):
+            center = func.ll_to_earth(lat, lon)
+            point = func.ll_to_earth(P.lat, P.lon)
+            distance = func.earth_distance(point, center)
+            radius_m = radius_km * 1000.0
+            stmt = (
+                select(P, distance)
+                .options(lazyload(P.user))
+                .where(has_point, func.earth_box(center, radius_m).op("@>")(point), distance <= radius_m)
+            )
+            stmt, _ = ProfessionalRepository._apply_filters(
+                db, stmt, terms=terms, profesion_normalizada=profesion_normalizada, ciudad_normalizada=None, fuzzy=fuzzy
+            )
+            rows = db.execute(stmt.order_by(distance, P.id).limit(limit)).all()
+            return [(p, d / 1000.0) for p, d in rows]
+
+        # Distancia equirectangular al cuadrado (en grados): mismo orden que
+        # haversine salvo empates a escala de metros, que resuelve el reordenado
+        d_lat = P.lat - lat
+        d_lon = (P.lon - lon) * math.cos(math.radians(lat))
+        approx = d_lat * d_lat + d_lon * d_lon
+        fetch = limit * geo.KNN_OVERFETCH
+
+        found: Dict[str, float] = {}
+        reach = min(radius_km, geo.KNN_INITIAL_RADIUS_KM)
+        while True:
+            lat_min, lat_max, lon_min, lon_max = geo.bounding_box(lat, lon, reach)
+            cells = geo.covering_cells(lat, lon, reach)
+            stmt = select(P.id, P.lat, P.lon).where(
+                or_(*[and_(P.geohash >= c, P.geohash < c + geo.PREFIX_END) for c in cells]),
+                has_point,
+                P.lat.between(lat_min, lat_max),
+                P.lon.between(lon_min, lon_max),
+            )
+            stmt, _ = ProfessionalRepository._apply_filters(
+                db, stmt, terms=terms, profesion_normalizada=profesion_normalizada, ciudad_normalizada=None, fuzzy=fuzzy
+            )
+            found = {}
+            for pid, plat, plon in db.execute(stmt.order_by(approx).limit(fetch)):
+                d = geo.haversine_km(lat, lon, plat, plon)
+                if d <= reach:
+                    found[pid] = d
+            if len(found) >= limit or reach >= radius_km:
+                break
+            reach = min(radius_km, reach * geo.KNN_GROWTH)
+
+        nearest = heapq.nsmallest(limit, found.items(), key=lambda item: (item[1], item[0]))
+        if not nearest:
+            return []
+        profs = {
+            p.id: p
+            for p in db.execute(
+                select(P).options(lazyload(P.user)).where(P.id.in_([pid for pid, _ in nearest]))
+            ).scalars()
+        }
+        return [(profs[pid], d) for pid, d in nearest if pid in profs]
+
+
+class AsyncProfessionalRepository:
+    """
+    Variante async de ProfessionalRepository (AsyncSession).
+    """
+
+    @staticmethod
+    async def get_by_user_id(db: AsyncSession, user_id: str) -> Optional[ProfessionalProfile]:
+        stmt = select(ProfessionalProfile).where(ProfessionalProfile.user_id == user_id)
+        return (await db.execute(stmt)).scalars().first()
+
+    @staticmethod
+    async def create(db: AsyncSession, flush: bool = True, **fields) -> ProfessionalProfile:
+        prof = ProfessionalProfile(id=fields.pop("id", None) or _uuid(), **fields)
+        db.add(prof)
+        if flush:
+            await db.flush()
+        ProfileCache.invalidate_on_write(db, prof)
+        suggestions.record_write(db, None, prof)
+        return prof
+
+    @staticmethod
+    async def update(db: AsyncSession, prof: ProfessionalProfile, **fields) -> ProfessionalProfile:
+        before = suggestions.snapshot(prof)
+        for k, v in fields.items():
+            setattr(prof, k, v)
+        await db.flush()
+        ProfileCache.invalidate_on_write(db, prof)
+        suggestions.record_write(db, before, prof)
+        return prof
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.app.models.sync_watermark import SyncWatermark
+
+
+class SyncWatermarkRepository:
+    """
+    Acceso a datos para las marcas de agua de procesos incrementales.
+    """
+
+    @staticmethod
+    def get(db: Session, name: str) -> Optional[SyncWatermark]:
+        return db.get(SyncWatermark, name)
+
+    @staticmethod
+    def get_or_create(db: Session, name: str) -> SyncWatermark:
+        row = db.get(SyncWatermark, name)
+        if row is None:
+            row = SyncWatermark(name=name)
+            db.add(row)
+            db.flush()
+        return row
+
+    @staticmethod
+    def advance(db: Session, name: str, *, position_ts: Optional[datetime], position_key: Optional[str]) -> SyncWatermark:
+        row = SyncWatermarkRepository.get_or_create(db, name)
+        row.position_ts = position_ts
+        row.position_key = position_key
+        db.flush()
+        return row
+
+    @staticmethod
+    def set_cursor(db: Session, name: str, cursor: Optional[str]) -> SyncWatermark:
+        row = SyncWatermarkRepository.get_or_create(db, name)
+        row.cursor = cursor
+        db.flush()
+        return row
+
+    @staticmethod
+    def reset(db: Session, name: str) -> bool:
+        row = db.get(SyncWatermark, name)
+        if row is None:
+            return False
+        db.delete(row)
+        db.flush()
+        return True
@@ -1,7 +1,47 @@
-from typing import Optional
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.app.models.user import User
+from backend.app.models.user import User, _uuid
+
+
+def _new_user_values(
+    *,
+    email: str,
+    password_hash: str,
+    full_name: Optional[str],
+    phone: Optional[str],
+    city: Optional[str],
+    is_professional: bool,
+) -> Dict[str, Any]:
+    # id generado aquí (no por la BD): el perfil y el job se pueden preparar sin releerlo
+    return {
+        "id": _uuid(),
+        "email": email,
+        "password_hash": password_hash,
+        "full_name": full_name,
+        "phone": phone,
+        "city": city,
+        "is_professional": bool(is_professional),
+        "token_version": 0,
+    }
+
+
+def _insert_unless_email_exists(dialect: str, values: Dict[str, Any]) -> Any:
+    """
+    INSERT ... ON CONFLICT (email) DO NOTHING RETURNING <User>: una sola ida a
+    la BD; sin filas devueltas = email ya registrado (lo decide el índice único,
+    también entre registros concurrentes). None si el dialecto no lo soporta.
+    """
+    if dialect == "postgresql":
+        stmt = postgresql.insert(User)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(User)
+    else:
+        return None
+    return stmt.values(**values).on_conflict_do_nothing(index_elements=[User.email]).returning(User)
 
 
 class UserRepository:
@@ -17,6 +57,26 @@ class UserRepository:
     def get_by_id(db: Session, user_id: str) -> Optional[User]:
         return db.query(User).filter(User.id == user_id).first()
 
+    @staticmethod
+    def email_exists(db: Session, email: str) -> bool:
+        return db.execute(select(User.id).where(User.email == email).limit(1)).first() is not None
+
+    @staticmethod
+    def get_token_version(db: Session, user_id: str) -> Optional[int]:
+        """
+        Solo la versión de tokens (revocación); None si el usuario no existe.
+        """
+        return db.execute(select(User.token_version).where(User.id == user_id)).scalar_one_or_none()
+
+    @staticmethod
+    def bump_token_version(db: Session, user: User) -> int:
+        """
+        Revoca todos los tokens emitidos hasta ahora para el usuario.
+        """
+        user.token_version = (user.token_version or 0) + 1
+        db.flush()
+        return user.token_version
+
     @staticmethod
     def create(
         db: Session,
@@ -39,4 +99,118 @@ class UserRepository:
         db.add(user)
         # flush para materializar user.id sin commit
         db.flush()
-        return user
\ No newline at end of file
+        return user
+
+    @staticmethod
+    def create_unless_email_exists(
+        db: Session,
+        *,
+        email: str,
+        password_hash: str,
+        full_name: Optional[str] = None,
+        phone: Optional[str] = None,
+        city: Optional[str] = None,
+        is_professional: bool = False,
+    ) -> Optional[User]:
+        """
+        Alta sin lectura previa del email. None si ya existe un usuario con ese email.
+        """
+        values = _new_user_values(
+            email=email,
+            password_hash=password_hash,
+            full_name=full_name,
+            phone=phone,
+            city=city,
+            is_professional=is_professional,
+        )
+        stmt = _insert_unless_email_exists(db.get_bind().dialect.name, values)
+        if stmt is None:
+            # Otros dialectos: lectura previa + INSERT (el índice único sigue siendo la garantía)
+            if UserRepository.get_by_email(db, email):
+                return None
+            user = User(**values)
+            db.add(user)
+            db.flush()
+            return user
+        return db.execute(stmt).scalars().first()
+
+
+class AsyncUserRepository:
+    """
+    Variante async de UserRepository (AsyncSession).
+    """
+
+    @staticmethod
+    async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+        return await db.get(User, user_id)
+
+    @staticmethod
+    async def email_exists(db: AsyncSession, email: str) -> bool:
+        return (await db.execute(select(User.id).where(User.email == email).limit(1))).first() is not None
+
+    @staticmethod
+    async def get_token_version(db: AsyncSession, user_id: str) -> Optional[int]:
+        return (await db.execute(select(User.token_version).where(User.id == user_id))).scalar_one_or_none()
+
+    @staticmethod
+    async def bump_token_version(db: AsyncSession, user: User) -> int:
+        user.token_version = (user.token_version or 0) + 1
+        await db.flush()
+        return user.token_version
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        *,
+        email: str,
+        password_hash: str,
+        full_name: Optional[str] = None,
+        phone: Optional[str] = None,
+        city: Optional[str] = None,
+        is_professional: bool = False,
+    ) -> User:
+        user = User(
+            email=email,
+            password_hash=password_hash,
+            full_name=full_name,
+            phone=phone,
+            city=city,
+            is_professional=bool(is_professional),
+            token_version=0,
+        )
+        db.add(user)
+        await db.flush()
+        return user
+
+    @staticmethod
+    async def create_unless_email_exists(
+        db: AsyncSession,
+        *,
+        email: str,
+        password_hash: str,
+        full_name: Optional[str] = None,
+        phone: Optional[str] = None,
+        city: Optional[str] = None,
+        is_professional: bool = False,
+    ) -> Optional[User]:
+        values = _new_user_values(
+            email=email,
+            password_hash=password_hash,
+            full_name=full_name,
+            phone=phone,
+            city=city,
+            is_professional=is_professional,
+        )
+        stmt = _insert_unless_email_exists(db.get_bind().dialect.name, values)
+        if stmt is None:
+            if await AsyncUserRepository.get_by_email(db, email):
+                return None
+            user = User(**values)
+            db.add(user)
+            await db.flush()
+            return user
+        return (await db.execute(stmt)).scalars().first()
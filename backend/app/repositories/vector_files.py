@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.app.models.vector_file import VectorStoreFile
+
+
+class VectorFileRepository:
+    """
+    Acceso a datos para el mapeo prof_id -> file_id del Vector Store.
+    """
+
+    @staticmethod
+    def get_by_prof_id(db: Session, prof_id: str) -> Optional[VectorStoreFile]:
+        return db.get(VectorStoreFile, prof_id)
+
+    @staticmethod
+    def get_by_file_id(db: Session, file_id: str) -> List[VectorStoreFile]:
+        return list(db.execute(select(VectorStoreFile).where(VectorStoreFile.file_id == file_id)).scalars())
+
+    @staticmethod
+    def upsert(
+        db: Session,
+        *,
+        prof_id: str,
+        file_id: str,
+        vector_store_id: Optional[str] = None,
+        filename: Optional[str] = None,
+        shard_key: Optional[str] = None,
+        content_hash: Optional[str] = None,
+    ) -> VectorStoreFile:
+        row = db.get(VectorStoreFile, prof_id)
+        if row is None:
+            row = VectorStoreFile(prof_id=prof_id, file_id=file_id)
+            db.add(row)
+        row.file_id = file_id
+        row.vector_store_id = vector_store_id
+        row.filename = filename
+        row.shard_key = shard_key
+        row.content_hash = content_hash
+        db.flush()
+        return row
+
+    @staticmethod
+    def delete(db: Session, prof_id: str) -> bool:
+        row = db.get(VectorStoreFile, prof_id)
+        if row is None:
+            return False
+        db.delete(row)
+        db.flush()
+        return True
+
+    @staticmethod
+    def is_shared(db: Session, file_id: str, prof_id: str) -> bool:
+        """
+        True si otro profesional también está en `file_id` (archivo JSONL de lote):
+        ese archivo no debe borrarse al actualizar un único perfil.
+        """
+        row = db.execute(
+            select(VectorStoreFile.prof_id)
+            .where(VectorStoreFile.file_id == file_id, VectorStoreFile.prof_id != prof_id)
+            .limit(1)
+        ).first()
+        return row is not None
+
+    @staticmethod
+    def get_many(db: Session, prof_ids: Iterable[str]) -> Dict[str, VectorStoreFile]:
+        ids = list(prof_ids)
+        if not ids:
+            return {}
+        rows = db.execute(select(VectorStoreFile).where(VectorStoreFile.prof_id.in_(ids))).scalars()
+        return {r.prof_id: r for r in rows}
+
+    @staticmethod
+    def known_file_ids(db: Session, file_ids: Iterable[str]) -> Set[str]:
+        """
+        Devuelve el subconjunto de `file_ids` que tiene mapeo (consulta indexada por file_id).
+        """
+        ids = list(file_ids)
+        if not ids:
+            return set()
+        rows = db.execute(select(VectorStoreFile.file_id).where(VectorStoreFile.file_id.in_(ids)))
+        return {r[0] for r in rows}
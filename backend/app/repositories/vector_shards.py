@@ -0,0 +1,82 @@
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.models.vector_file import VectorStoreFile
+from backend.app.models.vector_shard import VectorShard
+
+
+class VectorShardRepository:
+    """
+    Acceso a datos para el manifiesto de shards y su pertenencia (vector_store_files.shard_key).
+    """
+
+    @staticmethod
+    def get(db: Session, shard_key: str) -> Optional[VectorShard]:
+        return db.get(VectorShard, shard_key)
+
+    @staticmethod
+    def get_or_create(db: Session, shard_key: str) -> VectorShard:
+        shard = db.get(VectorShard, shard_key)
+        if shard is None:
+            shard = VectorShard(shard_key=shard_key, version=0, record_count=0)
+            db.add(shard)
+            db.flush()
+        return shard
+
+    @staticmethod
+    def member_ids(db: Session, shard_key: str) -> List[str]:
+        rows = db.execute(select(VectorStoreFile.prof_id).where(VectorStoreFile.shard_key == shard_key))
+        return [r[0] for r in rows]
+
+    @staticmethod
+    def swap_file(
+        db: Session,
+        shard_key: str,
+        *,
+        expected_version: int,
+        file_id: str,
+        vector_store_id: Optional[str],
+        record_count: int,
+        content_hash: str,
+    ) -> bool:
+        """
+        Publica la nueva versión del shard solo si nadie la cambió desde que se leyó
+        (UPDATE condicional sobre `version`). False = conflicto, reintentar.
+        """
+        res = db.execute(
+            update(VectorShard)
+            .where(VectorShard.shard_key == shard_key, VectorShard.version == expected_version)
+            .values(
+                file_id=file_id,
+                vector_store_id=vector_store_id,
+                record_count=record_count,
+                content_hash=content_hash,
+                version=VectorShard.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount == 1
+
+    @staticmethod
+    def delete_if_version(db: Session, shard_key: str, expected_version: int) -> bool:
+        res = db.execute(
+            delete(VectorShard)
+            .where(VectorShard.shard_key == shard_key, VectorShard.version == expected_version)
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount == 1
+
+    @staticmethod
+    def list_all(db: Session) -> List[VectorShard]:
+        return list(db.execute(select(VectorShard).order_by(VectorShard.shard_key)).scalars())
+
+    @staticmethod
+    def known_file_ids(db: Session, file_ids: Iterable[str]) -> Set[str]:
+        """Subconjunto de `file_ids` que es la versión vigente de algún shard."""
+        ids = list(file_ids)
+        if not ids:
+            return set()
+        rows = db.execute(select(VectorShard.file_id).where(VectorShard.file_id.in_(ids)))
+        return {r[0] for r in rows}
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field
+
+
+class ImportRow(BaseModel):
+    """
+    Fila de importación masiva (CSV/JSONL). Campos de usuario + perfil profesional aplanados.
+    `nombre_completo` y `ciudad` caen a `full_name` y `city` si no vienen.
+    """
+
+    email: EmailStr
+    password: Optional[str] = Field(default=None, min_length=6)
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+    city: Optional[str] = None
+
+    nombre_completo: Optional[str] = None
+    profesion_principal: str = Field(min_length=1)
+    ciudad: Optional[str] = None
+    barrio: Optional[str] = None
+    telefono: Optional[str] = None
+    email_profesional: Optional[EmailStr] = None
+    descripcion_breve: Optional[str] = None
+    lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    lon: Optional[float] = Field(default=None, ge=-180, le=180)
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    read: int = 0
+    inserted: int = 0
+    skipped_duplicates: int = 0
+    invalid: int = 0
+    indexed: int = 0
+    index_enqueued: int = 0
+    batches: int = 0
+    errors: List[ImportRowError] = []
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional, Any
+from pydantic import BaseModel
+
+
+class IndexJobOut(BaseModel):
+    id: str
+    prof_id: str
+    operation: str
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    file_id: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+def index_job_to_out(j: Any) -> IndexJobOut:
+    return IndexJobOut(
+        id=j.id,
+        prof_id=j.prof_id,
+        operation=j.operation,
+        status=j.status,
+        attempts=j.attempts or 0,
+        max_attempts=j.max_attempts,
+        last_error=j.last_error,
+        file_id=j.file_id,
+        next_attempt_at=j.next_attempt_at,
+        created_at=j.created_at,
+        updated_at=j.updated_at,
+    )
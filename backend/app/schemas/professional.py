@@ -1,5 +1,8 @@
-from typing import Optional, Any, Dict
-from pydantic import BaseModel, EmailStr
+import hashlib
+import json
+
+from typing import Optional, Any, Dict, List
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class ProfessionalProfileIn(BaseModel):
@@ -10,30 +13,93 @@ class ProfessionalProfileIn(BaseModel):
     telefono: Optional[str] = None
     email: Optional[EmailStr] = None
     descripcion_breve: Optional[str] = None
+    # Coordenadas explícitas (pin en el mapa); sin ellas se geocodifica barrio/ciudad
+    lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    lon: Optional[float] = Field(default=None, ge=-180, le=180)
 
 
 class ProfessionalProfileOut(ProfessionalProfileIn):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     profesion_normalizada: Optional[str] = None
     ciudad_normalizada: Optional[str] = None
     vector_store_file_id: Optional[str] = None
 
 
-def prof_to_out(p: Optional[Any]) -> Optional[ProfessionalProfileOut]:
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ProfessionalSearchResponse(BaseModel):
+    items: List[ProfessionalProfileOut]
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, List[FacetCount]]] = None
+
+
+class Suggestion(BaseModel):
+    value: str  # forma normalizada (usar como filtro profesion/ciudad de /search)
+    label: str  # grafía original más frecuente, para mostrar
+    count: int
+
+
+class SuggestResponse(BaseModel):
+    profesion: Optional[List[Suggestion]] = None
+    ciudad: Optional[List[Suggestion]] = None
+
+
+class GeoPoint(BaseModel):
+    lat: float
+    lon: float
+
+
+class NearbyProfessionalOut(ProfessionalProfileOut):
+    distance_km: float
+
+
+class NearbySearchResponse(BaseModel):
+    center: GeoPoint
+    items: List[NearbyProfessionalOut]
+
+
+class HybridProfessionalOut(ProfessionalProfileOut):
+    score: float
+    sources: List[str]  # "lexical" | "vector": fuentes que devolvieron el perfil
+
+
+class HybridSearchResponse(BaseModel):
+    items: List[HybridProfessionalOut]
+    timings_ms: Dict[str, float]
+    cached: bool = False
+    degraded: bool = False  # el Vector Store falló o no respondió a tiempo: solo léxico
+
+
+_PROF_OUT_FIELDS = tuple(ProfessionalProfileOut.model_fields)
+
+
+def prof_to_out(p: Optional[Any], validate: bool = False) -> Optional[ProfessionalProfileOut]:
+    """
+    Filas de BD (ya validadas al escribirse): model_construct, sin volver a
+    validar cada campo (EmailStr incluido). `validate=True` para objetos de
+    origen no confiable (from_attributes).
+    """
     if not p:
         return None
-    return ProfessionalProfileOut(
-        id=p.id,
-        nombre_completo=p.nombre_completo,
-        profesion_principal=p.profesion_principal,
-        ciudad=p.ciudad,
-        barrio=p.barrio,
-        telefono=p.telefono,
-        email=p.email,
-        descripcion_breve=p.descripcion_breve,
-        profesion_normalizada=p.profesion_normalizada,
-        ciudad_normalizada=p.ciudad_normalizada,
-        vector_store_file_id=p.vector_store_file_id,
+    if validate:
+        return ProfessionalProfileOut.model_validate(p)
+    return ProfessionalProfileOut.model_construct(**{f: getattr(p, f) for f in _PROF_OUT_FIELDS})
+
+
+def prof_to_nearby_out(p: Any, distance_km: float) -> NearbyProfessionalOut:
+    return NearbyProfessionalOut.model_construct(
+        **{f: getattr(p, f) for f in _PROF_OUT_FIELDS}, distance_km=round(distance_km, 3)
+    )
+
+
+def prof_to_hybrid_out(p: Any, score: float, sources: List[str]) -> HybridProfessionalOut:
+    return HybridProfessionalOut.model_construct(
+        **{f: getattr(p, f) for f in _PROF_OUT_FIELDS}, score=round(score, 6), sources=sources
     )
 
 
@@ -56,4 +122,12 @@ def build_prof_json_for_vector_store(p: Any, user_id: str) -> Dict[str, Any]:
         "ciudad_normalizada": p.ciudad_normalizada,
         "source": "registro",
     }
-    return payload
\ No newline at end of file
+    return payload
+
+
+def vector_document_hash(doc: Dict[str, Any]) -> str:
+    """
+    Huella del documento indexado (sha256 del JSON canónico).
+    Se guarda en el mapeo para detectar perfiles cuyo documento remoto quedó desactualizado.
+    """
+    return hashlib.sha256(json.dumps(doc, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
\ No newline at end of file
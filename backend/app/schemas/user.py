@@ -1,8 +1,10 @@
 from typing import Optional, Any
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     email: EmailStr
     full_name: Optional[str] = None
@@ -11,12 +13,15 @@ class UserOut(BaseModel):
     is_professional: bool
 
 
-def user_to_out(u: Any) -> UserOut:
-    return UserOut(
+def user_to_out(u: Any, validate: bool = False) -> UserOut:
+    """Mismo criterio que prof_to_out: model_construct para filas de BD."""
+    if validate:
+        return UserOut.model_validate(u)
+    return UserOut.model_construct(
         id=u.id,
         email=u.email,
         full_name=getattr(u, "full_name", None),
         phone=getattr(u, "phone", None),
         city=getattr(u, "city", None),
         is_professional=bool(getattr(u, "is_professional", False)),
-    )
\ No newline at end of file
+    )
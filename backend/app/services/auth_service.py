@@ -1,19 +1,24 @@
 from typing import Optional, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.core.security import (
     get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
     create_access_token,
 )
+from backend.app.core.geo import geo_fields
+from backend.app.core.normalization import normalize_city, normalize_profession
 from backend.app.models.user import User
 from backend.app.models.professional import ProfessionalProfile
-from backend.app.repositories.users import UserRepository
-from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.repositories.users import AsyncUserRepository, UserRepository
+from backend.app.repositories.professionals import AsyncProfessionalRepository, ProfessionalRepository
 from backend.app.schemas.auth import RegisterRequest, LoginRequest
-from backend.app.schemas.professional import build_prof_json_for_vector_store
-from backend.app.services.vector_store_service import VectorStoreService
+from backend.app.services.indexing_service import IndexingService
 
 
 class AuthService:
@@ -23,34 +28,56 @@ class AuthService:
 
     @staticmethod
     def register(db: Session, payload: RegisterRequest) -> Tuple[User, Optional[ProfessionalProfile]]:
-        # 1) Email único
-        existing = UserRepository.get_by_email(db, payload.email)
-        if existing:
+        """
+        Un email ya registrado se rechaza con una lectura por índice antes de
+        calcular el hash (bcrypt es lo caro del alta). El INSERT ... ON CONFLICT
+        queda como guarda ante registros concurrentes del mismo email. Perfil y
+        job de indexación llevan id generado aquí y se escriben en el commit del caller.
+        """
+        AuthService._check_register(db, payload)
+        return AuthService._create_account(db, payload, get_password_hash(payload.password))
+
+    @staticmethod
+    async def register_offloaded(db: Session, payload: RegisterRequest) -> Tuple[User, Optional[ProfessionalProfile]]:
+        """
+        register() para rutas async sobre la Session síncrona: las consultas van
+        al threadpool y bcrypt se espera sin ocupar un hilo de request.
+        """
+        await run_in_threadpool(AuthService._check_register, db, payload)
+        password_hash = await get_password_hash_async(payload.password)
+        return await run_in_threadpool(AuthService._create_account, db, payload, password_hash)
+
+    @staticmethod
+    def _check_register(db: Session, payload: RegisterRequest) -> None:
+        if payload.is_professional and not payload.professional:
+            raise ValueError("Faltan datos del profesional (campo 'professional')")
+        if UserRepository.email_exists(db, payload.email):
             raise ValueError("Email ya registrado")
 
-        # 2) Crear usuario
-        user = UserRepository.create(
+    @staticmethod
+    def _create_account(
+        db: Session, payload: RegisterRequest, password_hash: str
+    ) -> Tuple[User, Optional[ProfessionalProfile]]:
+        # 1) Crear usuario (None: email registrado por una petición concurrente)
+        user = UserRepository.create_unless_email_exists(
             db,
             email=payload.email,
-            password_hash=get_password_hash(payload.password),
+            password_hash=password_hash,
             full_name=payload.full_name,
             phone=payload.phone,
             city=payload.city,
             is_professional=bool(payload.is_professional),
         )
+        if user is None:
+            raise ValueError("Email ya registrado")
 
         prof_obj: Optional[ProfessionalProfile] = None
 
-        # 3) Si es profesional, crear perfil + indexar en Vector Store
+        # 2) Si es profesional, crear perfil + encolar indexación en Vector Store
         if payload.is_professional:
-            if not payload.professional:
-                raise ValueError("Faltan datos del profesional (campo 'professional')")
-
             p_in = payload.professional
-            profesion_normalizada = (
-                p_in.profesion_principal.strip().lower() if p_in.profesion_principal else None
-            )
-            ciudad_normalizada = p_in.ciudad.strip().lower() if p_in.ciudad else None
+            profesion_normalizada = normalize_profession(p_in.profesion_principal)
+            ciudad_normalizada = normalize_city(p_in.ciudad)
 
             prof_obj = ProfessionalRepository.create(
                 db,
@@ -64,23 +91,124 @@ class AuthService:
                 descripcion_breve=p_in.descripcion_breve,
                 profesion_normalizada=profesion_normalizada,
                 ciudad_normalizada=ciudad_normalizada,
+                flush=False,
+                **geo_fields(p_in.ciudad, p_in.barrio, p_in.lat, p_in.lon),
             )
 
-            # Construir documento y subir a Vector Store (sincrónico para consistencia)
-            doc = build_prof_json_for_vector_store(prof_obj, user_id=user.id)
-            file_id = VectorStoreService.add_or_update_professional(doc, prof_id=prof_obj.id)
-            prof_obj.vector_store_file_id = file_id
+            # La indexación se encola en el outbox (misma transacción); el worker
+            # sube el documento y escribe vector_store_file_id al terminar.
+            IndexingService.enqueue_upsert(db, prof_id=prof_obj.id, user_id=user.id, new_profile=True)
 
         return user, prof_obj
 
     @staticmethod
     def login(db: Session, payload: LoginRequest) -> Tuple[str, User]:
         user = UserRepository.get_by_email(db, payload.email)
-        if not user or not verify_password(payload.password, user.password_hash):
+        if not user:
+            raise ValueError("Credenciales inválidas")
+        ok, new_hash = verify_and_update_password(payload.password, user.password_hash)
+        if not ok:
+            raise ValueError("Credenciales inválidas")
+        if new_hash:
+            # Rehash transparente (cost/esquema deprecado); el router confirma
+            user.password_hash = new_hash
+            db.flush()
+
+        return AuthService._issue_token(user), user
+
+    @staticmethod
+    async def login_offloaded(db: Session, payload: LoginRequest) -> Tuple[str, User]:
+        """login() para rutas async sobre la Session síncrona (ver register_offloaded)."""
+        user = await run_in_threadpool(UserRepository.get_by_email, db, payload.email)
+        if not user:
             raise ValueError("Credenciales inválidas")
+        ok, new_hash = await verify_and_update_password_async(payload.password, user.password_hash)
+        if not ok:
+            raise ValueError("Credenciales inválidas")
+        if new_hash:
+            user.password_hash = new_hash
+            await run_in_threadpool(db.flush)
+        return AuthService._issue_token(user), user
 
-        token = create_access_token(
+    @staticmethod
+    def _issue_token(user: User) -> str:
+        return create_access_token(
             subject=user.id,
-            extra_claims={"email": user.email, "is_professional": user.is_professional},
+            extra_claims={
+                "email": user.email,
+                "is_professional": user.is_professional,
+                "ver": user.token_version or 0,
+            },
         )
-        return token, user
\ No newline at end of file
+
+    @staticmethod
+    def revoke_tokens(db: Session, user: User) -> int:
+        """
+        Invalida todos los tokens del usuario (incrementa token_version).
+        Devuelve la nueva versión; el caller hace commit y purga la caché local.
+        """
+        return UserRepository.bump_token_version(db, user)
+
+    # -------------------------
+    # Variantes async (DB_ASYNC=true)
+    # -------------------------
+    @staticmethod
+    async def register_async(db: AsyncSession, payload: RegisterRequest) -> Tuple[User, Optional[ProfessionalProfile]]:
+        if payload.is_professional and not payload.professional:
+            raise ValueError("Faltan datos del profesional (campo 'professional')")
+        if await AsyncUserRepository.email_exists(db, payload.email):
+            raise ValueError("Email ya registrado")
+
+        user = await AsyncUserRepository.create_unless_email_exists(
+            db,
+            email=payload.email,
+            password_hash=await get_password_hash_async(payload.password),
+            full_name=payload.full_name,
+            phone=payload.phone,
+            city=payload.city,
+            is_professional=bool(payload.is_professional),
+        )
+        if user is None:
+            raise ValueError("Email ya registrado")
+
+        prof_obj: Optional[ProfessionalProfile] = None
+        if payload.is_professional:
+            p_in = payload.professional
+            prof_obj = await AsyncProfessionalRepository.create(
+                db,
+                flush=False,
+                user_id=user.id,
+                nombre_completo=p_in.nombre_completo,
+                profesion_principal=p_in.profesion_principal,
+                ciudad=p_in.ciudad,
+                barrio=p_in.barrio,
+                telefono=p_in.telefono,
+                email=p_in.email if p_in.email else payload.email,
+                descripcion_breve=p_in.descripcion_breve,
+                profesion_normalizada=normalize_profession(p_in.profesion_principal),
+                ciudad_normalizada=normalize_city(p_in.ciudad),
+                **geo_fields(p_in.ciudad, p_in.barrio, p_in.lat, p_in.lon),
+            )
+            prof_id, user_id = prof_obj.id, user.id
+            await db.run_sync(
+                lambda s: IndexingService.enqueue_upsert(s, prof_id=prof_id, user_id=user_id, new_profile=True)
+            )
+
+        return user, prof_obj
+
+    @staticmethod
+    async def login_async(db: AsyncSession, payload: LoginRequest) -> Tuple[str, User]:
+        user = await AsyncUserRepository.get_by_email(db, payload.email)
+        if not user:
+            raise ValueError("Credenciales inválidas")
+        ok, new_hash = await verify_and_update_password_async(payload.password, user.password_hash)
+        if not ok:
+            raise ValueError("Credenciales inválidas")
+        if new_hash:
+            user.password_hash = new_hash
+            await db.flush()
+        return AuthService._issue_token(user), user
+
+    @staticmethod
+    async def revoke_tokens_async(db: AsyncSession, user: User) -> int:
+        return await AsyncUserRepository.bump_token_version(db, user)
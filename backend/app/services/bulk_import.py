@@ -0,0 +1,277 @@
+import csv
+import datetime as dt
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.core import suggestions
+from backend.app.core.geo import geo_fields
+from backend.app.core.normalization import normalize_city, normalize_profession
+from backend.app.core.security import hash_password_inline, make_unusable_password
+from backend.app.core.settings import get_settings
+from backend.app.integrations.shard_writers import shard_filename
+from backend.app.models.index_job import IndexJob, JOB_PENDING, OP_UPSERT
+from backend.app.models.professional import ProfessionalProfile, _uuid
+from backend.app.models.user import User
+from backend.app.models.vector_file import VectorStoreFile
+from backend.app.schemas.bulk_import import ImportResult, ImportRow, ImportRowError
+from backend.app.schemas.professional import build_prof_json_for_vector_store, vector_document_hash
+from backend.app.services.vector_sharding import IMPORT_SHARD_PREFIX, ShardingService
+from backend.app.services.vector_store_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+# Modos de indexación de la importación
+INDEX_PACKED = "packed"    # JSONL multi-registro por lote (shard), sincrónico con la importación
+INDEX_OUTBOX = "outbox"    # un job por perfil en vector_index_jobs (lo procesa el worker)
+INDEX_NONE = "none"
+
+MAX_REPORTED_ERRORS = 200
+
+
+def _clean(value: Any) -> Any:
+    """Celdas vacías de CSV -> None."""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+class BulkImportService:
+    """
+    Importación masiva de profesionales (CSV/JSONL) con inserts por lotes.
+    Normaliza exactamente como AuthService.register, pero sin un flush por fila
+    ni una subida al Vector Store por profesional.
+    """
+
+    @staticmethod
+    def iter_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Itera (número de línea, dict) en streaming, sin cargar el archivo completo.
+        """
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, {k.strip(): _clean(v) for k, v in row.items() if k}
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError as e:
+                    yield line_no, {"__error__": f"JSON inválido: {e}"}
+                    continue
+                yield line_no, {k: _clean(v) for k, v in obj.items()} if isinstance(obj, dict) else {"__error__": "Se esperaba un objeto JSON"}
+        else:
+            raise ValueError(f"Formato no soportado: {fmt}")
+
+    @staticmethod
+    def run(
+        db: Session,
+        rows: Iterable[Tuple[int, Dict[str, Any]]],
+        *,
+        batch_size: Optional[int] = None,
+        index_mode: str = INDEX_PACKED,
+        hash_workers: Optional[int] = None,
+    ) -> ImportResult:
+        """
+        Consume `rows` en lotes de `batch_size`; cada lote se inserta y confirma por separado
+        (un fallo a mitad no deshace los lotes anteriores).
+        """
+        settings = get_settings()
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        if index_mode not in (INDEX_PACKED, INDEX_OUTBOX, INDEX_NONE):
+            raise ValueError(f"Modo de indexación no soportado: {index_mode}")
+
+        result = ImportResult()
+        seen: Set[str] = set()
+        batch: List[Tuple[int, ImportRow]] = []
+
+        with ThreadPoolExecutor(max_workers=hash_workers or settings.IMPORT_HASH_WORKERS) as pool:
+            for line, raw in rows:
+                result.read += 1
+                row = BulkImportService._validate(line, raw, result)
+                if row is None:
+                    continue
+                email = str(row.email)
+                if email in seen:
+                    result.skipped_duplicates += 1
+                    continue
+                seen.add(email)
+                batch.append((line, row))
+                if len(batch) >= batch_size:
+                    BulkImportService._flush_batch(db, batch, result, index_mode, pool)
+                    batch = []
+            if batch:
+                BulkImportService._flush_batch(db, batch, result, index_mode, pool)
+        return result
+
+    @staticmethod
+    def _validate(line: int, raw: Dict[str, Any], result: ImportResult) -> Optional[ImportRow]:
+        error = raw.pop("__error__", None)
+        if error is None:
+            try:
+                return ImportRow(**raw)
+            except ValidationError as ve:
+                error = "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in ve.errors())
+        result.invalid += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(ImportRowError(line=line, error=error))
+        return None
+
+    @staticmethod
+    def _flush_batch(
+        db: Session,
+        batch: List[Tuple[int, ImportRow]],
+        result: ImportResult,
+        index_mode: str,
+        pool: ThreadPoolExecutor,
+    ) -> None:
+        result.batches += 1
+
+        # 1) Emails ya registrados (una sola consulta IN por lote)
+        emails = [str(r.email) for _, r in batch]
+        existing = set(db.execute(select(User.email).where(User.email.in_(emails))).scalars())
+        rows = [r for _, r in batch if str(r.email) not in existing]
+        result.skipped_duplicates += len(batch) - len(rows)
+        if not rows:
+            return
+
+        # 2) bcrypt en paralelo (la extensión C libera el GIL); sin contraseña -> no utilizable
+        hashes = list(pool.map(lambda r: hash_password_inline(r.password) if r.password else make_unusable_password(), rows))
+
+        users: List[Dict[str, Any]] = []
+        profs: List[Dict[str, Any]] = []
+        for r, pwd_hash in zip(rows, hashes):
+            user_id = _uuid()
+            ciudad = r.ciudad or r.city
+            users.append(
+                {
+                    "id": user_id,
+                    "email": str(r.email),
+                    "password_hash": pwd_hash,
+                    "full_name": r.full_name,
+                    "phone": r.phone,
+                    "city": r.city,
+                    "is_professional": True,
+                }
+            )
+            profs.append(
+                {
+                    "id": _uuid(),
+                    "user_id": user_id,
+                    "nombre_completo": r.nombre_completo or r.full_name or str(r.email),
+                    "profesion_principal": r.profesion_principal,
+                    "ciudad": ciudad,
+                    "barrio": r.barrio,
+                    "telefono": r.telefono or r.phone,
+                    "email": str(r.email_profesional) if r.email_profesional else str(r.email),
+                    "descripcion_breve": r.descripcion_breve,
+                    "profesion_normalizada": normalize_profession(r.profesion_principal),
+                    "ciudad_normalizada": normalize_city(ciudad),
+                    **geo_fields(ciudad, r.barrio, r.lat, r.lon),
+                }
+            )
+
+        # 3) Inserts por lote (executemany / insertmanyvalues), un commit por lote
+        try:
+            db.execute(insert(User), users)
+            db.execute(insert(ProfessionalProfile), profs)
+            if index_mode == INDEX_OUTBOX:
+                BulkImportService._enqueue_jobs(db, profs)
+                result.index_enqueued += len(profs)
+            suggestions.record_inserts(db, profs)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        result.inserted += len(profs)
+
+        # 4) Indexación empaquetada: un único JSONL por lote (o por shard afectado)
+        if index_mode == INDEX_PACKED:
+            docs = [build_prof_json_for_vector_store(SimpleNamespace(**p), user_id=p["user_id"]) for p in profs]
+            try:
+                failed = BulkImportService._index_packed(db, docs, result.batches)
+            except Exception as e:
+                # Los perfiles ya están guardados: se delega al outbox para reintentar
+                db.rollback()
+                logger.warning("Indexación empaquetada del lote %d falló (%s); se encola en outbox", result.batches, e)
+                failed = {p["id"] for p in profs}
+            if failed:
+                BulkImportService._enqueue_jobs(db, [p for p in profs if p["id"] in failed])
+                db.commit()
+                result.index_enqueued += len(failed)
+            result.indexed += len(profs) - len(failed)
+
+    @staticmethod
+    def _index_packed(db: Session, docs: List[Dict[str, Any]], batch_no: int) -> Set[str]:
+        """
+        Indexa el lote y devuelve los prof_ids que fallaron (van al outbox).
+        Un archivo con varios perfiles siempre queda bajo la capa de shards, que
+        lo reescribe sin el perfil cuando este se reindexa o se borra:
+        - VECTOR_SHARDING activo: cada perfil entra en su shard (una reescritura
+          por shard afectado)
+        - si no: el JSONL del lote se registra como shard "import:<lote>"
+        """
+        if ShardingService.enabled():
+            outcomes = ShardingService.process([(d["prof_id"], d, d["prof_id"], OP_UPSERT, None) for d in docs])
+            return {pid for pid, outcome in outcomes.items() if isinstance(outcome, Exception)}
+
+        shard_key = f"{IMPORT_SHARD_PREFIX}{dt.datetime.now(dt.timezone.utc):%Y%m%dT%H%M%S}_{batch_no}"
+        file_ids = VectorStoreService.add_professionals_batch(
+            docs, batch_name=shard_filename(shard_key)[: -len(".jsonl")]
+        )
+        if len(set(file_ids.values())) < len(file_ids):
+            ShardingService.register_packed(shard_key, docs, next(iter(file_ids.values())))
+            return set()
+
+        # Un archivo por perfil (p. ej. backend local): mapeo individual
+        settings = get_settings()
+        hashes = {d["prof_id"]: vector_document_hash(d) for d in docs}
+        db.execute(
+            insert(VectorStoreFile),
+            [
+                {
+                    "prof_id": pid,
+                    "file_id": fid,
+                    "vector_store_id": settings.VECTOR_STORE_ID,
+                    "content_hash": hashes.get(pid),
+                }
+                for pid, fid in file_ids.items()
+            ],
+        )
+        db.execute(
+            update(ProfessionalProfile),
+            [{"id": pid, "vector_store_file_id": fid} for pid, fid in file_ids.items()],
+        )
+        db.commit()
+        return set()
+
+    @staticmethod
+    def _enqueue_jobs(db: Session, profs: List[Dict[str, Any]]) -> None:
+        settings = get_settings()
+        now = dt.datetime.now(dt.timezone.utc)
+        db.execute(
+            insert(IndexJob),
+            [
+                {
+                    "id": _uuid(),
+                    "prof_id": p["id"],
+                    "user_id": p["user_id"],
+                    "operation": OP_UPSERT,
+                    "status": JOB_PENDING,
+                    "attempts": 0,
+                    "max_attempts": settings.INDEX_JOB_MAX_ATTEMPTS,
+                    "next_attempt_at": now,
+                }
+                for p in profs
+            ],
+        )
@@ -0,0 +1,327 @@
+"""
+Exportación del directorio (users, professional_profiles) para analítica.
+
+- Filas leídas con cursor del lado del servidor (`yield_per`): memoria acotada
+  por EXPORT_BATCH_SIZE sea cual sea el tamaño de la tabla.
+- Formatos: NDJSON, CSV o Parquet (pyarrow, dependencia opcional; un row group
+  por lote). NDJSON/CSV admiten gzip en streaming.
+- Incremental por (updated_at, id): `since` es el cursor devuelto por la
+  exportación anterior. El límite superior se fija al planificar (dejando fuera
+  los últimos EXPORT_LAG_S, transacciones aún en curso), así que el cursor
+  siguiente se conoce antes de emitir la primera fila.
+"""
+import base64
+import csv
+import datetime as dt
+import importlib.util
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, and_, or_, select
+from sqlalchemy.orm import Session
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.db.timestamps import comparable_ts, ts_bound
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.models.user import User
+
+try:
+    import orjson  # dependencia opcional
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+# Tabla -> (modelo, columnas que nunca se exportan)
+TABLES: Dict[str, Tuple[Any, frozenset]] = {
+    "users": (User, frozenset({"password_hash", "token_version"})),
+    "professional_profiles": (ProfessionalProfile, frozenset()),
+}
+
+_rows_exported = registry.counter(
+    "export_rows_total",
+    "Filas exportadas",
+    ["table", "format"],
+)
+
+Position = Tuple[dt.datetime, str]
+
+
+def encode_cursor(pos: Optional[Position]) -> Optional[str]:
+    if pos is None:
+        return None
+    raw = json.dumps([pos[0].isoformat(), pos[1]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        ts, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return dt.datetime.fromisoformat(ts), str(key)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor de exportación inválido") from exc
+
+
+@dataclass(frozen=True)
+class ExportPlan:
+    table: str
+    since: Optional[Position]
+    until: Optional[Position]  # None: no hay filas nuevas
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """Cursor para la siguiente exportación incremental."""
+        return encode_cursor(self.until or self.since)
+
+
+# -------------------------
+# Codificadores por formato
+# -------------------------
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (dt.datetime, dt.date)):
+        return obj.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+class _NdjsonEncoder:
+    def __init__(self, columns: Sequence[Any]) -> None:
+        self.names = [c.name for c in columns]
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Sequence[Any]]) -> bytes:
+        if orjson is not None:
+            return b"".join(orjson.dumps(dict(zip(self.names, r)), option=orjson.OPT_APPEND_NEWLINE) for r in rows)
+        return "".join(
+            json.dumps(dict(zip(self.names, r)), default=_json_default, ensure_ascii=False) + "\n" for r in rows
+        ).encode("utf-8")
+
+    def end(self) -> bytes:
+        return b""
+
+
+class _CsvEncoder:
+    def __init__(self, columns: Sequence[Any]) -> None:
+        self.names = [c.name for c in columns]
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf)
+
+    def _drain(self) -> bytes:
+        data = self._buf.getvalue().encode("utf-8")
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self._writer.writerow(self.names)
+        return self._drain()
+
+    def encode(self, rows: List[Sequence[Any]]) -> bytes:
+        self._writer.writerows(
+            [[v.isoformat() if isinstance(v, dt.datetime) else v for v in r] for r in rows]
+        )
+        return self._drain()
+
+    def end(self) -> bytes:
+        return b""
+
+
+class _Sink(io.RawIOBase):
+    """Destino de escritura de pyarrow que se vacía tras cada row group."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ParquetEncoder:
+    def __init__(self, columns: Sequence[Any], compression: str = "snappy") -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ValueError("El formato parquet requiere el paquete 'pyarrow'") from exc
+        self._pa = pa
+        self.names = [c.name for c in columns]
+        self.schema = pa.schema([(c.name, self._arrow_type(c.type)) for c in columns])
+        self._sink = _Sink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression=compression)
+
+    def _arrow_type(self, sa_type: Any) -> Any:
+        pa = self._pa
+        if isinstance(sa_type, Boolean):
+            return pa.bool_()
+        if isinstance(sa_type, Integer):
+            return pa.int64()
+        if isinstance(sa_type, Float):
+            return pa.float64()
+        if isinstance(sa_type, DateTime):
+            return pa.timestamp("us", tz="UTC" if sa_type.timezone else None)
+        return pa.string()
+
+    def begin(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: List[Sequence[Any]]) -> bytes:
+        columns = list(zip(*rows))
+        arrays = [self._pa.array(list(col), type=field.type) for col, field in zip(columns, self.schema)]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+        return self._sink.drain()
+
+    def end(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportService:
+    @staticmethod
+    def check_format(fmt: str) -> None:
+        """Lanza ValueError antes de empezar a emitir si el formato no es utilizable."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt} ({' | '.join(FORMATS)})")
+        # Solo se comprueba que pyarrow esté instalado; se importa al escribir
+        if fmt == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            raise ValueError("El formato parquet requiere el paquete 'pyarrow'")
+
+    @staticmethod
+    def media_type(fmt: str, gzip: bool) -> str:
+        return "application/gzip" if gzip and fmt != "parquet" else MEDIA_TYPES[fmt]
+
+    @staticmethod
+    def columns(table: str) -> List[Any]:
+        if table not in TABLES:
+            raise ValueError(f"Tabla no exportable: {table} (disponibles: {', '.join(TABLES)})")
+        model, excluded = TABLES[table]
+        return [c for c in model.__table__.columns if c.name not in excluded]
+
+    @staticmethod
+    def plan(db: Session, table: str, since: Optional[str] = None) -> ExportPlan:
+        """
+        Fija el rango (since, until] de la exportación. Lanza ValueError si la
+        tabla o el cursor no son válidos.
+        """
+        model, _ = TABLES.get(table, (None, None))
+        if model is None:
+            raise ValueError(f"Tabla no exportable: {table} (disponibles: {', '.join(TABLES)})")
+        since_pos = decode_cursor(since) if since else None
+        upper = dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=get_settings().EXPORT_LAG_S)
+        updated_at = comparable_ts(db, model.updated_at)
+
+        q = (
+            select(model.updated_at, model.id)
+            .where(updated_at <= ts_bound(db, upper))
+            .order_by(model.updated_at.desc(), model.id.desc())
+            .limit(1)
+        )
+        if since_pos is not None:
+            q = q.where(ExportService._after(db, model, since_pos))
+        last = db.execute(q).first()
+        return ExportPlan(table=table, since=since_pos, until=(last[0], last[1]) if last else None)
+
+    @staticmethod
+    def _after(db: Session, model: Any, pos: Position) -> Any:
+        updated_at = comparable_ts(db, model.updated_at)
+        bound = ts_bound(db, pos[0])
+        return or_(updated_at > bound, and_(updated_at == bound, model.id > pos[1]))
+
+    @staticmethod
+    def iter_batches(db: Session, plan: ExportPlan, batch_size: Optional[int] = None) -> Iterator[List[Sequence[Any]]]:
+        """Lotes de filas (tuplas en el orden de `columns`) del rango del plan."""
+        if plan.until is None:
+            return
+        batch_size = batch_size or get_settings().EXPORT_BATCH_SIZE
+        model, _ = TABLES[plan.table]
+        updated_at = comparable_ts(db, model.updated_at)
+
+        until_ts = ts_bound(db, plan.until[0])
+        q = (
+            select(*ExportService.columns(plan.table))
+            .where(or_(updated_at < until_ts, and_(updated_at == until_ts, model.id <= plan.until[1])))
+            .order_by(model.updated_at, model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if plan.since is not None:
+            q = q.where(ExportService._after(db, model, plan.since))
+        for partition in db.execute(q).partitions():
+            yield partition
+
+    @staticmethod
+    def stream(
+        plan: ExportPlan,
+        fmt: str,
+        *,
+        gzip: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Bytes del archivo exportado, por lotes. Abre su propia sesión: se
+        consume después de que la request (o el comando) liberó la suya.
+        """
+        ExportService.check_format(fmt)
+        columns = ExportService.columns(plan.table)
+        if fmt == "parquet":
+            # Parquet comprime por columnas: gzip elige el códec interno
+            encoder: Any = _ParquetEncoder(columns, compression="gzip" if gzip else "snappy")
+            gzip = False
+        elif fmt == "csv":
+            encoder = _CsvEncoder(columns)
+        else:
+            encoder = _NdjsonEncoder(columns)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+        def out(data: bytes) -> bytes:
+            return compressor.compress(data) if compressor is not None else data
+
+        db = SessionLocal()
+        try:
+            head = out(encoder.begin())
+            if head:
+                yield head
+            for rows in ExportService.iter_batches(db, plan, batch_size):
+                _rows_exported.inc(len(rows), table=plan.table, format=fmt)
+                chunk = out(encoder.encode(rows))
+                if chunk:
+                    yield chunk
+            tail = out(encoder.end())
+            if compressor is not None:
+                tail += compressor.flush()
+            if tail:
+                yield tail
+        finally:
+            db.close()
+
+    @staticmethod
+    def filename(plan: ExportPlan, fmt: str, gzip: bool) -> str:
+        stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        suffix = ".gz" if gzip and fmt != "parquet" else ""
+        return f"{plan.table}-{stamp}.{fmt}{suffix}"
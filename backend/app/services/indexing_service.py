@@ -0,0 +1,113 @@
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+from backend.app.models.index_job import IndexJob, OP_UPSERT, OP_DELETE
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.repositories.index_jobs import IndexJobRepository
+from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.repositories.vector_files import VectorFileRepository
+from backend.app.schemas.professional import build_prof_json_for_vector_store, vector_document_hash
+from backend.app.services.vector_store_service import VectorStoreService
+
+# Reindexaciones evitadas por huella sin cambios frente a las realizadas
+reindex_counter = registry.counter(
+    "vector_reindex_total",
+    "Reindexaciones de perfiles según la huella del documento",
+    ["source", "result"],
+)
+
+
+class IndexingService:
+    """
+    Punto de entrada de dominio para la indexación asíncrona (outbox).
+    Los casos de uso encolan aquí y el IndexingWorker procesa en segundo plano.
+    """
+
+    @staticmethod
+    def enqueue_upsert(
+        db: Session, prof_id: str, user_id: Optional[str] = None, new_profile: bool = False
+    ) -> IndexJob:
+        """
+        Encola (re)indexación del perfil en la transacción actual.
+        El caller hace commit y luego llama a `notify_worker()`.
+        `new_profile`: perfil recién creado (ver IndexJobRepository.enqueue).
+        """
+        return IndexJobRepository.enqueue(
+            db,
+            prof_id=prof_id,
+            user_id=user_id,
+            operation=OP_UPSERT,
+            max_attempts=get_settings().INDEX_JOB_MAX_ATTEMPTS,
+            new_profile=new_profile,
+        )
+
+    @staticmethod
+    def enqueue_upsert_if_changed(db: Session, prof: ProfessionalProfile) -> Optional[IndexJob]:
+        """
+        Encola la reindexación solo si el documento cambió respecto al indexado
+        (huella guardada en el mapeo). Un guardado sin cambios (autosave) no
+        genera job: None. Con un job aún en curso se encola igualmente, porque
+        el documento indexado al terminar podría no ser el actual.
+        """
+        db.flush()
+        digest = vector_document_hash(build_prof_json_for_vector_store(prof, user_id=prof.user_id))
+        mapping = VectorFileRepository.get_by_prof_id(db, prof.id)
+        if mapping is not None and mapping.content_hash == digest and not IndexJobRepository.has_in_flight(db, prof.id):
+            reindex_counter.inc(source="put", result="skipped")
+            return None
+        reindex_counter.inc(source="put", result="performed")
+        return IndexingService.enqueue_upsert(db, prof_id=prof.id, user_id=prof.user_id)
+
+    @staticmethod
+    def enqueue_delete(db: Session, prof_id: str, user_id: Optional[str] = None) -> IndexJob:
+        return IndexJobRepository.enqueue(
+            db,
+            prof_id=prof_id,
+            user_id=user_id,
+            operation=OP_DELETE,
+            max_attempts=get_settings().INDEX_JOB_MAX_ATTEMPTS,
+        )
+
+    @staticmethod
+    def notify_worker() -> None:
+        # Import perezoso: el worker depende de la sesión global de BD
+        from backend.app.services.indexing_worker import indexing_worker
+
+        indexing_worker.notify()
+
+    @staticmethod
+    def rebuild_file_mapping(db: Session, delete_duplicates: bool = False) -> Dict[str, int]:
+        """
+        Reconciliación completa del mapeo prof_id -> file_id contra el store remoto
+        (recorre todas las páginas). Si un perfil tiene varios archivos se conserva
+        el referenciado por el perfil (o el último listado); el resto se borra
+        solo si `delete_duplicates`.
+        """
+        settings = get_settings()
+        remote = VectorStoreService.scan_professional_files()
+        stats = {"profiles": 0, "files": 0, "duplicates_deleted": 0}
+
+        for prof_id, file_ids in remote.items():
+            stats["profiles"] += 1
+            stats["files"] += len(file_ids)
+            prof = db.get(ProfessionalProfile, prof_id)
+            keep = prof.vector_store_file_id if prof and prof.vector_store_file_id in file_ids else file_ids[-1]
+            VectorFileRepository.upsert(
+                db,
+                prof_id=prof_id,
+                file_id=keep,
+                vector_store_id=settings.VECTOR_STORE_ID,
+                filename=f"prof_{prof_id}.json",
+            )
+            if prof is not None:
+                ProfessionalRepository.set_vector_file(db, prof, keep)
+            if delete_duplicates:
+                for fid in file_ids:
+                    if fid != keep:
+                        VectorStoreService.remove_professional(prof_id, file_id=fid)
+                        stats["duplicates_deleted"] += 1
+        db.flush()
+        return stats
@@ -0,0 +1,336 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from backend.app.core.settings import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.models.index_job import IndexJob, OP_DELETE
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.repositories.index_jobs import IndexJobRepository
+from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.repositories.vector_files import VectorFileRepository
+from backend.app.schemas.professional import build_prof_json_for_vector_store, vector_document_hash
+from backend.app.services.indexing_service import reindex_counter
+from backend.app.services.vector_sharding import ShardingService
+from backend.app.services.vector_store_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+
+class IndexingWorker:
+    """
+    Consume el outbox `vector_index_jobs` en hilos de fondo.
+    Las peticiones HTTP solo encolan el job (misma transacción que el perfil);
+    la subida al Vector Store y la espera de indexación ocurren aquí, sin
+    retener hilos de request ni conexiones de BD durante la espera remota.
+    """
+
+    # Si un job lleva más de esto en 'running' se asume que su proceso murió
+    STALE_RUNNING_S = 900.0
+
+    def __init__(self) -> None:
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Ciclo de vida
+    # -------------------------
+    def start(self) -> None:
+        settings = get_settings()
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._requeue_stale()
+            for i in range(max(1, settings.INDEX_WORKER_CONCURRENCY)):
+                t = threading.Thread(target=self._run, name=f"index-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        with self._lock:
+            self._stop.set()
+            self._wakeup.set()
+            for t in self._threads:
+                t.join(timeout=timeout_s)
+            self._threads = []
+
+    def notify(self) -> None:
+        """Despierta a los hilos tras encolar un job (evita esperar al siguiente sondeo)."""
+        self._wakeup.set()
+
+    # -------------------------
+    # Procesamiento
+    # -------------------------
+    def _run(self) -> None:
+        settings = get_settings()
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once(batch_size=settings.INDEX_WORKER_BATCH_SIZE)
+            except Exception:
+                logger.exception("Error inesperado en el worker de indexación")
+                processed = 0
+            if processed == 0:
+                self._wakeup.wait(timeout=settings.INDEX_WORKER_POLL_INTERVAL_S)
+                self._wakeup.clear()
+
+    def run_once(self, batch_size: int = 1) -> int:
+        """
+        Reclama y procesa hasta `batch_size` jobs vencidos. Devuelve cuántos procesó.
+        Los upserts del lote se suben juntos y se espera su indexación en conjunto.
+        Útil también para ejecutar el outbox de forma síncrona (scripts/tests).
+        """
+        db = SessionLocal()
+        try:
+            jobs = IndexJobRepository.claim_due(db, limit=batch_size)
+            # Commit inmediato: libera la conexión antes de la llamada remota
+            job_ids = [j.id for j in jobs]
+            db.commit()
+        finally:
+            db.close()
+
+        if job_ids:
+            self._process_many(job_ids)
+        return len(job_ids)
+
+    def _process(self, job_id: str) -> None:
+        self._process_many([job_id])
+
+    def _process_many(self, job_ids: List[str]) -> None:
+        # 1) Snapshot de lo necesario y liberar la conexión durante las llamadas remotas
+        prepared: List[Tuple[str, Optional[dict], str, str, Optional[str]]] = []
+        indexed: Dict[str, Tuple[str, Optional[str]]] = {}  # prof_id -> (file_id, huella indexada)
+        sharded: Set[str] = set()  # prof_ids cuyo registro vive en un shard JSONL
+        db = SessionLocal()
+        try:
+            for job_id in job_ids:
+                job = IndexJobRepository.get_by_id(db, job_id)
+                if job:
+                    doc, prof_id, operation, previous_file_id = self._prepare(db, job)
+                    prepared.append((job_id, doc, prof_id, operation, previous_file_id))
+                    mapping = VectorFileRepository.get_by_prof_id(db, prof_id)
+                    if mapping is not None and mapping.content_hash:
+                        indexed[prof_id] = (mapping.file_id, mapping.content_hash)
+                    if mapping is not None and mapping.shard_key:
+                        sharded.add(prof_id)
+            db.commit()
+        finally:
+            db.close()
+
+        # Varios jobs del mismo perfil en el lote (p. ej. delete y un upsert
+        # posterior): solo se ejecuta el último reclamado; los anteriores quedan
+        # cubiertos por él y se cierran sin tocar el Vector Store
+        last_job = {prof_id: job_id for job_id, _, prof_id, _, _ in prepared}
+        superseded = [job_id for job_id, _, prof_id, _, _ in prepared if last_job[prof_id] != job_id]
+        prepared = [item for item in prepared if last_job[item[2]] == item[0]]
+        for job_id in superseded:
+            self._mark_done(job_id, None)
+
+        if ShardingService.enabled():
+            # Layout en shards: una reescritura por shard afectado; mapeos y perfiles
+            # se actualizan al publicar cada shard
+            outcomes = ShardingService.process(prepared)
+            for job_id, _, _, _, _ in prepared:
+                outcome = outcomes.get(job_id)
+                if isinstance(outcome, Exception):
+                    self._finish_failed(job_id, outcome)
+                else:
+                    self._mark_done(job_id, outcome)
+            return
+
+        # 2) Llamadas remotas: upserts agrupados en un lote, deletes uno a uno
+        # (un solo job por prof_id, así que el orden entre ambos grupos es indiferente)
+        outcomes: Dict[str, Union[Optional[str], Exception]] = {}
+        skipped: Dict[str, Optional[str]] = {}  # job_id -> file_id vigente
+        batch: Dict[str, Tuple[str, dict, Optional[str]]] = {}
+        sequential: List[Tuple[str, Optional[dict], str, str, Optional[str]]] = []
+        pending: List[Tuple[str, Optional[dict], str, str, Optional[str]]] = []
+        for item in prepared:
+            job_id, doc, prof_id, operation, previous_file_id = item
+            if operation != OP_DELETE and doc is not None:
+                file_id, indexed_hash = indexed.get(prof_id, (None, None))
+                if indexed_hash == vector_document_hash(doc):
+                    # El documento indexado ya es el actual: sin subida ni espera
+                    reindex_counter.inc(source="worker", result="skipped")
+                    skipped[job_id] = file_id
+                    continue
+                reindex_counter.inc(source="worker", result="performed")
+            pending.append(item)
+
+        # Perfiles que siguen en un shard (lote de importación empaquetado, o
+        # VECTOR_SHARDING desactivado después): primero se reescribe el shard sin
+        # ellos (copy-on-write), para que su registro anterior no siga indexado.
+        # Un delete termina ahí; un upsert pasa después a archivo individual.
+        leaving = [(job_id, prof_id) for job_id, _, prof_id, _, _ in pending if prof_id in sharded]
+        if leaving:
+            left = ShardingService.leave(leaving)
+            for job_id, _ in leaving:
+                outcomes[job_id] = left.get(job_id)
+        for item in pending:
+            job_id, doc, prof_id, operation, previous_file_id = item
+            if prof_id in sharded and (operation == OP_DELETE or isinstance(outcomes.get(job_id), Exception)):
+                continue
+            if operation != OP_DELETE:
+                batch[prof_id] = (job_id, doc, previous_file_id)
+            else:
+                sequential.append(item)
+
+        if batch:
+            try:
+                results = VectorStoreService.add_or_update_many(
+                    [(doc, prof_id, prev) for prof_id, (_, doc, prev) in batch.items()]
+                )
+            except Exception as e:
+                results = {prof_id: e for prof_id in batch}
+            for prof_id, (job_id, _, _) in batch.items():
+                outcomes[job_id] = results.get(prof_id, RuntimeError("Sin resultado de indexación"))
+        for job_id, doc, prof_id, operation, previous_file_id in sequential:
+            try:
+                outcomes[job_id] = self._execute(operation, prof_id, doc, previous_file_id)
+            except Exception as e:
+                outcomes[job_id] = e
+
+        # 3) Resultado por job (los omitidos ya tienen mapeo y perfil al día: solo se cierra el job)
+        for job_id, doc, prof_id, operation, _ in prepared:
+            if job_id in skipped:
+                self._mark_done(job_id, skipped[job_id])
+                continue
+            outcome = outcomes.get(job_id)
+            if isinstance(outcome, Exception):
+                self._finish_failed(job_id, outcome)
+            else:
+                content_hash = vector_document_hash(doc) if doc is not None else None
+                self._finish_done(job_id, prof_id, operation, outcome, content_hash=content_hash)
+
+    @staticmethod
+    def _finish_done(
+        job_id: str,
+        prof_id: str,
+        operation: str,
+        file_id: Optional[str],
+        content_hash: Optional[str] = None,
+    ) -> None:
+        settings = get_settings()
+        db = SessionLocal()
+        try:
+            job = IndexJobRepository.get_by_id(db, job_id)
+            if operation == OP_DELETE:
+                VectorFileRepository.delete(db, prof_id)
+            else:
+                VectorFileRepository.upsert(
+                    db,
+                    prof_id=prof_id,
+                    file_id=file_id,
+                    vector_store_id=settings.VECTOR_STORE_ID,
+                    filename=f"prof_{prof_id}.json",
+                    content_hash=content_hash,
+                )
+                prof = db.get(ProfessionalProfile, prof_id)
+                if prof is not None:
+                    ProfessionalRepository.set_vector_file(db, prof, file_id)
+            if job:
+                IndexJobRepository.mark_done(db, job, file_id=file_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudo registrar el resultado del job %s", job_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _mark_done(job_id: str, file_id: Optional[str]) -> None:
+        db = SessionLocal()
+        try:
+            job = IndexJobRepository.get_by_id(db, job_id)
+            if job:
+                IndexJobRepository.mark_done(db, job, file_id=file_id)
+                db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudo registrar el resultado del job %s", job_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _finish_failed(job_id: str, error: Exception) -> None:
+        settings = get_settings()
+        db = SessionLocal()
+        try:
+            job = IndexJobRepository.get_by_id(db, job_id)
+            if job:
+                IndexJobRepository.mark_failed(
+                    db,
+                    job,
+                    str(error),
+                    backoff_base_s=settings.INDEX_JOB_BACKOFF_BASE_S,
+                    backoff_max_s=settings.INDEX_JOB_BACKOFF_MAX_S,
+                )
+                db.commit()
+            logger.warning("Job de indexación %s falló: %s", job_id, error)
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudo registrar el fallo del job %s", job_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _prepare(db, job: IndexJob):
+        # File ID previo desde el mapeo persistente (fallback: columna del perfil)
+        mapping = VectorFileRepository.get_by_prof_id(db, job.prof_id)
+        previous_file_id = mapping.file_id if mapping else None
+        if mapping is not None and mapping.shard_key:
+            # El archivo es de un shard: solo ShardingService lo reescribe o borra
+            previous_file_id = None
+        elif previous_file_id and VectorFileRepository.is_shared(db, previous_file_id, job.prof_id):
+            # Archivo compartido sin manifiesto (no debería quedar ninguno tras la
+            # migración 0011): no se borra, afectaría a otros perfiles
+            previous_file_id = None
+
+        if job.operation == OP_DELETE:
+            return None, job.prof_id, job.operation, previous_file_id
+        prof = db.get(ProfessionalProfile, job.prof_id)
+        if prof is None:
+            # El perfil ya no existe: se trata como borrado
+            return None, job.prof_id, OP_DELETE, previous_file_id
+        doc = build_prof_json_for_vector_store(prof, user_id=prof.user_id)
+        if mapping is None:
+            previous_file_id = prof.vector_store_file_id
+        return doc, prof.id, job.operation, previous_file_id
+
+    @staticmethod
+    def _execute(operation: str, prof_id: str, doc: Optional[dict], previous_file_id: Optional[str]) -> Optional[str]:
+        if operation == OP_DELETE:
+            VectorStoreService.remove_professional(prof_id, file_id=previous_file_id)
+            return None
+        return VectorStoreService.add_or_update_professional(doc, prof_id=prof_id, previous_file_id=previous_file_id)
+
+    def _requeue_stale(self) -> None:
+        db = SessionLocal()
+        try:
+            n = IndexJobRepository.requeue_stale_running(db, older_than_s=self.STALE_RUNNING_S)
+            db.commit()
+            if n:
+                logger.info("Reencolados %d jobs de indexación huérfanos", n)
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudieron reencolar jobs huérfanos")
+        finally:
+            db.close()
+
+
+# Instancia de proceso (arrancada/detenida desde create_app)
+indexing_worker = IndexingWorker()
+
+
+if __name__ == "__main__":
+    # Permite ejecutar el worker como proceso dedicado:
+    #   python -m backend.app.services.indexing_worker
+    logging.basicConfig(level=logging.INFO)
+    indexing_worker.start()
+    try:
+        while True:
+            threading.Event().wait(3600)
+    except KeyboardInterrupt:
+        indexing_worker.stop()
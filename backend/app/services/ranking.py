@@ -0,0 +1,316 @@
+"""
+Ranking híbrido del directorio: una sola lista a partir de la búsqueda léxica
+local (FTS + filtros normalizados) y la semántica del Vector Store.
+
+Etapas (cada una medida como span: histograma app_span_seconds y Server-Timing):
+  rank_lexical  ProfessionalRepository.search en la sesión del request
+  rank_vector   VectorStoreService.search en un hilo aparte, en paralelo con la
+                léxica; si falla o supera HYBRID_VECTOR_TIMEOUT_S se sigue solo
+                con la léxica (respuesta `degraded`)
+  rank_fuse     carga de candidatos, fusión y boosts
+
+Fusión (HYBRID_FUSION):
+  rrf       Σ w / (HYBRID_RRF_K + rango) por fuente (reciprocal rank fusion)
+  weighted  Σ w · score normalizado [0, 1] por fuente (vector: min-max sobre su
+            score; léxica: por posición, `search` no expone su score)
+Boosts multiplicativos sobre los mismos campos que build_prof_json_for_vector_store:
+profesion_normalizada / ciudad_normalizada exactas y recencia de updated_at
+(semivida HYBRID_RECENCY_HALF_LIFE_DAYS).
+
+Caché de resultados por consulta normalizada (términos, filtros, limit): guarda
+solo ids y scores; los perfiles se leen siempre de la BD (una consulta por PK),
+así una edición se ve sin esperar al TTL.
+"""
+import contextvars
+import datetime as dt
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, lazyload
+
+from backend.app.core.cache import CacheBackend, InstrumentedCache, get_cache_backend
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+from backend.app.core.tracing import record_span
+from backend.app.db import fulltext
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.services.vector_store_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+FUSIONS = ("rrf", "weighted")
+SOURCE_LEXICAL = "lexical"
+SOURCE_VECTOR = "vector"
+
+_searches = registry.counter(
+    "hybrid_search_total",
+    "Búsquedas híbridas por resultado de caché y estado de la etapa vectorial",
+    ["cache", "vector"],
+)
+
+
+@dataclass
+class RankedProfile:
+    profile: ProfessionalProfile
+    score: float
+    sources: List[str]
+
+
+@dataclass
+class RankingResult:
+    items: List[RankedProfile]
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+    degraded: bool = False
+
+
+def _cache() -> CacheBackend:
+    return InstrumentedCache(get_cache_backend(), "ranking")
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _stage_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=get_settings().HYBRID_VECTOR_WORKERS, thread_name_prefix="rank-vector"
+                )
+    return _pool
+
+
+def _vector_search(query: str, k: int) -> Tuple[List[Tuple[str, float]], float]:
+    """(hits, segundos): el tiempo propio de la etapa, aparte de la espera del request."""
+    start = time.perf_counter()
+    try:
+        hits = VectorStoreService.search(query, k)
+    finally:
+        elapsed = time.perf_counter() - start
+        record_span("rank_vector", elapsed)
+    return hits, elapsed
+
+
+def _as_utc(value: Optional[dt.datetime]) -> Optional[dt.datetime]:
+    if value is None:
+        return None
+    # SQLite devuelve datetimes sin zona (guardados en UTC)
+    return value if value.tzinfo is not None else value.replace(tzinfo=dt.timezone.utc)
+
+
+class HybridRanker:
+    """Parámetros de fusión y boosts; por defecto desde Settings (HYBRID_*)."""
+
+    def __init__(
+        self,
+        *,
+        fusion: Optional[str] = None,
+        rrf_k: Optional[int] = None,
+        candidates: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+        boost_profesion: Optional[float] = None,
+        boost_ciudad: Optional[float] = None,
+        boost_recency: Optional[float] = None,
+        recency_half_life_days: Optional[float] = None,
+        vector_timeout_s: Optional[float] = None,
+        cache_ttl_s: Optional[float] = None,
+    ) -> None:
+        s = get_settings()
+        self.fusion = fusion or s.HYBRID_FUSION
+        if self.fusion not in FUSIONS:
+            raise ValueError(f"Fusión no soportada: {self.fusion} ({' | '.join(FUSIONS)})")
+        self.rrf_k = rrf_k if rrf_k is not None else s.HYBRID_RRF_K
+        self.candidates = candidates or s.HYBRID_CANDIDATES
+        self.weights = weights or {SOURCE_LEXICAL: s.HYBRID_WEIGHT_LEXICAL, SOURCE_VECTOR: s.HYBRID_WEIGHT_VECTOR}
+        self.boost_profesion = boost_profesion if boost_profesion is not None else s.HYBRID_BOOST_PROFESION
+        self.boost_ciudad = boost_ciudad if boost_ciudad is not None else s.HYBRID_BOOST_CIUDAD
+        self.boost_recency = boost_recency if boost_recency is not None else s.HYBRID_BOOST_RECENCY
+        self.half_life_days = recency_half_life_days or s.HYBRID_RECENCY_HALF_LIFE_DAYS
+        self.vector_timeout_s = vector_timeout_s if vector_timeout_s is not None else s.HYBRID_VECTOR_TIMEOUT_S
+        self.cache_ttl_s = cache_ttl_s if cache_ttl_s is not None else s.HYBRID_CACHE_TTL_S
+
+    # -------------------------
+    # Fusión y boosts
+    # -------------------------
+    def fuse(self, ranked: Dict[str, Sequence[Tuple[str, float]]]) -> Dict[str, Tuple[float, List[str]]]:
+        """
+        `ranked`: fuente -> [(prof_id, score)] en orden. Devuelve
+        prof_id -> (score fusionado, fuentes).
+        """
+        out: Dict[str, Tuple[float, List[str]]] = {}
+        for source, hits in ranked.items():
+            weight = self.weights.get(source, 1.0)
+            if self.fusion == "rrf":
+                contributions = [(pid, weight / (self.rrf_k + rank)) for rank, (pid, _) in enumerate(hits, start=1)]
+            else:
+                contributions = [(pid, weight * norm) for pid, norm in self._normalized(source, hits)]
+            for pid, value in contributions:
+                score, sources = out.get(pid, (0.0, []))
+                if source not in sources:
+                    out[pid] = (score + value, sources + [source])
+        return out
+
+    @staticmethod
+    def _normalized(source: str, hits: Sequence[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        if not hits:
+            return []
+        if source == SOURCE_LEXICAL:
+            n = len(hits)
+            return [(pid, 1.0 - i / n) for i, (pid, _) in enumerate(hits)]
+        scores = [s for _, s in hits]
+        lo, hi = min(scores), max(scores)
+        if hi <= lo:
+            return [(pid, 1.0) for pid, _ in hits]
+        return [(pid, (s - lo) / (hi - lo)) for pid, s in hits]
+
+    def boost(
+        self,
+        prof: Any,
+        profesion_normalizada: Optional[str],
+        ciudad_normalizada: Optional[str],
+        now: dt.datetime,
+    ) -> float:
+        factor = 1.0
+        if profesion_normalizada and prof.profesion_normalizada == profesion_normalizada:
+            factor += self.boost_profesion
+        if ciudad_normalizada and prof.ciudad_normalizada == ciudad_normalizada:
+            factor += self.boost_ciudad
+        updated = _as_utc(prof.updated_at)
+        if self.boost_recency and updated is not None:
+            age_days = max(0.0, (now - updated).total_seconds() / 86400.0)
+            factor += self.boost_recency * 0.5 ** (age_days / self.half_life_days)
+        return factor
+
+    # -------------------------
+    # Búsqueda
+    # -------------------------
+    def cache_key(
+        self, q: Optional[str], profesion_normalizada: Optional[str], ciudad_normalizada: Optional[str], limit: int
+    ) -> str:
+        parts = [
+            " ".join(fulltext.query_terms(q or "")),
+            profesion_normalizada or "",
+            ciudad_normalizada or "",
+            str(limit),
+            self.fusion,
+        ]
+        digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+        return f"rank:{digest}"
+
+    @staticmethod
+    def _load(db: Session, ids: Sequence[str]) -> Dict[str, ProfessionalProfile]:
+        if not ids:
+            return {}
+        P = ProfessionalProfile
+        stmt = select(P).options(lazyload(P.user)).where(P.id.in_(list(ids)))
+        return {p.id: p for p in db.execute(stmt).scalars()}
+
+    def search(
+        self,
+        db: Session,
+        *,
+        q: Optional[str] = None,
+        profesion: Optional[str] = None,
+        ciudad: Optional[str] = None,
+        profesion_normalizada: Optional[str] = None,
+        ciudad_normalizada: Optional[str] = None,
+        limit: int = 20,
+    ) -> RankingResult:
+        """
+        `profesion`/`ciudad` en bruto alimentan la consulta semántica; sus formas
+        normalizadas, el filtro léxico y los boosts.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        key = self.cache_key(q, profesion_normalizada, ciudad_normalizada, limit)
+        cache = _cache() if self.cache_ttl_s > 0 else None
+
+        raw = cache.get(key) if cache is not None else None
+        if raw is not None:
+            entries = json.loads(raw)
+            profiles = self._load(db, [e[0] for e in entries])
+            items = [RankedProfile(profiles[pid], score, sources) for pid, score, sources in entries if pid in profiles]
+            timings["total"] = (time.perf_counter() - started) * 1000
+            _searches.inc(cache="hit", vector="skipped")
+            return RankingResult(items=items, timings_ms=timings, cached=True)
+
+        # 1) Vector Store en paralelo (copia del contexto: spans y SQL llegan a la traza del request)
+        query_text = " ".join(p for p in (q, profesion, ciudad) if p)
+        future = None
+        if query_text:
+            ctx = contextvars.copy_context()
+            future = _stage_pool().submit(ctx.run, _vector_search, query_text, self.candidates)
+
+        # 2) Léxica en este hilo
+        t0 = time.perf_counter()
+        lexical: List[Tuple[str, float]] = []
+        if fulltext.query_terms(q or "") or profesion_normalizada or ciudad_normalizada:
+            profs, _ = ProfessionalRepository.search(
+                db,
+                q=q,
+                profesion_normalizada=profesion_normalizada,
+                ciudad_normalizada=ciudad_normalizada,
+                limit=self.candidates,
+            )
+            lexical = [(p.id, 0.0) for p in profs]
+        timings[SOURCE_LEXICAL] = (time.perf_counter() - t0) * 1000
+        record_span("rank_lexical", timings[SOURCE_LEXICAL] / 1000)
+
+        # 3) Esperar al vectorial (lo que quede del plazo)
+        vector: List[Tuple[str, float]] = []
+        vector_state = "skipped"
+        if future is not None:
+            t1 = time.perf_counter()
+            remaining = max(0.0, self.vector_timeout_s - (t1 - started))
+            try:
+                vector, elapsed = future.result(timeout=remaining)
+                timings[SOURCE_VECTOR] = elapsed * 1000
+                vector_state = "ok"
+            except FutureTimeout:
+                future.cancel()
+                vector_state = "timeout"
+                logger.warning("Búsqueda vectorial superó %.1fs; resultados solo léxicos", self.vector_timeout_s)
+            except Exception as exc:  # noqa: BLE001
+                vector_state = "error"
+                logger.warning("Búsqueda vectorial falló (%s); resultados solo léxicos", exc)
+            timings["vector_wait"] = (time.perf_counter() - t1) * 1000
+
+        # 4) Fusión, carga de candidatos y boosts
+        t2 = time.perf_counter()
+        fused = self.fuse({SOURCE_LEXICAL: lexical, SOURCE_VECTOR: vector})
+        profiles = self._load(db, list(fused))
+        now = dt.datetime.now(dt.timezone.utc)
+        items = [
+            RankedProfile(
+                profile=prof,
+                score=score * self.boost(prof, profesion_normalizada, ciudad_normalizada, now),
+                sources=sources,
+            )
+            for pid, (score, sources) in fused.items()
+            if (prof := profiles.get(pid)) is not None
+        ]
+        items.sort(key=lambda r: (-r.score, r.profile.id))
+        items = items[:limit]
+        timings["fuse"] = (time.perf_counter() - t2) * 1000
+        record_span("rank_fuse", timings["fuse"] / 1000)
+
+        degraded = vector_state in ("timeout", "error")
+        # Un resultado degradado no se cachea: la siguiente búsqueda reintenta el vectorial
+        if cache is not None and not degraded:
+            payload = [[r.profile.id, r.score, r.sources] for r in items]
+            cache.set(key, json.dumps(payload, separators=(",", ":")).encode("utf-8"), self.cache_ttl_s)
+        timings["total"] = (time.perf_counter() - started) * 1000
+        _searches.inc(cache="miss", vector=vector_state)
+        return RankingResult(items=items, timings_ms=timings, degraded=degraded)
@@ -0,0 +1,292 @@
+"""
+Reconciliación incremental BD <-> Vector Store.
+
+Sustituye las resincronizaciones completas periódicas por tres pasadas acotadas:
+
+1. Perfiles: se recorren `professional_profiles` por (updated_at, id) a partir de
+   la marca de agua guardada; se compara la huella del documento
+   (`vector_document_hash`) con la del mapeo y solo se reencolan los que cambiaron
+   o nunca se indexaron. Los perfiles más recientes que RECONCILE_LAG_S no se
+   recorren todavía (transacciones en curso con updated_at anterior al commit).
+2. Mapeos huérfanos: mapeos cuyo perfil ya no existe (borrado fallido) -> job de borrado.
+3. Archivos remotos huérfanos: se pagina el store (RECONCILE_GC_MAX_PAGES páginas
+   por pasada, el cursor se guarda entre pasadas) y se borran los archivos que no
+   referencia ningún mapeo, shard ni perfil y tienen más de RECONCILE_ORPHAN_MIN_AGE_S.
+"""
+import datetime as dt
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, noload
+
+from backend.app.core.metrics import registry
+from backend.app.core.settings import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.db.timestamps import comparable_ts, ts_bound
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.models.vector_file import VectorStoreFile
+from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.repositories.sync_watermarks import SyncWatermarkRepository
+from backend.app.repositories.vector_files import VectorFileRepository
+from backend.app.repositories.vector_shards import VectorShardRepository
+from backend.app.schemas.professional import build_prof_json_for_vector_store, vector_document_hash
+from backend.app.services.indexing_service import IndexingService
+from backend.app.services.vector_store_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_PROFILES = "reconcile:profiles"
+WATERMARK_VECTOR_GC = "reconcile:vector_gc"
+
+_profiles_checked = registry.counter(
+    "reconcile_profiles_total",
+    "Perfiles revisados por la reconciliación",
+    ["result"],
+)
+_orphans = registry.counter(
+    "reconcile_orphans_total",
+    "Huérfanos detectados por la reconciliación",
+    ["kind", "action"],
+)
+
+
+class ReconciliationService:
+    @staticmethod
+    def run(db: Session, *, dry_run: bool = False, gc: bool = True) -> Dict[str, Dict[str, int]]:
+        """Las tres pasadas en orden; cada una confirma su propio progreso."""
+        out = {
+            "profiles": ReconciliationService.reconcile_profiles(db, dry_run=dry_run),
+            "mappings": ReconciliationService.reconcile_stale_mappings(db, dry_run=dry_run),
+        }
+        if gc:
+            out["vector_gc"] = ReconciliationService.collect_orphan_files(db, dry_run=dry_run)
+        return out
+
+    # -------------------------
+    # 1) Perfiles modificados desde la marca de agua
+    # -------------------------
+    @staticmethod
+    def reconcile_profiles(
+        db: Session,
+        *,
+        batch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        settings = get_settings()
+        batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+        stats = {"scanned": 0, "unchanged": 0, "changed": 0, "missing": 0, "repointed": 0, "enqueued": 0}
+
+        wm = SyncWatermarkRepository.get(db, WATERMARK_PROFILES)
+        pos_ts, pos_key = (wm.position_ts, wm.position_key) if wm else (None, None)
+        upper = dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=settings.RECONCILE_LAG_S)
+        updated_at = comparable_ts(db, ProfessionalProfile.updated_at)
+
+        while True:
+            q = (
+                select(ProfessionalProfile)
+                .options(noload(ProfessionalProfile.user))
+                .where(updated_at <= ts_bound(db, upper))
+                .order_by(ProfessionalProfile.updated_at, ProfessionalProfile.id)
+                .limit(batch_size)
+            )
+            if pos_ts is not None:
+                bound = ts_bound(db, pos_ts)
+                q = q.where(
+                    or_(updated_at > bound, and_(updated_at == bound, ProfessionalProfile.id > pos_key))
+                )
+            profs = list(db.execute(q).scalars())
+            if not profs:
+                break
+
+            mappings = VectorFileRepository.get_many(db, [p.id for p in profs])
+            for prof in profs:
+                stats["scanned"] += 1
+                mapping = mappings.get(prof.id)
+                digest = vector_document_hash(build_prof_json_for_vector_store(prof, user_id=prof.user_id))
+                if mapping is not None and mapping.content_hash == digest:
+                    stats["unchanged"] += 1
+                    _profiles_checked.inc(result="unchanged")
+                    if prof.vector_store_file_id != mapping.file_id and not dry_run:
+                        # Documento al día pero el perfil no apunta a él
+                        # Sin mover updated_at: no vuelve a entrar en la próxima pasada
+                        ProfessionalRepository.set_vector_file(db, prof, mapping.file_id)
+                        stats["repointed"] += 1
+                    continue
+                result = "missing" if mapping is None else "changed"
+                stats[result] += 1
+                _profiles_checked.inc(result=result)
+                if not dry_run:
+                    IndexingService.enqueue_upsert(db, prof_id=prof.id, user_id=prof.user_id)
+                    stats["enqueued"] += 1
+
+            pos_ts, pos_key = profs[-1].updated_at, profs[-1].id
+            if not dry_run:
+                SyncWatermarkRepository.advance(db, WATERMARK_PROFILES, position_ts=pos_ts, position_key=pos_key)
+                db.commit()
+            # Memoria acotada: la página ya no se necesita
+            db.expunge_all()
+            if len(profs) < batch_size or (max_rows and stats["scanned"] >= max_rows):
+                break
+
+        if stats["enqueued"]:
+            IndexingService.notify_worker()
+        return stats
+
+    # -------------------------
+    # 2) Mapeos cuyo perfil ya no existe
+    # -------------------------
+    @staticmethod
+    def reconcile_stale_mappings(db: Session, *, batch_size: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+        batch_size = batch_size or get_settings().RECONCILE_BATCH_SIZE
+        stats = {"stale": 0, "enqueued": 0}
+        after = ""
+        while True:
+            rows = db.execute(
+                select(VectorStoreFile.prof_id)
+                .outerjoin(ProfessionalProfile, ProfessionalProfile.id == VectorStoreFile.prof_id)
+                .where(ProfessionalProfile.id.is_(None), VectorStoreFile.prof_id > after)
+                .order_by(VectorStoreFile.prof_id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not rows:
+                break
+            stats["stale"] += len(rows)
+            _orphans.inc(len(rows), kind="mapping", action="found")
+            if not dry_run:
+                for prof_id in rows:
+                    IndexingService.enqueue_delete(db, prof_id=prof_id)
+                db.commit()
+                stats["enqueued"] += len(rows)
+            after = rows[-1]
+            if len(rows) < batch_size:
+                break
+        if stats["enqueued"]:
+            IndexingService.notify_worker()
+        return stats
+
+    # -------------------------
+    # 3) Archivos remotos sin referencia
+    # -------------------------
+    @staticmethod
+    def _referenced(db: Session, file_ids: List[str]) -> Set[str]:
+        known = VectorFileRepository.known_file_ids(db, file_ids)
+        known |= VectorShardRepository.known_file_ids(db, file_ids)
+        rest = [fid for fid in file_ids if fid not in known]
+        if rest:
+            # Perfiles antiguos sin mapeo persistente
+            known.update(
+                db.execute(
+                    select(ProfessionalProfile.vector_store_file_id).where(ProfessionalProfile.vector_store_file_id.in_(rest))
+                ).scalars()
+            )
+        return known
+
+    @staticmethod
+    def collect_orphan_files(
+        db: Session,
+        *,
+        page_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        min_age_s: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Avanza el recorrido paginado del store hasta `max_pages` páginas desde el
+        cursor guardado; al llegar al final el cursor vuelve a empezar.
+        """
+        settings = get_settings()
+        page_size = page_size or settings.RECONCILE_GC_PAGE_SIZE
+        max_pages = max_pages or settings.RECONCILE_GC_MAX_PAGES
+        min_age_s = settings.RECONCILE_ORPHAN_MIN_AGE_S if min_age_s is None else min_age_s
+        stats = {"pages": 0, "files": 0, "orphans": 0, "deleted": 0, "errors": 0, "completed_pass": 0}
+
+        wm = SyncWatermarkRepository.get(db, WATERMARK_VECTOR_GC)
+        after = wm.cursor if wm else None
+        for _ in range(max_pages):
+            files, has_more = VectorStoreService.list_files_page(after=after, limit=page_size)
+            stats["pages"] += 1
+            stats["files"] += len(files)
+            referenced = ReconciliationService._referenced(db, [fid for fid, _ in files])
+            now = time.time()
+            last_kept = None
+            for file_id, created_at in files:
+                if file_id in referenced or (created_at and now - created_at < min_age_s):
+                    last_kept = file_id
+                    continue
+                stats["orphans"] += 1
+                if dry_run:
+                    last_kept = file_id
+                    continue
+                try:
+                    VectorStoreService.delete_file(file_id)
+                    stats["deleted"] += 1
+                    _orphans.inc(kind="file", action="deleted")
+                except Exception as e:
+                    stats["errors"] += 1
+                    last_kept = file_id
+                    logger.warning("No se pudo borrar el archivo huérfano %s: %s", file_id, e)
+
+            if not has_more:
+                after = None
+                stats["completed_pass"] = 1
+            elif last_kept is not None:
+                # Los borrados desaparecen del listado: el cursor es el último archivo que sigue
+                after = last_kept
+            if not dry_run:
+                SyncWatermarkRepository.set_cursor(db, WATERMARK_VECTOR_GC, after)
+                db.commit()
+            if after is None:
+                break
+        return stats
+
+    @staticmethod
+    def reset(db: Session) -> None:
+        """Olvida las marcas de agua: la próxima pasada recorre todo desde el inicio."""
+        SyncWatermarkRepository.reset(db, WATERMARK_PROFILES)
+        SyncWatermarkRepository.reset(db, WATERMARK_VECTOR_GC)
+
+
+class ReconciliationScheduler:
+    """
+    Ejecuta la reconciliación cada RECONCILE_INTERVAL_S en un hilo de fondo.
+    Habilitarlo en un solo proceso (como el worker dedicado): las pasadas son
+    idempotentes, pero varios procesos repetirían trabajo.
+    """
+
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reconciliation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_s)
+            self._thread = None
+
+    def _run(self) -> None:
+        settings = get_settings()
+        while not self._stop.wait(settings.RECONCILE_INTERVAL_S):
+            db = SessionLocal()
+            try:
+                stats = ReconciliationService.run(db)
+                logger.info("Reconciliación: %s", stats)
+            except Exception:
+                db.rollback()
+                logger.exception("Error en la reconciliación")
+            finally:
+                db.close()
+
+
+# Instancia de proceso (arrancada desde create_app si RECONCILE_INTERVAL_S > 0)
+reconciliation_scheduler = ReconciliationScheduler()
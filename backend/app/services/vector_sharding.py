@@ -0,0 +1,383 @@
+"""
+Layout en shards JSONL del Vector Store (VECTOR_SHARDING = "hash" | "city").
+
+En lugar de un archivo remoto por profesional, los perfiles se agrupan en
+shards (cubeta hash del prof_id o ciudad normalizada). El manifiesto vive en
+`vector_shards` y la pertenencia en `vector_store_files.shard_key`.
+
+Un cambio de perfil reescribe solo su shard, copy-on-write:
+  1. se reconstruye el contenido completo del shard desde la BD (los perfiles
+     borrados desaparecen: compactación en cada reescritura)
+  2. se sube como archivo nuevo y se espera su indexación
+  3. se publica con un UPDATE condicional sobre `version` (si otro worker publicó
+     antes, se descarta el archivo nuevo y el job se reintenta)
+  4. tras el commit se borra el archivo anterior
+
+Los lotes empaquetados de la importación masiva (BulkImportService) también se
+registran como shards ("import:<lote>"), aunque VECTOR_SHARDING esté en off:
+cuando uno de sus perfiles se reindexa o se borra, el worker lo saca del shard
+con la misma reescritura (`leave`) en vez de dejar su registro anterior indexado.
+"""
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.core.profile_cache import ProfileCache
+from backend.app.core.settings import get_settings
+from backend.app.db.hooks import after_commit
+from backend.app.db.session import SessionLocal
+from backend.app.integrations.shard_writers import get_shard_writer, shard_filename
+from backend.app.models.index_job import OP_DELETE
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.models.vector_file import VectorStoreFile
+from backend.app.models.vector_shard import VectorShard
+from backend.app.repositories.vector_files import VectorFileRepository
+from backend.app.repositories.vector_shards import VectorShardRepository
+from backend.app.schemas.professional import build_prof_json_for_vector_store, vector_document_hash
+from backend.app.services.vector_store_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+SHARDING_OFF = "off"
+SHARDING_HASH = "hash"
+SHARDING_CITY = "city"
+IMPORT_SHARD_PREFIX = "import:"
+
+# (job_id, doc, prof_id, operation, previous_file_id) tal como lo prepara el worker
+PreparedJob = Tuple[str, Optional[dict], str, str, Optional[str]]
+
+# Serializa reescrituras del mismo shard dentro del proceso (entre procesos: `version`)
+_shard_locks: Dict[str, threading.Lock] = {}
+_shard_locks_guard = threading.Lock()
+
+
+def _lock_for(shard_key: str) -> threading.Lock:
+    with _shard_locks_guard:
+        return _shard_locks.setdefault(shard_key, threading.Lock())
+
+
+def _content_hash(docs: List[Dict]) -> str:
+    h = hashlib.sha256()
+    for doc in docs:
+        h.update(json.dumps(doc, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+class _ShardPlan:
+    __slots__ = ("key", "expected_version", "old_file_id", "old_hash", "docs", "removed", "legacy_files")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.expected_version: Optional[int] = None
+        self.old_file_id: Optional[str] = None
+        self.old_hash: Optional[str] = None
+        self.docs: List[Dict] = []
+        self.removed: Set[str] = set()       # prof_ids borrados (su mapeo se elimina)
+        self.legacy_files: Set[str] = set()  # archivos individuales previos de perfiles que entran
+
+
+class ShardingService:
+    @staticmethod
+    def enabled() -> bool:
+        return get_settings().VECTOR_SHARDING in (SHARDING_HASH, SHARDING_CITY)
+
+    @staticmethod
+    def shard_key_for(prof_id: str, ciudad_normalizada: Optional[str]) -> str:
+        settings = get_settings()
+        bucket = zlib.crc32(prof_id.encode("utf-8")) % max(1, settings.VECTOR_SHARD_COUNT)
+        if settings.VECTOR_SHARDING == SHARDING_CITY:
+            # Ciudades grandes se reparten en VECTOR_SHARD_CITY_BUCKETS sub-shards
+            sub = bucket % max(1, settings.VECTOR_SHARD_CITY_BUCKETS)
+            return f"city:{ciudad_normalizada or '_'}:{sub}"
+        return f"hash:{bucket:04d}"
+
+    # -------------------------
+    # Procesamiento de un lote de jobs del outbox
+    # -------------------------
+    @staticmethod
+    def process(prepared: List[PreparedJob]) -> Dict[str, Union[Optional[str], Exception]]:
+        """
+        Aplica un lote de jobs reescribiendo una sola vez cada shard afectado.
+        Returns job_id -> File ID del shard que contiene al perfil (None si se borró)
+        o la excepción que debe reintentarse.
+        """
+        plans, job_keys, job_new_key, legacy_deletes = ShardingService._plan(prepared)
+        results: Dict[str, Union[Optional[str], Exception]] = {}
+
+        locks = [_lock_for(k) for k in sorted(plans)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            shard_results = ShardingService._rewrite(plans)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        # Perfiles sin shard previo con archivo individual que se borran: ruta legada
+        for job_id, (prof_id, file_id) in legacy_deletes.items():
+            try:
+                VectorStoreService.remove_professional(prof_id, file_id=file_id)
+                db = SessionLocal()
+                try:
+                    VectorFileRepository.delete(db, prof_id)
+                    db.commit()
+                finally:
+                    db.close()
+                shard_results[f"legacy:{job_id}"] = None
+            except Exception as e:
+                shard_results[f"legacy:{job_id}"] = e
+
+        for job_id, keys in job_keys.items():
+            error = next((shard_results[k] for k in keys if isinstance(shard_results.get(k), Exception)), None)
+            if error is not None:
+                results[job_id] = error
+                continue
+            new_key = job_new_key.get(job_id)
+            results[job_id] = shard_results.get(new_key) if new_key else None
+        return results
+
+    @staticmethod
+    def leave(items: List[Tuple[str, str]]) -> Dict[str, Union[Optional[str], Exception]]:
+        """
+        Saca perfiles (job_id, prof_id) del shard en que están, reescribiéndolo
+        sin ellos, y elimina su mapeo. Para perfiles que pasan a archivo
+        individual (VECTOR_SHARDING=off) o que se borran.
+        Returns job_id -> None o la excepción que debe reintentarse.
+        """
+        return ShardingService.process([(job_id, None, prof_id, OP_DELETE, None) for job_id, prof_id in items])
+
+    @staticmethod
+    def register_packed(shard_key: str, docs: List[Dict], file_id: str) -> None:
+        """
+        Registra un JSONL ya subido e indexado con `docs` como versión inicial
+        del shard `shard_key`: manifiesto, mapeos y vector_store_file_id de los perfiles.
+        """
+        plan = _ShardPlan(shard_key)
+        plan.docs = sorted(docs, key=lambda d: d["prof_id"])
+        if not ShardingService._publish(plan, file_id, get_settings().VECTOR_STORE_ID):
+            raise RuntimeError(f"El shard {shard_key} ya existe")
+
+    @staticmethod
+    def _plan(prepared: List[PreparedJob]):
+        plans: Dict[str, _ShardPlan] = {}
+        job_keys: Dict[str, List[str]] = {}
+        job_new_key: Dict[str, Optional[str]] = {}
+        legacy_deletes: Dict[str, Tuple[str, str]] = {}
+        joining: Dict[str, Dict[str, dict]] = {}
+        leaving: Dict[str, Set[str]] = {}
+
+        db = SessionLocal()
+        try:
+            for job_id, doc, prof_id, operation, previous_file_id in prepared:
+                mapping = VectorFileRepository.get_by_prof_id(db, prof_id)
+                old_key = mapping.shard_key if mapping else None
+                new_key = None
+                if operation != OP_DELETE and doc is not None:
+                    new_key = ShardingService.shard_key_for(prof_id, doc.get("ciudad_normalizada"))
+                keys: List[str] = []
+                if old_key and old_key != new_key:
+                    leaving.setdefault(old_key, set()).add(prof_id)
+                    plans.setdefault(old_key, _ShardPlan(old_key))
+                    if new_key is None:
+                        plans[old_key].removed.add(prof_id)
+                    keys.append(old_key)
+                if new_key:
+                    joining.setdefault(new_key, {})[prof_id] = doc
+                    plan = plans.setdefault(new_key, _ShardPlan(new_key))
+                    if old_key is None and previous_file_id:
+                        plan.legacy_files.add(previous_file_id)
+                    keys.append(new_key)
+                elif old_key is None and previous_file_id:
+                    legacy_deletes[job_id] = (prof_id, previous_file_id)
+                    keys.append(f"legacy:{job_id}")
+                job_keys[job_id] = keys
+                job_new_key[job_id] = new_key
+
+            for key, plan in plans.items():
+                shard = VectorShardRepository.get(db, key)
+                if shard is not None:
+                    plan.expected_version = shard.version
+                    plan.old_file_id = shard.file_id
+                    plan.old_hash = shard.content_hash
+                incoming = joining.get(key, {})
+                members = set(VectorShardRepository.member_ids(db, key)) - leaving.get(key, set()) - set(incoming)
+                docs = dict(incoming)
+                if members:
+                    rows = db.execute(select(ProfessionalProfile).where(ProfessionalProfile.id.in_(members))).scalars()
+                    for prof in rows:
+                        docs[prof.id] = build_prof_json_for_vector_store(prof, user_id=prof.user_id)
+                    # Mapeos cuyo perfil ya no existe: se compactan fuera del shard
+                    plan.removed.update(members - set(docs))
+                plan.docs = [docs[pid] for pid in sorted(docs)]
+            db.commit()
+        finally:
+            db.close()
+        return plans, job_keys, job_new_key, legacy_deletes
+
+    @staticmethod
+    def _rewrite(plans: Dict[str, _ShardPlan]) -> Dict[str, Union[Optional[str], Exception]]:
+        settings = get_settings()
+        writer = get_shard_writer()
+        results: Dict[str, Union[Optional[str], Exception]] = {}
+
+        to_write: Dict[str, List[Dict]] = {}
+        for key, plan in plans.items():
+            if plan.docs and plan.old_file_id and _content_hash(plan.docs) == plan.old_hash and not plan.removed:
+                # Sin cambios de contenido (p. ej. reintento): solo se asegura la pertenencia
+                ShardingService._publish(plan, plan.old_file_id, settings.VECTOR_STORE_ID, unchanged=True)
+                results[key] = plan.old_file_id
+            elif plan.docs:
+                to_write[key] = plan.docs
+            else:
+                results[key] = ShardingService._drop(plan, writer)
+
+        written = writer.write_shards(to_write) if to_write else {}
+        for key, file_id in written.items():
+            plan = plans[key]
+            if isinstance(file_id, Exception):
+                results[key] = file_id
+                continue
+            try:
+                ok = ShardingService._publish(plan, file_id, settings.VECTOR_STORE_ID)
+            except Exception as e:
+                ok, results[key] = False, e
+            if not ok:
+                results.setdefault(key, RuntimeError(f"Conflicto al publicar el shard {key}; se reintenta"))
+                try:
+                    writer.delete(file_id)
+                except Exception:
+                    pass
+                continue
+            results[key] = file_id
+            for old in ({plan.old_file_id} | plan.legacy_files) - {None, file_id}:
+                try:
+                    writer.delete(old)
+                except Exception as e:
+                    # La reconciliación recoge huérfanos
+                    logger.warning("No se pudo borrar la versión previa %s del shard %s: %s", old, key, e)
+        return results
+
+    @staticmethod
+    def _publish(plan: _ShardPlan, file_id: str, vector_store_id: Optional[str], unchanged: bool = False) -> bool:
+        """
+        Cambia el manifiesto al archivo nuevo y actualiza mapeos y perfiles en una transacción.
+        """
+        db = SessionLocal()
+        try:
+            if not unchanged:
+                content_hash = _content_hash(plan.docs)
+                if plan.expected_version is None:
+                    db.add(
+                        VectorShard(
+                            shard_key=plan.key,
+                            file_id=file_id,
+                            vector_store_id=vector_store_id,
+                            version=1,
+                            record_count=len(plan.docs),
+                            content_hash=content_hash,
+                        )
+                    )
+                    try:
+                        db.flush()
+                    except IntegrityError:
+                        db.rollback()
+                        return False
+                elif not VectorShardRepository.swap_file(
+                    db,
+                    plan.key,
+                    expected_version=plan.expected_version,
+                    file_id=file_id,
+                    vector_store_id=vector_store_id,
+                    record_count=len(plan.docs),
+                    content_hash=content_hash,
+                ):
+                    db.rollback()
+                    return False
+
+            member_ids = [d["prof_id"] for d in plan.docs]
+            hashes = {d["prof_id"]: vector_document_hash(d) for d in plan.docs}
+            filename = shard_filename(plan.key)
+            existing = {
+                m.prof_id: m
+                for m in db.execute(select(VectorStoreFile).where(VectorStoreFile.prof_id.in_(member_ids))).scalars()
+            }
+            for prof_id in member_ids:
+                m = existing.get(prof_id)
+                if m is None:
+                    db.add(
+                        VectorStoreFile(
+                            prof_id=prof_id,
+                            file_id=file_id,
+                            vector_store_id=vector_store_id,
+                            filename=filename,
+                            shard_key=plan.key,
+                            content_hash=hashes[prof_id],
+                        )
+                    )
+                elif (m.file_id, m.shard_key, m.content_hash) != (file_id, plan.key, hashes[prof_id]):
+                    m.file_id, m.shard_key, m.filename, m.vector_store_id = file_id, plan.key, filename, vector_store_id
+                    m.content_hash = hashes[prof_id]
+            for prof_id in plan.removed:
+                VectorFileRepository.delete(db, prof_id)
+
+            ShardingService._point_profiles(db, member_ids, file_id)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _point_profiles(db, prof_ids: Iterable[str], file_id: str) -> None:
+        """vector_store_file_id de los miembros -> archivo del shard (UPDATE en bloque)."""
+        stale = db.execute(
+            select(ProfessionalProfile.id, ProfessionalProfile.user_id).where(
+                ProfessionalProfile.id.in_(list(prof_ids)),
+                (ProfessionalProfile.vector_store_file_id.is_(None)) | (ProfessionalProfile.vector_store_file_id != file_id),
+            )
+        ).all()
+        if not stale:
+            return
+        db.execute(
+            update(ProfessionalProfile)
+            .where(ProfessionalProfile.id.in_([pid for pid, _ in stale]))
+            # Sin onupdate de updated_at: reescribir el shard no edita a sus miembros
+            .values(vector_store_file_id=file_id, updated_at=ProfessionalProfile.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        for pid, uid in stale:
+            after_commit(db, lambda pid=pid, uid=uid: ProfileCache.invalidate(pid, uid), key=("profile", pid))
+
+    @staticmethod
+    def _drop(plan: _ShardPlan, writer) -> Union[None, Exception]:
+        """El shard quedó vacío: se elimina del manifiesto y se borra su archivo."""
+        db = SessionLocal()
+        try:
+            if plan.expected_version is not None and not VectorShardRepository.delete_if_version(
+                db, plan.key, plan.expected_version
+            ):
+                db.rollback()
+                return RuntimeError(f"Conflicto al vaciar el shard {plan.key}; se reintenta")
+            for prof_id in plan.removed:
+                VectorFileRepository.delete(db, prof_id)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            return e
+        finally:
+            db.close()
+        for old in ({plan.old_file_id} | plan.legacy_files) - {None}:
+            try:
+                writer.delete(old)
+            except Exception as e:
+                logger.warning("No se pudo borrar el archivo %s del shard vacío %s: %s", old, plan.key, e)
+        return None
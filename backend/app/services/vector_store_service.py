@@ -1,26 +1,102 @@
-from typing import Dict
+import importlib
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple, Union
 
-from backend.app.integrations.openai_vector_store import add_or_update_professional as _vs_add_or_update
-from backend.app.integrations.openai_vector_store import remove_professional as _vs_remove
+from backend.app.core.settings import get_settings
+
+_BACKENDS = {
+    "openai": "backend.app.integrations.openai_vector_store",
+    "local": "backend.app.integrations.local_vector_index",
+}
+
+
+def _backend() -> ModuleType:
+    """
+    Módulo de integración según VECTOR_STORE_BACKEND ("openai" | "local").
+    Import perezoso: el backend local requiere numpy solo si se usa.
+    """
+    name = get_settings().VECTOR_STORE_BACKEND
+    if name not in _BACKENDS:
+        raise RuntimeError(f"VECTOR_STORE_BACKEND desconocido: {name}")
+    return importlib.import_module(_BACKENDS[name])
 
 
 class VectorStoreService:
     """
     Fachada de servicios sobre el Vector Store.
     Permite reemplazar o mockear en tests sin tocar routers/services de dominio.
+    El backend concreto (OpenAI remoto o índice local embebido) se elige por configuración.
     """
 
     @staticmethod
-    def add_or_update_professional(doc: Dict, prof_id: str) -> str:
+    def add_or_update_professional(doc: Dict, prof_id: str, previous_file_id: Optional[str] = None) -> str:
         """
         Sube/actualiza un documento de profesional y espera indexación.
-        Retorna el OpenAI File ID subyacente.
+        `previous_file_id` (del mapeo persistente) se elimina tras indexar la nueva versión.
+        Retorna el File ID subyacente.
+        """
+        return _backend().add_or_update_professional(doc, prof_id, previous_file_id=previous_file_id)
+
+    @staticmethod
+    def add_or_update_many(items: List[Tuple[Dict, str, Optional[str]]]) -> Dict[str, Union[str, Exception]]:
+        """
+        Sube/actualiza varios documentos (uno por perfil) y espera su indexación en conjunto.
+        items: [(doc, prof_id, previous_file_id)]. Retorna prof_id -> File ID o la excepción
+        de ese perfil (los fallos son por elemento, no del lote).
+        """
+        return _backend().add_or_update_many(items)
+
+    @staticmethod
+    def add_professionals_batch(docs: List[Dict], batch_name: Optional[str] = None) -> Dict[str, str]:
+        """
+        Indexa un lote de documentos empaquetados (JSONL multi-registro en el
+        backend remoto). Retorna prof_id -> File ID.
+        """
+        return _backend().add_professionals_batch(docs, batch_name=batch_name)
+
+    @staticmethod
+    def remove_professional(prof_id: str, file_id: Optional[str] = None) -> bool:
+        """
+        Elimina el documento de un profesional. Con `file_id` conocido es una
+        única llamada; sin él se escanea el store.
+        """
+        return _backend().remove_professional(prof_id, file_id=file_id)
+
+    @staticmethod
+    def scan_professional_files() -> Dict[str, List[str]]:
+        """
+        Recorre todo el store (paginado) y devuelve prof_id -> [file_ids].
+        Solo para reconciliación completa del mapeo.
+        """
+        return _backend().scan_professional_files()
+
+    @staticmethod
+    def list_files_page(after: Optional[str] = None, limit: int = 100) -> Tuple[List[Tuple[str, Optional[int]]], bool]:
+        """
+        Una página del listado del store desde el cursor `after`.
+        Retorna ([(file_id, created_at unix o None)], has_more).
+        """
+        return _backend().list_files_page(after=after, limit=limit)
+
+    @staticmethod
+    def delete_file(file_id: str) -> bool:
+        """
+        Elimina un archivo concreto del store (sin resolver a qué perfil pertenece).
+        """
+        return _backend().delete_file(file_id)
+
+    @staticmethod
+    def search(query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Búsqueda semántica top-k. Retorna [(prof_id, score)] ordenado por score desc.
         """
-        return _vs_add_or_update(doc, prof_id)
+        return _backend().search_professionals(query, k)
 
     @staticmethod
-    def remove_professional(prof_id: str) -> bool:
+    def flush() -> None:
         """
-        Elimina el documento de un profesional (por metadata prof_id).
+        Persiste el estado pendiente del backend (no-op para el remoto).
         """
-        return _vs_remove(prof_id)
\ No newline at end of file
+        backend = _backend()
+        if hasattr(backend, "flush"):
+            backend.flush()
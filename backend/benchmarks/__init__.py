@@ -0,0 +1,14 @@
+"""
+Benchmarks de la API. Se ejecutan como módulos desde la raíz del repo, p. ej.:
+
+    python -m backend.benchmarks.load --concurrency 32 --duration 15 --out base.json
+    python -m backend.benchmarks.micro --out micro.json
+    python -m backend.benchmarks.async_vs_sync --concurrency 64 --duration 15
+    python -m backend.benchmarks.compare base.json actual.json --threshold 10
+
+- harness:       arranque de la app + stub de OpenAI, bucle cerrado, estadísticas y JSON
+- load:          mezcla ponderada de escenarios de auth y perfiles
+- micro:         serialización, JWT y costos de bcrypt en proceso
+- async_vs_sync: la misma carga con DB_ASYNC=false/true
+- compare:       diferencias entre dos corridas y detección de regresiones
+"""
@@ -0,0 +1,90 @@
+"""
+Compara req/s y latencias (p50/p95/p99) de las rutas síncronas y async (DB_ASYNC)
+con la misma concurrencia.
+
+Levanta un uvicorn por modo contra una base SQLite nueva, registra usuarios
+profesionales y mide en bucle cerrado los escenarios:
+  - me_get:  GET /api/profiles/me
+  - me_put:  PUT /api/profiles/me
+  - login:   POST /api/auth/login (dominado por bcrypt)
+
+Uso:
+    python -m backend.benchmarks.async_vs_sync --concurrency 64 --duration 10
+    python -m backend.benchmarks.async_vs_sync --database-url postgresql+psycopg://... --modes async
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.benchmarks.harness import PASSWORD, AppServer, Request, run_closed_loop, setup_users, write_results
+
+SCENARIOS = ("me_get", "me_put", "login")
+
+
+def _scenario_request(scenario: str, users: List[Dict[str, str]]):
+    def next_request(i: int, n: int, _rng: random.Random) -> Tuple[str, Request]:
+        user = users[i % len(users)]
+        auth = {"Authorization": f"Bearer {user['token']}"}
+        if scenario == "me_get":
+            return scenario, ("GET", "/api/profiles/me", None, auth)
+        if scenario == "me_put":
+            body = {
+                "nombre_completo": f"Bench {i}",
+                "profesion_principal": "Electricista",
+                "ciudad": "Medellín",
+                "descripcion_breve": f"rev {n}",
+            }
+            return scenario, ("PUT", "/api/profiles/me", body, auth)
+        return scenario, ("POST", "/api/auth/login", {"email": user["email"], "password": PASSWORD}, None)
+
+    return next_request
+
+
+async def _bench_mode(mode: str, args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, mode + '.db')}"
+    async with AppServer(database_url, mode=mode, workdir=workdir) as server:
+        users = await setup_users(server.port, args.users)
+        results: Dict[str, Any] = {}
+        for scenario in args.scenarios:
+            stats = await run_closed_loop(
+                server.port,
+                concurrency=args.concurrency,
+                duration_s=args.duration,
+                next_request=_scenario_request(scenario, users),
+            )
+            results[scenario] = stats["all"]
+        return results
+
+
+def _print_table(report: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'modo':<6} {'escenario':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for mode, results in report.items():
+        for scenario, r in results.items():
+            print(f"{mode:<6} {scenario:<8} {r['rps']:>9} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['errors']:>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rutas síncronas vs async (DB_ASYNC)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=["me_get", "me_put"])
+    parser.add_argument("--modes", nargs="+", choices=("sync", "async"), default=["sync", "async"])
+    parser.add_argument("--database-url", default=None, help="Por defecto una SQLite temporal por modo")
+    parser.add_argument("--json", dest="json_out", default=None, help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench_async_") as workdir:
+        report = {mode: asyncio.run(_bench_mode(mode, args, workdir)) for mode in args.modes}
+
+    _print_table(report)
+    if args.json_out:
+        config = {"concurrency": args.concurrency, "duration_s": args.duration, "users": args.users, "database": "custom" if args.database_url else "sqlite"}
+        write_results(args.json_out, "async_vs_sync", config, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compara dos archivos de resultados (load/micro/async_vs_sync) y marca
+regresiones: menos throughput (rps, ops_per_s) o más latencia (p50/p95/p99,
+us_per_op) que la línea base por encima del umbral.
+
+Uso:
+    python -m backend.benchmarks.compare base.json actual.json --threshold 10
+
+Sale con código 1 si hay alguna regresión (útil en CI).
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# métrica -> True si "más alto es mejor"
+METRICS = {
+    "rps": True,
+    "ops_per_s": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "us_per_op": False,
+}
+
+
+def _walk(results: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, str, float]]:
+    """(ruta, métrica, valor) para cada métrica conocida, a cualquier profundidad."""
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _walk(value, f"{prefix}{key}.")
+        elif key in METRICS and isinstance(value, (int, float)):
+            yield prefix.rstrip("."), key, float(value)
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold_pct: float) -> Tuple[List[List[str]], int]:
+    base_values = {(name, metric): v for name, metric, v in _walk(baseline.get("results", {}))}
+    rows: List[List[str]] = []
+    regressions = 0
+    for name, metric, value in _walk(current.get("results", {})):
+        base = base_values.get((name, metric))
+        if base is None:
+            continue
+        delta = (value - base) / base * 100 if base else 0.0
+        worse = -delta if METRICS[metric] else delta
+        flag = ""
+        if worse > threshold_pct:
+            flag = "REGRESIÓN"
+            regressions += 1
+        elif -worse > threshold_pct:
+            flag = "mejora"
+        rows.append([name, metric, f"{base:g}", f"{value:g}", f"{delta:+.1f}%", flag])
+    return rows, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compara dos corridas de benchmarks")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Porcentaje tolerado antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    baseline, current = _load(args.baseline), _load(args.current)
+    if baseline.get("benchmark") != current.get("benchmark"):
+        print(f"Aviso: benchmarks distintos ({baseline.get('benchmark')} vs {current.get('benchmark')})")
+    if baseline.get("config") != current.get("config"):
+        print("Aviso: la configuración de las corridas difiere")
+    for side, data in (("base", baseline), ("actual", current)):
+        env = data.get("env", {})
+        print(f"{side:<7} {data.get('label') or '-'}  commit={env.get('git_commit')}  {env.get('platform')}  cpus={env.get('cpus')}")
+
+    rows, regressions = compare(baseline, current, args.threshold)
+    header = ["caso", "métrica", "base", "actual", "delta", ""]
+    widths = [max(len(str(r[i])) for r in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)).rstrip())
+    if regressions:
+        print(f"{regressions} regresiones por encima de {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Piezas comunes de los benchmarks HTTP: arranque de la app en un uvicorn
+aparte, usuarios de prueba, bucle cerrado con concurrencia fija, estadísticas
+(p50/p95/p99) y resultados en JSON comparables entre corridas (ver compare.py).
+
+La app siempre corre con el Vector Store local y OPENAI_BASE_URL apuntando a un
+stub (openai_stub.StubServer), de modo que ninguna corrida llega a la API real.
+"""
+import asyncio
+import datetime as dt
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.benchmarks.http_client import HttpConnection
+from backend.benchmarks.openai_stub import StubServer
+
+HOST = "127.0.0.1"
+PASSWORD = "bench-password-123"
+
+# (método, path, cuerpo, cabeceras)
+Request = Tuple[str, str, Optional[Any], Optional[Dict[str, str]]]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def summarize(latencies: List[float], errors: int, elapsed_s: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed_s, 1) if elapsed_s else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+class AppServer:
+    """
+    uvicorn con la app en un subproceso (base de datos indicada, DB_ASYNC según
+    `mode`) más el stub de OpenAI en un hilo. Usar como context manager.
+    """
+
+    def __init__(self, database_url: str, *, mode: str = "sync", workdir: str, extra_env: Optional[Dict[str, str]] = None) -> None:
+        self.database_url = database_url
+        self.mode = mode
+        self.workdir = workdir
+        self.extra_env = extra_env or {}
+        self.port = free_port()
+        self.stub: Optional[StubServer] = None
+        self.proc: Optional[subprocess.Popen] = None
+
+    def env(self) -> Dict[str, str]:
+        assert self.stub is not None
+        env = dict(os.environ)
+        env.update(
+            {
+                "DATABASE_URL": self.database_url,
+                "DB_ASYNC": "true" if self.mode == "async" else "false",
+                "VECTOR_STORE_BACKEND": "local",
+                "LOCAL_VECTOR_INDEX_PATH": os.path.join(self.workdir, f"{self.mode}_index"),
+                "INDEX_WORKER_ENABLED": "false",
+                "OPENAI_BASE_URL": self.stub.base_url,
+                "OPENAI_API_KEY": "stub",
+            }
+        )
+        env.update(self.extra_env)
+        return env
+
+    def run_cli(self, *args: str) -> None:
+        """Ejecuta `python -m backend.app.cli ...` contra la misma base de datos."""
+        subprocess.run([sys.executable, "-m", "backend.app.cli", *args], env=self.env(), check=True, stdout=subprocess.DEVNULL)
+
+    def start_stub(self) -> None:
+        if self.stub is None:
+            self.stub = StubServer().start()
+
+    async def __aenter__(self) -> "AppServer":
+        self.start_stub()
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--host", HOST, "--port", str(self.port), "--log-level", "warning"],
+            env=self.env(),
+        )
+        await wait_ready(self.port)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        if self.proc is not None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        if self.stub is not None:
+            self.stub.stop()
+            self.stub = None
+
+
+async def wait_ready(port: int, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        conn = HttpConnection(HOST, port)
+        try:
+            status, _ = await conn.request("GET", "/health")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            await conn.close()
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor en :{port} no respondió a /health")
+
+
+def professional_payload(i: int, email: str) -> Dict[str, Any]:
+    return {
+        "email": email,
+        "password": PASSWORD,
+        "full_name": f"Bench {i}",
+        "is_professional": True,
+        "professional": {
+            "nombre_completo": f"Bench {i}",
+            "profesion_principal": "Electricista",
+            "ciudad": "Medellín",
+        },
+    }
+
+
+async def setup_users(port: int, n_users: int, prefix: str = "bench") -> List[Dict[str, str]]:
+    users: List[Dict[str, str]] = []
+    conn = HttpConnection(HOST, port)
+    try:
+        for i in range(n_users):
+            email = f"{prefix}{i}@example.com"
+            status, data = await conn.request("POST", "/api/auth/register", professional_payload(i, email))
+            if status != 200:
+                raise RuntimeError(f"register {status}: {data[:200]!r}")
+            status, data = await conn.request("POST", "/api/auth/login", {"email": email, "password": PASSWORD})
+            if status != 200:
+                raise RuntimeError(f"login {status}: {data[:200]!r}")
+            users.append({"email": email, "token": json.loads(data)["access_token"]})
+    finally:
+        await conn.close()
+    return users
+
+
+async def run_closed_loop(
+    port: int,
+    *,
+    concurrency: int,
+    duration_s: float,
+    next_request: Callable[[int, int, random.Random], Tuple[str, Request]],
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    `concurrency` clientes keep-alive en bucle cerrado durante `duration_s`.
+    `next_request(worker, n, rng)` devuelve (etiqueta, request); cada worker usa
+    un RNG propio sembrado con `seed` para que la secuencia sea reproducible.
+    Devuelve estadísticas por etiqueta y el total ("all").
+    """
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    stop_at = time.perf_counter() + duration_s
+
+    async def worker(i: int) -> None:
+        rng = random.Random(seed * 100003 + i)
+        conn = HttpConnection(HOST, port)
+        n = 0
+        try:
+            while time.perf_counter() < stop_at:
+                n += 1
+                label, req = next_request(i, n, rng)
+                start = time.perf_counter()
+                try:
+                    status, _ = await conn.request(*req)
+                except (OSError, ConnectionError, asyncio.IncompleteReadError):
+                    errors[label] = errors.get(label, 0) + 1
+                    await conn.close()
+                    continue
+                latencies.setdefault(label, []).append(time.perf_counter() - start)
+                if status >= 400:
+                    errors[label] = errors.get(label, 0) + 1
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    out = {label: summarize(values, errors.get(label, 0), elapsed) for label, values in sorted(latencies.items())}
+    out["all"] = summarize([v for values in latencies.values() for v in values], sum(errors.values()), elapsed)
+    return out
+
+
+def environment_info() -> Dict[str, Any]:
+    """Contexto de la corrida (para no comparar resultados de máquinas distintas sin saberlo)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: str, benchmark: str, config: Dict[str, Any], results: Dict[str, Any], label: Optional[str] = None) -> None:
+    payload = {
+        "benchmark": benchmark,
+        "label": label,
+        "env": environment_info(),
+        "config": config,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, ensure_ascii=False)
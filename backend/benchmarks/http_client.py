@@ -0,0 +1,89 @@
+"""
+Cliente HTTP/1.1 mínimo sobre asyncio con conexiones keep-alive.
+
+Sin dependencias externas para que el costo del cliente sea bajo y estable
+entre corridas; solo soporta lo que usan los benchmarks (Content-Length y chunked).
+"""
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+
+
+class HttpConnection:
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def _ensure(self) -> None:
+        if self._writer is None or self._writer.is_closing():
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, bytes]:
+        await self._ensure()
+        assert self._reader is not None and self._writer is not None
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        for k, v in (headers or {}).items():
+            lines.append(f"{k}: {v}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("Conexión cerrada por el servidor")
+        status = int(status_line.split(b" ", 2)[1])
+        length = 0
+        chunked = False
+        keep_alive = True
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value.strip())
+            elif name == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+            elif name == "connection" and value.strip().lower() == "close":
+                keep_alive = False
+        if chunked:
+            data = await self._read_chunked()
+        else:
+            data = await self._reader.readexactly(length) if length else b""
+        if not keep_alive:
+            await self.close()
+        return status, data
+
+    async def _read_chunked(self) -> bytes:
+        assert self._reader is not None
+        parts = []
+        while True:
+            size = int((await self._reader.readline()).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # trailers (normalmente ninguno) hasta la línea vacía
+                while (await self._reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(parts)
+            parts.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
@@ -0,0 +1,200 @@
+"""
+Micro-benchmarks en proceso de las piezas que dominan las rutas calientes:
+
+  - prof_to_out / user_to_out (serialización Pydantic de respuestas): camino
+    model_construct frente a la validación completa, y una página de búsqueda
+  - create_access_token / decode_access_token (JWT): TokenService con HS256,
+    ES256 y EdDSA, y python-jose genérico como referencia
+  - autocompletado: búsqueda por prefijo en el índice en memoria (20k valores),
+    sin y con la caché de resultados
+  - bcrypt con distintos costos (rounds), para decidir el costo por defecto
+
+Uso:
+    python -m backend.benchmarks.micro
+    python -m backend.benchmarks.micro --bcrypt-rounds 10 11 12 13 --out backend/benchmarks/results/micro.json
+"""
+import argparse
+import datetime as dt
+import os
+import time
+import timeit
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.benchmarks.harness import write_results
+
+
+def _measure(fn: Callable[[], Any], min_time_s: float, repeat: int) -> Dict[str, Any]:
+    """Mejor de `repeat` tandas; cada tanda dura al menos `min_time_s`."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time_s / 5:
+            break
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"us_per_op": round(best * 1e6, 3), "ops_per_s": round(1.0 / best, 1) if best else 0.0, "loops": number}
+
+
+def _sample_profile() -> Any:
+    now = dt.datetime.now(dt.timezone.utc)
+    return SimpleNamespace(
+        id="3f2b6a0e-6a8e-4c41-9d7e-2f4b1c9a7e10",
+        user_id="9c1d2e3f-4a5b-6c7d-8e9f-0a1b2c3d4e5f",
+        nombre_completo="Ana María Restrepo",
+        profesion_principal="Electricista",
+        ciudad="Medellín",
+        barrio="Laureles",
+        telefono="+57 300 000 0000",
+        email="ana@example.com",
+        descripcion_breve="Instalaciones residenciales y comerciales, mantenimiento preventivo y certificaciones RETIE.",
+        profesion_normalizada="electricista",
+        ciudad_normalizada="medellin",
+        lat=6.2447,
+        lon=-75.59,
+        geohash="d345xbv41",
+        vector_store_file_id="file-abc123",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _sample_user() -> Any:
+    now = dt.datetime.now(dt.timezone.utc)
+    return SimpleNamespace(
+        id="9c1d2e3f-4a5b-6c7d-8e9f-0a1b2c3d4e5f",
+        email="ana@example.com",
+        full_name="Ana María Restrepo",
+        phone="+57 300 000 0000",
+        city="Medellín",
+        is_professional=True,
+        token_version=0,
+        created_at=now,
+        updated_at=now,
+        professional_profile=_sample_profile(),
+    )
+
+
+def _jwt_variants(subject: str, min_time_s: float, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """python-jose (camino anterior) y TokenService con claves asimétricas."""
+    from backend.app.core.settings import get_settings
+    from backend.app.core.tokens import TokenService, asymmetric_key, generate_private_key_pem
+
+    settings = get_settings()
+    claims = {"sub": subject, "email": "ana@example.com", "is_professional": True, "ver": 0}
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        from jose import jwt as jose_jwt
+
+        exp = int(time.time()) + 3600
+        token = jose_jwt.encode({**claims, "exp": exp}, settings.JWT_SECRET, algorithm="HS256")
+        results["jwt_encode_jose"] = _measure(
+            lambda: jose_jwt.encode({**claims, "exp": exp}, settings.JWT_SECRET, algorithm="HS256"), min_time_s, repeat
+        )
+        results["jwt_decode_jose"] = _measure(
+            lambda: jose_jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"]), min_time_s, repeat
+        )
+    except ImportError:
+        pass
+
+    for alg in ("ES256", "EdDSA"):
+        key = asymmetric_key(f"bench-{alg.lower()}", generate_private_key_pem(alg))
+        service = TokenService(key, [])
+        token = service.encode(claims)
+        results[f"jwt_encode_{alg.lower()}"] = _measure(lambda: service.encode(claims), min_time_s, repeat)
+        results[f"jwt_decode_{alg.lower()}"] = _measure(lambda: service.decode(token), min_time_s, repeat)
+    return results
+
+
+def _suggest_variants(min_time_s: float, repeat: int) -> Dict[str, Dict[str, Any]]:
+    import random
+    import string
+
+    from backend.app.core.suggestions import PrefixIndex
+
+    rnd = random.Random(42)
+
+    def words() -> str:
+        return " ".join(
+            "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 10))) for _ in range(rnd.randint(1, 3))
+        )
+
+    index = PrefixIndex.build((words(), None, rnd.randint(1, 500)) for _ in range(20000))
+
+    def uncached() -> Any:
+        index._results.clear()
+        return index.search("a", 8)
+
+    return {
+        "suggest_prefix_1_uncached": _measure(uncached, min_time_s, repeat),
+        "suggest_prefix_1": _measure(lambda: index.search("a", 8), min_time_s, repeat),
+        "suggest_prefix_3": _measure(lambda: index.search("abc", 8), min_time_s, repeat),
+    }
+
+
+def run(bcrypt_rounds: List[int], min_time_s: float, repeat: int) -> Dict[str, Dict[str, Any]]:
+    from passlib.context import CryptContext
+
+    from backend.app.core.security import create_access_token, decode_access_token
+    from backend.app.schemas.professional import ProfessionalSearchResponse, prof_to_out
+    from backend.app.schemas.user import user_to_out
+
+    prof, user = _sample_profile(), _sample_user()
+    token = create_access_token(user.id, extra_claims={"tv": 0})
+
+    results: Dict[str, Dict[str, Any]] = {
+        "prof_to_out": _measure(lambda: prof_to_out(prof), min_time_s, repeat),
+        "prof_to_out_json": _measure(lambda: prof_to_out(prof).model_dump_json(), min_time_s, repeat),
+        "prof_to_out_validated": _measure(lambda: prof_to_out(prof, validate=True), min_time_s, repeat),
+        "user_to_out": _measure(lambda: user_to_out(user), min_time_s, repeat),
+        "user_to_out_validated": _measure(lambda: user_to_out(user, validate=True), min_time_s, repeat),
+        "search_page_100_model": _measure(
+            lambda: ProfessionalSearchResponse(items=[prof_to_out(prof, validate=True) for _ in range(100)]).model_dump_json(),
+            min_time_s,
+            repeat,
+        ),
+        "search_page_100_lean": _measure(
+            lambda: b",".join(prof_to_out(prof).model_dump_json().encode() for _ in range(100)), min_time_s, repeat
+        ),
+        "jwt_encode": _measure(lambda: create_access_token(user.id, extra_claims={"tv": 0}), min_time_s, repeat),
+        "jwt_decode": _measure(lambda: decode_access_token(token), min_time_s, repeat),
+    }
+    results.update(_jwt_variants(user.id, min_time_s, repeat))
+    results.update(_suggest_variants(min_time_s, repeat))
+    for rounds in bcrypt_rounds:
+        ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        hashed = ctx.hash("bench-password-123")
+        # bcrypt es lento a propósito: una sola llamada por tanda
+        start = time.perf_counter()
+        n = 0
+        while n < 3 or time.perf_counter() - start < min_time_s:
+            ctx.verify("bench-password-123", hashed)
+            n += 1
+        per_op = (time.perf_counter() - start) / n
+        results[f"bcrypt_verify_r{rounds}"] = {"us_per_op": round(per_op * 1e6, 1), "ops_per_s": round(1.0 / per_op, 2), "loops": n}
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de serialización, JWT y bcrypt")
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12])
+    parser.add_argument("--min-time", type=float, default=0.5, help="Segundos mínimos por tanda")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--out", default=None, help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args(argv)
+
+    # bcrypt inline: sin pool de procesos
+    os.environ.setdefault("HASHING_POOL_WORKERS", "0")
+    results = run(args.bcrypt_rounds, args.min_time, args.repeat)
+
+    print(f"{'benchmark':<26} {'µs/op':>12} {'ops/s':>12}")
+    for name, r in results.items():
+        print(f"{name:<26} {r['us_per_op']:>12} {r['ops_per_s']:>12}")
+    if args.out:
+        config = {"bcrypt_rounds": args.bcrypt_rounds, "min_time_s": args.min_time, "repeat": args.repeat}
+        write_results(args.out, "micro", config, results, label=args.label)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compara un OpenAI(...) nuevo por llamada contra el cliente compartido del proceso
+(integrations/openai_client) usando el stub local.
+
+    python -m backend.benchmarks.openai_client_reuse --calls 300
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.benchmarks.openai_stub import StubServer
+
+
+def _measure(server: StubServer, calls: int, fn: Callable[[], Any]) -> Dict[str, Any]:
+    conns_before = server.connections
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "ms_per_call": round(elapsed / calls * 1000, 3),
+        "connections": server.connections - conns_before,
+    }
+
+
+async def _measure_async(server: StubServer, calls: int, concurrency: int) -> Dict[str, Any]:
+    from backend.app.integrations.openai_client import get_async_openai_client, openai_clients
+
+    client = get_async_openai_client()
+    conns_before = server.connections
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with sem:
+            await client.files.retrieve("file-bench")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    await openai_clients.aclose()
+    return {"ms_per_call": round(elapsed / calls * 1000, 3), "connections": server.connections - conns_before}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de reutilización del cliente OpenAI")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrencia del escenario async")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia simulada del stub")
+    args = parser.parse_args(argv)
+
+    server = StubServer(latency_s=args.latency_ms / 1000.0).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["OPENAI_MAX_RETRIES"] = "0"
+
+    from openai import OpenAI
+
+    from backend.app.core.settings import get_settings
+    from backend.app.integrations.openai_client import get_openai_client
+
+    get_settings.cache_clear()
+    settings = get_settings()
+
+    def per_call() -> None:
+        client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, max_retries=0)
+        try:
+            client.files.retrieve("file-bench")
+        finally:
+            client.close()
+
+    try:
+        results = {
+            "per_call_client": _measure(server, args.calls, per_call),
+            "shared_client": _measure(server, args.calls, lambda: get_openai_client().files.retrieve("file-bench")),
+            "shared_async_client": asyncio.run(_measure_async(server, args.calls, args.concurrency)),
+        }
+    finally:
+        server.stop()
+
+    print(f"{'escenario':<22} {'ms/llamada':>11} {'conexiones':>11}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['ms_per_call']:>11} {r['connections']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Servidor stub mínimo de la API de OpenAI para pruebas locales y benchmarks.
+
+Responde JSON plausible para las rutas que usa la app (files, vector_stores,
+chatkit sessions) con HTTP/1.1 keep-alive y cuenta las conexiones TCP abiertas,
+lo que permite verificar la reutilización del pool del cliente.
+
+    python -m backend.benchmarks.openai_stub --port 8099
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=stub uvicorn backend.app.main:app
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+_VS_FILE = re.compile(r"^/v1/vector_stores/([^/]+)/files/([^/]+)$")
+_FILE = re.compile(r"^/v1/files/([^/]+)$")
+
+
+def _response_for(method: str, path: str) -> Dict[str, Any]:
+    now = int(time.time())
+    m = _VS_FILE.match(path)
+    if m:
+        return {"id": m.group(2), "object": "vector_store.file", "vector_store_id": m.group(1),
+                "status": "completed", "created_at": now, "usage_bytes": 1, "last_error": None}
+    m = _FILE.match(path)
+    if m:
+        return {"id": m.group(1), "object": "file", "bytes": 1, "created_at": now,
+                "filename": f"{m.group(1)}.json", "purpose": "assistants", "status": "processed"}
+    if path.startswith("/v1/chatkit/sessions"):
+        return {"id": "cksess_stub", "object": "chatkit.session", "client_secret": "cs_stub",
+                "expires_at": now + 600, "status": "active"}
+    if method == "POST" and path == "/v1/files":
+        return {"id": f"file-stub{now}", "object": "file", "bytes": 1, "created_at": now,
+                "filename": "upload.json", "purpose": "assistants", "status": "processed"}
+    return {"object": "list", "data": [], "has_more": False, "first_id": None, "last_id": None}
+
+
+class StubServer:
+    """Servidor en un hilo; `connections` cuenta conexiones TCP aceptadas."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_s: float = 0.0) -> None:
+        stub = self
+        self.connections = 0
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeceras y cuerpo van en writes separados: sin esto Nagle + delayed ACK suman ~40 ms
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with stub._count_lock:
+                    stub.connections += 1
+
+            def _reply(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                with stub._count_lock:
+                    stub.requests += 1
+                if latency_s:
+                    time.sleep(latency_s)
+                body = json.dumps(_response_for(self.command, self.path.split("?", 1)[0])).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = _reply
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="openai-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub local de la API de OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubServer(args.host, args.port, latency_s=args.latency_ms / 1000.0).start()
+    print(f"Stub OpenAI en {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
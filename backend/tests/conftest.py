@@ -0,0 +1,16 @@
+"""
+Entorno aislado para los tests: SQLite y backends locales en un directorio
+temporal, fijados antes de que se importe (y se cachee) la configuración.
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    HASHING_POOL_WORKERS="0",
+    VECTOR_STORE_BACKEND="local",
+    LOCAL_VECTOR_INDEX_PATH=os.path.join(_tmp, "vectors"),
+    VECTOR_SHARD_WRITER="local",
+    LOCAL_SHARD_DIR=os.path.join(_tmp, "shards"),
+)
@@ -0,0 +1,172 @@
+"""
+Verificador JWT propio (core/tokens.py): algoritmo fijado por la clave,
+claims temporales, firmas y compatibilidad con tokens sin `kid` y rotación.
+"""
+import hmac
+import time
+
+import pytest
+from jose import jwt as jose_jwt
+
+from backend.app.core.tokens import (
+    TokenService,
+    _b64encode,
+    _json_segment,
+    asymmetric_key,
+    generate_private_key_pem,
+    hmac_key,
+)
+
+SECRET = "current-secret"
+OLD_SECRET = "old-secret"
+
+
+def _service(secret=SECRET, previous=(), alg="HS256", **kwargs) -> TokenService:
+    return TokenService(hmac_key(secret, alg), [hmac_key(s, alg) for s in previous], **kwargs)
+
+
+def _hs_token(header, payload, secret, digest="sha256") -> str:
+    signing_input = _json_segment(header) + b"." + _json_segment(payload)
+    sig = hmac.digest(secret.encode("utf-8"), signing_input, digest)
+    return (signing_input + b"." + _b64encode(sig)).decode("ascii")
+
+
+def _claims(**extra):
+    return {"sub": "user-1", "exp": int(time.time()) + 600, **extra}
+
+
+def test_roundtrip():
+    svc = _service()
+    token = svc.encode({"sub": "user-1"})
+    assert svc.decode(token)["sub"] == "user-1"
+
+
+def test_alg_mismatch_with_kid_is_rejected():
+    svc = _service()
+    header = {"alg": "HS512", "kid": svc.active.kid, "typ": "JWT"}
+    assert svc.decode(_hs_token(header, _claims(), SECRET, "sha512")) is None
+
+
+def test_alg_mismatch_without_kid_is_rejected():
+    svc = _service()
+    token = _hs_token({"alg": "HS384", "typ": "JWT"}, _claims(), SECRET, "sha384")
+    assert svc.decode(token) is None
+
+
+def test_hmac_signed_with_public_key_of_asymmetric_kid_is_rejected():
+    key = asymmetric_key("es-1", generate_private_key_pem("ES256"))
+    svc = TokenService(key, [])
+    header = {"alg": "HS256", "kid": "es-1", "typ": "JWT"}
+    assert svc.decode(_hs_token(header, _claims(), "es-1")) is None
+
+
+@pytest.mark.parametrize("kid", [None, "current"])
+def test_alg_none_is_rejected(kid):
+    svc = _service()
+    header = {"alg": "none", "typ": "JWT"}
+    if kid:
+        header["kid"] = svc.active.kid
+    unsigned = (_json_segment(header) + b"." + _json_segment(_claims()) + b".").decode("ascii")
+    assert svc.decode(unsigned) is None
+
+
+def test_expired_token_is_rejected():
+    svc = _service()
+    assert svc.decode(svc.encode({"sub": "user-1"}, expires_minutes=-1)) is None
+
+
+def test_missing_or_invalid_exp_is_rejected():
+    svc = _service()
+    header = {"alg": "HS256", "kid": svc.active.kid, "typ": "JWT"}
+    assert svc.decode(_hs_token(header, {"sub": "user-1"}, SECRET)) is None
+    assert svc.decode(_hs_token(header, {"sub": "user-1", "exp": True}, SECRET)) is None
+    assert svc.decode(_hs_token(header, {"sub": "user-1", "exp": "9999999999"}, SECRET)) is None
+
+
+def test_leeway_accepts_recently_expired_token():
+    svc = _service(leeway_s=60)
+    header = {"alg": "HS256", "kid": svc.active.kid, "typ": "JWT"}
+    token = _hs_token(header, {"sub": "user-1", "exp": int(time.time()) - 10}, SECRET)
+    assert svc.decode(token)["sub"] == "user-1"
+
+
+def test_nbf():
+    svc = _service()
+    header = {"alg": "HS256", "kid": svc.active.kid, "typ": "JWT"}
+    now = int(time.time())
+    assert svc.decode(_hs_token(header, _claims(nbf=now + 300), SECRET)) is None
+    assert svc.decode(_hs_token(header, _claims(nbf="soon"), SECRET)) is None
+    assert svc.decode(_hs_token(header, _claims(nbf=now - 5), SECRET))["sub"] == "user-1"
+
+
+def test_issuer_is_enforced_when_configured():
+    svc = _service(issuer="api")
+    assert svc.decode(svc.encode({"sub": "user-1"}))["iss"] == "api"
+    assert svc.decode(_service().encode({"sub": "user-1"})) is None
+
+
+def test_bad_signature_is_rejected():
+    svc = _service()
+    token = svc.encode({"sub": "user-1"})
+    header, payload, sig = token.split(".")
+    tampered = _json_segment(_claims(sub="admin")).decode("ascii")
+    assert svc.decode(f"{header}.{tampered}.{sig}") is None
+    assert svc.decode(f"{header}.{payload}.{sig[:-2]}AA") is None
+    assert svc.decode(_service("other-secret").encode({"sub": "user-1"})) is None
+
+
+@pytest.mark.parametrize("token", ["", "abc", "a.b", "a.b.c.d", "ñ.b.c", "e30.e30.!!"])
+def test_malformed_token_is_rejected(token):
+    assert _service().decode(token) is None
+
+
+def test_kidless_legacy_token_signed_with_active_secret():
+    svc = _service(previous=[OLD_SECRET])
+    token = jose_jwt.encode(_claims(), SECRET, algorithm="HS256")
+    assert svc.decode(token)["sub"] == "user-1"
+
+
+def test_kidless_legacy_token_signed_with_previous_secret():
+    svc = _service(previous=[OLD_SECRET])
+    token = jose_jwt.encode(_claims(), OLD_SECRET, algorithm="HS256")
+    assert svc.decode(token)["sub"] == "user-1"
+    # Misma cabecera con otro orden de campos: se parsea y se prueban las mismas claves
+    reordered = _hs_token({"typ": "JWT", "alg": "HS256"}, _claims(), OLD_SECRET)
+    assert svc.decode(reordered)["sub"] == "user-1"
+
+
+def test_kidless_legacy_token_with_unknown_secret_is_rejected():
+    svc = _service(previous=[OLD_SECRET])
+    assert svc.decode(jose_jwt.encode(_claims(), "unknown", algorithm="HS256")) is None
+
+
+def test_kidless_legacy_token_after_migration_to_asymmetric_key():
+    svc = TokenService(asymmetric_key("es-1", generate_private_key_pem("ES256")), [hmac_key(OLD_SECRET)])
+    token = jose_jwt.encode(_claims(), OLD_SECRET, algorithm="HS256")
+    assert svc.decode(token)["sub"] == "user-1"
+
+
+def test_rotated_hmac_secret_still_verifies():
+    token = _service(OLD_SECRET).encode({"sub": "user-1"})
+    assert _service(previous=[OLD_SECRET]).decode(token)["sub"] == "user-1"
+    assert _service().decode(token) is None
+
+
+@pytest.mark.parametrize("alg", ["ES256", "EdDSA"])
+def test_rotated_asymmetric_key_still_verifies(alg):
+    from cryptography.hazmat.primitives import serialization
+
+    old_pem = generate_private_key_pem(alg)
+    old = asymmetric_key("2025-01", old_pem)
+    token = TokenService(old, []).encode({"sub": "user-1"})
+
+    # Tras rotar, la clave anterior queda solo como pública
+    old_public = serialization.load_pem_private_key(old_pem, password=None).public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    new = asymmetric_key("2025-06", generate_private_key_pem(alg))
+    svc = TokenService(new, [asymmetric_key("2025-01", old_public)])
+    assert svc.decode(token)["sub"] == "user-1"
+    assert svc.decode(svc.encode({"sub": "user-2"}))["sub"] == "user-2"
+    assert {k["kid"] for k in svc.jwks()["keys"]} >= {"2025-01", "2025-06"}
+
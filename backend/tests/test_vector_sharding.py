@@ -0,0 +1,78 @@
+"""
+Shards copy-on-write: reescribir un shard reapunta a todos sus miembros al
+archivo nuevo sin tocar su updated_at (recencia del ranking y marca de agua de
+la reconciliación).
+"""
+import datetime as dt
+
+import pytest
+from sqlalchemy import delete, update
+
+from backend.app.core.settings import get_settings
+from backend.app.db.session import SessionLocal, init_db
+from backend.app.models.index_job import IndexJob
+from backend.app.models.professional import ProfessionalProfile
+from backend.app.models.user import User
+from backend.app.models.vector_file import VectorStoreFile
+from backend.app.models.vector_shard import VectorShard
+from backend.app.repositories.professionals import ProfessionalRepository
+from backend.app.repositories.users import UserRepository
+from backend.app.services.indexing_service import IndexingService
+from backend.app.services.indexing_worker import IndexingWorker
+
+LONG_AGO = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "VECTOR_SHARDING", "hash")
+    monkeypatch.setattr(settings, "VECTOR_SHARD_COUNT", 1)
+    init_db()
+    session = SessionLocal()
+    yield session
+    session.close()
+    with SessionLocal() as cleanup:
+        for model in (IndexJob, VectorStoreFile, VectorShard, ProfessionalProfile, User):
+            cleanup.execute(delete(model))
+        cleanup.commit()
+
+
+def _create_profiles(db, n):
+    ids = []
+    for i in range(n):
+        user = UserRepository.create(db, email=f"shard{i}@example.com", password_hash="x")
+        prof = ProfessionalRepository.create(
+            db,
+            user_id=user.id,
+            nombre_completo=f"Profesional {i}",
+            profesion_principal="Plomero",
+            ciudad="Cali",
+            ciudad_normalizada="cali",
+        )
+        IndexingService.enqueue_upsert(db, prof.id, user.id)
+        ids.append(prof.id)
+    db.commit()
+    IndexingWorker().run_once(10)
+    return ids
+
+
+def test_shard_rewrite_keeps_members_updated_at(db):
+    ids = _create_profiles(db, 3)
+    db.execute(update(ProfessionalProfile).values(updated_at=LONG_AGO))
+    db.commit()
+    before = {pid: db.get(ProfessionalProfile, pid).vector_store_file_id for pid in ids}
+
+    edited = db.get(ProfessionalProfile, ids[0])
+    ProfessionalRepository.update(db, edited, descripcion_breve="Instalaciones y reparaciones")
+    IndexingService.enqueue_upsert(db, edited.id, edited.user_id)
+    db.commit()
+    IndexingWorker().run_once(10)
+
+    db.expire_all()
+    for pid in ids[1:]:
+        prof = db.get(ProfessionalProfile, pid)
+        # Reapuntado al archivo reescrito del shard, pero sin "editarse"
+        assert prof.vector_store_file_id != before[pid]
+        assert prof.updated_at.replace(tzinfo=dt.timezone.utc) == LONG_AGO
+    assert db.get(ProfessionalProfile, ids[0]).updated_at.replace(tzinfo=dt.timezone.utc) > LONG_AGO